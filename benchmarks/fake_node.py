@@ -0,0 +1,385 @@
+import collections
+import hashlib
+import http.server
+import json
+import random
+import re
+import threading
+import time
+import typing
+from dataclasses import dataclass
+
+from src.clients.dex.uniswap_v2 import constants as uniswap_v2_constants
+
+_GENESIS_TIMESTAMP = 1_680_000_000
+_BLOCK_TIME_SECONDS = 10
+_ZERO_ADDRESS = "0x" + "0" * 40
+_MAX_TRANSACTIONS_PER_ADDRESS = 256
+_TRANSACTION_HASH_PATTERN = re.compile("0x[0-9a-fA-F]{64}")
+
+
+@dataclass
+class FakeEvmNodeConfig:
+    contract_addresses: typing.List[str]
+    latest_block: int = 20_000_000
+    transactions_per_block: float = 1.0
+    latency_seconds: float = 0.0
+    error_rate: float = 0.0
+    seed: int = 0
+    chain_id: int = 369
+    # Factory emitting PairCreated of the i-th contract address at block `factory_start_block + i`.
+    factory_address: typing.Optional[str] = None
+    factory_start_block: int = 0
+
+
+class FakeEvmNode(object):
+    """
+    Deterministic stand-in for an EVM JSON-RPC validator node serving synthetic UniswapV2 pair logs.
+
+    Every block of every configured contract address contains on average `transactions_per_block`
+    transactions. Each transaction emits a Swap, Mint or Burn sequence of logs. The same config always
+    produces the same chain, so runs are comparable.
+    """
+
+    def __init__(self, config: FakeEvmNodeConfig) -> None:
+        self.config = config
+        self.request_counts = collections.Counter()
+        self._request_counts_lock = threading.Lock()
+        self._contract_address_indexes = {
+            address.lower(): index for index, address in enumerate(config.contract_addresses)
+        }
+        self._error_rng = random.Random(config.seed)
+        self._server = None
+        self._server_thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address
+        return "http://{}:{}".format(host, port)
+
+    @property
+    def total_request_count(self) -> int:
+        return sum(count for method, count in self.request_counts.items() if not method.startswith("http"))
+
+    def start(self) -> "FakeEvmNode":
+        node = self
+
+        class RequestHandler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def do_POST(self) -> None:
+                payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                node._count_request(method="http")
+                if node.config.latency_seconds:
+                    time.sleep(node.config.latency_seconds)
+                if node.config.error_rate and node._error_rng.random() < node.config.error_rate:
+                    node._count_request(method="http_error")
+                    self.send_response(503)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+
+                if isinstance(payload, list):
+                    response = [node.handle_request(request=request) for request in payload]
+                else:
+                    response = node.handle_request(request=payload)
+
+                body = json.dumps(response).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: typing.Any) -> None:
+                pass
+
+        self._server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), RequestHandler)
+        self._server.daemon_threads = True
+        self._server_thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._server_thread.start()
+
+        return self
+
+    def stop(self) -> None:
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def reset_request_counts(self) -> None:
+        with self._request_counts_lock:
+            self.request_counts.clear()
+
+    def __enter__(self) -> "FakeEvmNode":
+        return self.start()
+
+    def __exit__(self, *args: typing.Any) -> None:
+        self.stop()
+
+    def handle_request(self, request: typing.Dict) -> typing.Dict:
+        method = request.get("method")
+        params = request.get("params") or []
+        self._count_request(method=method)
+
+        handler = {
+            "eth_blockNumber": lambda: hex(self.config.latest_block),
+            "eth_chainId": lambda: hex(self.config.chain_id),
+            "eth_getLogs": lambda: self.get_logs(log_filter=params[0]),
+            "eth_getTransactionByHash": lambda: self.get_transaction(transaction_hash=params[0]),
+            "eth_getBlockByNumber": lambda: self.get_block(block_number=self._to_block_number(params[0])),
+        }.get(method)
+        if not handler:
+            return {
+                "jsonrpc": "2.0",
+                "id": request.get("id"),
+                "error": {"code": -32601, "message": "Method {} not found".format(method)},
+            }
+
+        return {"jsonrpc": "2.0", "id": request.get("id"), "result": handler()}
+
+    def get_logs(self, log_filter: typing.Dict) -> typing.List[typing.Dict]:
+        addresses = log_filter.get("address") or self.config.contract_addresses
+        if isinstance(addresses, str):
+            addresses = [addresses]
+        addresses = {address.lower() for address in addresses}
+
+        topic_filter = (log_filter.get("topics") or [None])[0]
+        if isinstance(topic_filter, str):
+            topic_filter = [topic_filter]
+
+        from_block = self._to_block_number(log_filter.get("fromBlock", "earliest"))
+        to_block = min(self._to_block_number(log_filter.get("toBlock", "latest")), self.config.latest_block)
+
+        logs = []
+        for block_number in range(from_block, to_block + 1):
+            log_index = 0
+            pair_created_log = self._get_pair_created_log(block_number=block_number)
+            if pair_created_log and self.config.factory_address.lower() in addresses:
+                topics, data, transaction_hash = pair_created_log
+                if not topic_filter or topics[0] in topic_filter:
+                    logs.append(
+                        {
+                            "address": self.config.factory_address,
+                            "topics": topics,
+                            "data": data,
+                            "blockNumber": hex(block_number),
+                            "blockHash": self._get_block_hash(block_number=block_number),
+                            "transactionHash": transaction_hash,
+                            "transactionIndex": hex(0),
+                            "logIndex": hex(log_index),
+                            "removed": False,
+                        }
+                    )
+                log_index += 1
+            for address in self.config.contract_addresses:
+                for transaction in self._get_block_transactions(address=address, block_number=block_number):
+                    for topics, data in transaction["logs"]:
+                        if address.lower() in addresses and (not topic_filter or topics[0] in topic_filter):
+                            logs.append(
+                                {
+                                    "address": address,
+                                    "topics": topics,
+                                    "data": data,
+                                    "blockNumber": hex(block_number),
+                                    "blockHash": self._get_block_hash(block_number=block_number),
+                                    "transactionHash": transaction["hash"],
+                                    "transactionIndex": hex(transaction["transaction_index"]),
+                                    "logIndex": hex(log_index),
+                                    "removed": False,
+                                }
+                            )
+                        log_index += 1
+
+        return logs
+
+    def get_transaction(self, transaction_hash: str) -> typing.Optional[typing.Dict]:
+        # Malformed hashes are not found, as on a real node, instead of failing the request.
+        if not isinstance(transaction_hash, str) or not _TRANSACTION_HASH_PATTERN.fullmatch(transaction_hash):
+            return None
+
+        block_number = int(transaction_hash[2:18], 16)
+        address_index = int(transaction_hash[18:26], 16)
+        transaction_index = int(transaction_hash[26:34], 16)
+        if address_index >= len(self.config.contract_addresses):
+            return None
+
+        transaction_rng = random.Random(transaction_hash)
+        return {
+            "hash": transaction_hash,
+            "nonce": hex(transaction_rng.randint(0, 10_000)),
+            "blockHash": self._get_block_hash(block_number=block_number),
+            "blockNumber": hex(block_number),
+            "transactionIndex": hex(transaction_index + address_index * _MAX_TRANSACTIONS_PER_ADDRESS),
+            "from": self._get_address(value=transaction_rng.randint(1, 1_000)),
+            "to": self.config.contract_addresses[address_index],
+            "value": "0x0",
+            "gas": hex(transaction_rng.randint(100_000, 300_000)),
+            "gasPrice": hex(transaction_rng.randint(10**9, 10**11)),
+            "input": "0x",
+            "type": "0x0",
+            "v": "0x1b",
+            "r": "0x" + "1" * 64,
+            "s": "0x" + "2" * 64,
+        }
+
+    def get_block(self, block_number: int) -> typing.Dict:
+        return {
+            "number": hex(block_number),
+            "hash": self._get_block_hash(block_number=block_number),
+            "parentHash": self._get_block_hash(block_number=block_number - 1),
+            "timestamp": hex(_GENESIS_TIMESTAMP + block_number * _BLOCK_TIME_SECONDS),
+            "miner": _ZERO_ADDRESS,
+            "gasLimit": hex(30_000_000),
+            "gasUsed": "0x0",
+            "transactions": [],
+            "uncles": [],
+        }
+
+    def _get_block_transactions(self, address: str, block_number: int) -> typing.List[typing.Dict]:
+        address_index = self._contract_address_indexes[address.lower()]
+        block_rng = random.Random("{}:{}:{}".format(self.config.seed, address_index, block_number))
+        transactions_per_block = self.config.transactions_per_block
+        transaction_count = min(
+            int(transactions_per_block)
+            + (1 if block_rng.random() < transactions_per_block - int(transactions_per_block) else 0),
+            _MAX_TRANSACTIONS_PER_ADDRESS,
+        )
+
+        transactions = []
+        for transaction_index in range(transaction_count):
+            sender = self._get_address(value=block_rng.randint(1, 1_000))
+            reserve0 = block_rng.randint(10**20, 10**24)
+            reserve1 = block_rng.randint(10**20, 10**24)
+            sync_log = (
+                [uniswap_v2_constants.EVENT_NAMES_SIGNATURE_MAP["Sync"]],
+                self._encode_words(reserve0, reserve1),
+            )
+            transaction_kind = block_rng.random()
+            if transaction_kind < 0.8:
+                amount_in = block_rng.randint(10**15, 10**20)
+                amount_out = block_rng.randint(10**15, 10**20)
+                logs = [
+                    sync_log,
+                    (
+                        [
+                            uniswap_v2_constants.EVENT_NAMES_SIGNATURE_MAP["Swap"],
+                            self._to_topic(address=sender),
+                            self._to_topic(address=sender),
+                        ],
+                        self._encode_words(amount_in, 0, 0, amount_out),
+                    ),
+                ]
+            elif transaction_kind < 0.9:
+                liquidity = block_rng.randint(10**15, 10**20)
+                logs = [
+                    (
+                        [
+                            uniswap_v2_constants.EVENT_NAMES_SIGNATURE_MAP["Transfer"],
+                            self._to_topic(address=_ZERO_ADDRESS),
+                            self._to_topic(address=sender),
+                        ],
+                        self._encode_words(liquidity),
+                    ),
+                    sync_log,
+                    (
+                        [uniswap_v2_constants.EVENT_NAMES_SIGNATURE_MAP["Mint"], self._to_topic(address=sender)],
+                        self._encode_words(liquidity, liquidity),
+                    ),
+                ]
+            else:
+                liquidity = block_rng.randint(10**15, 10**20)
+                address = self.config.contract_addresses[address_index]
+                logs = [
+                    (
+                        [
+                            uniswap_v2_constants.EVENT_NAMES_SIGNATURE_MAP["Transfer"],
+                            self._to_topic(address=sender),
+                            self._to_topic(address=address),
+                        ],
+                        self._encode_words(liquidity),
+                    ),
+                    (
+                        [
+                            uniswap_v2_constants.EVENT_NAMES_SIGNATURE_MAP["Transfer"],
+                            self._to_topic(address=address),
+                            self._to_topic(address=_ZERO_ADDRESS),
+                        ],
+                        self._encode_words(liquidity),
+                    ),
+                    sync_log,
+                    (
+                        [
+                            uniswap_v2_constants.EVENT_NAMES_SIGNATURE_MAP["Burn"],
+                            self._to_topic(address=sender),
+                            self._to_topic(address=sender),
+                        ],
+                        self._encode_words(liquidity, liquidity),
+                    ),
+                ]
+
+            transactions.append(
+                {
+                    "hash": "0x{:016x}{:08x}{:08x}{}".format(
+                        block_number,
+                        address_index,
+                        transaction_index,
+                        hashlib.sha256("{}:{}".format(self.config.seed, block_number).encode()).hexdigest()[:32],
+                    ),
+                    "transaction_index": transaction_index + address_index * _MAX_TRANSACTIONS_PER_ADDRESS,
+                    "logs": logs,
+                }
+            )
+
+        return transactions
+
+    def _get_pair_created_log(self, block_number: int) -> typing.Optional[typing.Tuple[typing.List[str], str, str]]:
+        if not self.config.factory_address:
+            return None
+
+        address_index = block_number - self.config.factory_start_block
+        if not 0 <= address_index < len(self.config.contract_addresses):
+            return None
+
+        return (
+            [
+                uniswap_v2_constants.PAIR_CREATED_EVENT_SIGNATURE,
+                self._to_topic(address=self._get_address(value=10_000 + 2 * address_index)),
+                self._to_topic(address=self._get_address(value=10_001 + 2 * address_index)),
+            ],
+            "0x"
+            + self._to_topic(address=self.config.contract_addresses[address_index])[2:]
+            + "{:064x}".format(address_index + 1),
+            "0x" + hashlib.sha256("pair:{}:{}".format(self.config.seed, address_index).encode()).hexdigest(),
+        )
+
+    def _count_request(self, method: str) -> None:
+        with self._request_counts_lock:
+            self.request_counts[method] += 1
+
+    def _to_block_number(self, block_identifier: typing.Union[str, int]) -> int:
+        if block_identifier == "earliest":
+            return 0
+        if block_identifier in ("latest", "pending", "safe", "finalized"):
+            return self.config.latest_block
+        if isinstance(block_identifier, int):
+            return block_identifier
+
+        return int(block_identifier, 16)
+
+    @staticmethod
+    def _get_block_hash(block_number: int) -> str:
+        return "0x" + hashlib.sha256("block:{}".format(block_number).encode()).hexdigest()
+
+    @staticmethod
+    def _get_address(value: int) -> str:
+        return "0x{:040x}".format(value)
+
+    @staticmethod
+    def _to_topic(address: str) -> str:
+        return "0x" + address[2:].lower().rjust(64, "0")
+
+    @staticmethod
+    def _encode_words(*values: int) -> str:
+        return "0x" + "".join("{:064x}".format(value) for value in values)
@@ -0,0 +1,259 @@
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+import typing
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection
+
+from benchmarks import fake_node
+from src import enums, metrics
+
+logger = logging.getLogger(__name__)
+log_prefix = "[IMPORT-BENCHMARK]"
+
+
+def get_parsed_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="Import benchmark",
+        description="Runs LiquidityPoolImporter and LiquidityPoolExporter end to end against a fake EVM node.",
+    )
+    parser.add_argument("--chain", type=str, default="PULSE", help="Chain from CHAIN_DEX_LP_CONFIG to benchmark.")
+    parser.add_argument("--dex", type=str, default="PULSEX", help="DEX from CHAIN_DEX_LP_CONFIG to benchmark.")
+    parser.add_argument(
+        "--pool",
+        type=str,
+        action="append",
+        help="Liquidity pool to benchmark. Can be repeated, defaults to all pools of the DEX.",
+    )
+    parser.add_argument("--blocks", type=int, default=2000, help="Number of blocks to import per pool.")
+    parser.add_argument(
+        "--transactions-per-block",
+        type=float,
+        default=1.0,
+        help="Average number of transactions per block and pool served by the fake node.",
+    )
+    parser.add_argument(
+        "--latency-ms", type=float, default=0.0, help="Latency the fake node adds to every HTTP request."
+    )
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="Share of HTTP requests the fake node fails with status 503."
+    )
+    parser.add_argument(
+        "--max-events-block-diff", type=int, help="Overrides block window size of the DEX configuration."
+    )
+    parser.add_argument(
+        "--web3-only",
+        action="store_true",
+        help="Disables the raw JSON-RPC client so that all node calls go through web3.",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic chain.")
+    parser.add_argument("--output-file", type=str, help="Path to the JSON report file.")
+    parser.add_argument(
+        "--baseline-file", type=str, help="Path to a JSON report to compare against. Exits with 1 on regression."
+    )
+    parser.add_argument(
+        "--max-regression",
+        type=float,
+        default=0.2,
+        help="Allowed relative regression of any metric compared to the baseline.",
+    )
+    return parser.parse_args()
+
+
+def run_import(
+    chain: enums.Chain,
+    dex: enums.Dex,
+    liquidity_pools: typing.List[enums.LiquidityPool],
+    node: fake_node.FakeEvmNode,
+    blocks: int,
+) -> typing.Dict:
+    from src import models
+    from src.clients.dex import factory
+    from src.services import lp_importer as lp_importer_services
+
+    for liquidity_pool in liquidity_pools:
+        models.LiquidityPoolImporterBlockReference.objects.create(
+            chain=chain.value,
+            chain_name=chain.name,
+            dex=dex.value,
+            dex_name=dex.name,
+            liquidity_pool=liquidity_pool.value,
+            liquidity_pool_name=liquidity_pool.name,
+            block_number=node.config.latest_block - blocks,
+            block_hash="",
+        )
+
+    node.reset_request_counts()
+    query_counter = metrics.QueryCounter()
+    started_at = time.perf_counter()
+    with connection.execute_wrapper(query_counter):
+        for liquidity_pool in liquidity_pools:
+            lp_importer_services.LiquidityPoolImporter(
+                dex_provider_client=factory.DexProviderFactory.create(
+                    chain=chain, dex=dex, liquidity_pool=liquidity_pool
+                )
+            ).import_liquidity_provider_data()
+    duration = time.perf_counter() - started_at
+
+    return _get_stage_report(
+        events=models.TransactionEvent.objects.count(),
+        duration=duration,
+        rpc_calls=node.total_request_count,
+        http_requests=node.request_counts["http"],
+        query_counter=query_counter,
+    )
+
+
+def run_export(
+    chain: enums.Chain,
+    dex: enums.Dex,
+    liquidity_pools: typing.List[enums.LiquidityPool],
+    node: fake_node.FakeEvmNode,
+    output_dir: Path,
+) -> typing.Dict:
+    from src.clients.dex import factory
+    from src.services import lp_exporter as lp_exporter_services
+
+    node.reset_request_counts()
+    query_counter = metrics.QueryCounter()
+    events = 0
+    started_at = time.perf_counter()
+    with connection.execute_wrapper(query_counter):
+        for liquidity_pool in liquidity_pools:
+            exporter = lp_exporter_services.LiquidityPoolExporter(
+                dex_provider_client=factory.DexProviderFactory.create(
+                    chain=chain, dex=dex, liquidity_pool=liquidity_pool
+                )
+            )
+            data = exporter.get_liquidity_provider_data()
+            exporter.persist_pickle(data=data, path=str(output_dir / liquidity_pool.name.lower()), overwrite_file=True)
+            events += len(data)
+    duration = time.perf_counter() - started_at
+
+    return _get_stage_report(
+        events=events,
+        duration=duration,
+        rpc_calls=node.total_request_count,
+        http_requests=node.request_counts["http"],
+        query_counter=query_counter,
+    )
+
+
+def _get_stage_report(
+    events: int, duration: float, rpc_calls: int, http_requests: int, query_counter: metrics.QueryCounter
+) -> typing.Dict:
+    return {
+        "events": events,
+        "duration_seconds": round(duration, 3),
+        "events_per_second": round(events / duration, 1) if duration else 0.0,
+        "rpc_calls": rpc_calls,
+        "http_requests": http_requests,
+        "rpc_calls_per_event": round(rpc_calls / events, 4) if events else 0.0,
+        "db_queries": query_counter.count,
+        "db_queries_per_event": round(query_counter.count / events, 4) if events else 0.0,
+        "db_seconds": round(query_counter.duration, 3),
+    }
+
+
+def get_regressions(report: typing.Dict, baseline: typing.Dict, max_regression: float) -> typing.List[str]:
+    regressions = []
+    for stage in ("import", "export"):
+        if stage not in baseline:
+            continue
+
+        current, previous = report[stage], baseline[stage]
+        if current["events_per_second"] < previous["events_per_second"] * (1 - max_regression):
+            regressions.append(
+                "{} events_per_second dropped from {} to {}".format(
+                    stage, previous["events_per_second"], current["events_per_second"]
+                )
+            )
+        for metric in ("rpc_calls_per_event", "db_queries_per_event"):
+            if current[metric] > previous[metric] * (1 + max_regression):
+                regressions.append("{} {} grew from {} to {}".format(stage, metric, previous[metric], current[metric]))
+
+    return regressions
+
+
+def main() -> None:
+    args = get_parsed_args()
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "benchmarks.settings")
+    django.setup()
+
+    chain = enums.Chain[args.chain]
+    dex = enums.Dex[args.dex]
+    chain_config = settings.CHAIN_DEX_LP_CONFIG[chain.name]
+    dex_config = chain_config["dexes"][dex.name]
+    liquidity_pools = [enums.LiquidityPool[pool] for pool in args.pool or dex_config["pools"]]
+    if args.max_events_block_diff:
+        dex_config["max_events_block_diff"] = args.max_events_block_diff
+    if args.web3_only:
+        chain_config["json_rpc"] = {"enabled": False}
+    # Synthetic chain does not reorganize, all of its blocks are imported.
+    chain_config["confirmation_blocks"] = 0
+
+    connection.close()
+    Path(settings.DATABASES["default"]["NAME"]).unlink(missing_ok=True)
+    call_command("migrate", verbosity=0)
+
+    node_config = fake_node.FakeEvmNodeConfig(
+        contract_addresses=[
+            dex_config["pools"][liquidity_pool.name]["contract_address"] for liquidity_pool in liquidity_pools
+        ],
+        transactions_per_block=args.transactions_per_block,
+        latency_seconds=args.latency_ms / 1000,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    )
+    with fake_node.FakeEvmNode(config=node_config) as node:
+        chain_config["validator_node_urls"] = [node.url]
+        report = {
+            "parameters": {
+                "chain": chain.name,
+                "dex": dex.name,
+                "pools": [liquidity_pool.name for liquidity_pool in liquidity_pools],
+                "blocks": args.blocks,
+                "transactions_per_block": args.transactions_per_block,
+                "latency_ms": args.latency_ms,
+                "error_rate": args.error_rate,
+                "max_events_block_diff": dex_config.get(
+                    "max_events_block_diff", chain_config.get("max_events_block_diff")
+                ),
+                "seed": args.seed,
+                "web3_only": args.web3_only,
+            },
+            "import": run_import(chain=chain, dex=dex, liquidity_pools=liquidity_pools, node=node, blocks=args.blocks),
+            "export": run_export(
+                chain=chain,
+                dex=dex,
+                liquidity_pools=liquidity_pools,
+                node=node,
+                output_dir=settings.BENCHMARK_DIR,
+            ),
+        }
+
+    print(json.dumps(report, indent=2))
+    if args.output_file:
+        with open(args.output_file, "w") as output_file:
+            json.dump(report, output_file, indent=2)
+
+    if args.baseline_file:
+        with open(args.baseline_file) as baseline_file:
+            regressions = get_regressions(
+                report=report, baseline=json.load(baseline_file), max_regression=args.max_regression
+            )
+        for regression in regressions:
+            logger.error("{} Regression: {}.".format(log_prefix, regression))
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+import copy
+import os
+import tempfile
+from pathlib import Path
+
+from settings import *  # noqa: F401,F403
+from settings import CHAIN_DEX_LP_CONFIG, LOGGING, LP_RPC_CACHE
+
+BENCHMARK_DIR = Path(os.environ.get("BENCHMARK_DIR", Path(tempfile.gettempdir()) / "lp_indexer_benchmark"))
+BENCHMARK_DIR.mkdir(parents=True, exist_ok=True)
+
+DATABASES = {
+    "default": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": BENCHMARK_DIR / "benchmark_db.sqlite3",
+    }
+}
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "OPTIONS": {"MAX_ENTRIES": 100_000},
+    }
+}
+
+LP_EVENT_STORE_DIR = BENCHMARK_DIR / "event_stores"
+
+LP_RPC_CACHE = {**LP_RPC_CACHE, "directory": BENCHMARK_DIR / "rpc_cache"}
+
+LOGGING = copy.deepcopy(LOGGING)
+LOGGING["handlers"]["log_file"]["filename"] = BENCHMARK_DIR / "benchmark.log"
+LOGGING["handlers"]["console"]["level"] = "WARNING"
+
+CHAIN_DEX_LP_CONFIG = copy.deepcopy(CHAIN_DEX_LP_CONFIG)
@@ -0,0 +1,179 @@
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import time
+import typing
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection, transaction
+
+# Journal and commit strategy of the importer before and after `SQLITE_PRAGMAS` and window commits.
+PROFILES = {
+    "default": {"pragmas": {}, "commit_every": 1},
+    "tuned": {"pragmas": None, "commit_every": None},
+}
+
+
+def get_parsed_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="SQLite benchmark",
+        description="Measures transaction and event inserts/sec on SQLite with and without SQLITE_PRAGMAS and window "
+        "commits while a reader repeatedly exports the written pool.",
+    )
+    parser.add_argument("--events", type=int, default=20_000, help="Number of events to insert per profile.")
+    parser.add_argument(
+        "--events-per-transaction", type=int, default=4, help="Number of events sharing one transaction."
+    )
+    parser.add_argument(
+        "--window-events", type=int, default=1000, help="Number of events committed at once by the tuned profile."
+    )
+    parser.add_argument("--no-reader", action="store_true", help="Disables the concurrent export reader.")
+    parser.add_argument("--output-file", type=str, help="Path to the JSON report file.")
+    return parser.parse_args()
+
+
+def run_profile(
+    name: str,
+    pragmas: typing.Dict[str, typing.Any],
+    commit_every: int,
+    events_count: int,
+    events_per_transaction: int,
+    with_reader: bool,
+) -> typing.Dict:
+    from src import models
+
+    database_path = Path(settings.BENCHMARK_DIR) / "sqlite_benchmark_{}.sqlite3".format(name)
+    for path in database_path.parent.glob("{}*".format(database_path.name)):
+        path.unlink()
+
+    connection.close()
+    connection.settings_dict["NAME"] = database_path
+    settings.SQLITE_PRAGMAS = pragmas
+    call_command("migrate", verbosity=0)
+
+    contract_address = "0x" + "ab" * 20
+    reader = ExportReader(database_path=database_path, contract_address=contract_address)
+    if with_reader:
+        reader.start()
+
+    started_at = time.perf_counter()
+    inserted_rows_count = 0
+    for window_start in range(0, events_count, commit_every):
+        with transaction.atomic():
+            for index in range(window_start, min(window_start + commit_every, events_count)):
+                transaction_index = index // events_per_transaction
+                if index % events_per_transaction == 0:
+                    tx = models.Transaction.objects.create(
+                        transaction_hash="0x{:064x}".format(transaction_index),
+                        transaction_index=transaction_index % 100,
+                        contract_address=contract_address,
+                        block_number=transaction_index,
+                        block_hash="0x{:064x}".format(transaction_index),
+                        from_address="0x" + "cd" * 20,
+                        to_address=contract_address,
+                        gas=21000,
+                        gas_price=10**9,
+                    )
+                    inserted_rows_count += 1
+                models.TransactionEvent.objects.create(
+                    name="Swap",
+                    topics=json.dumps(["0x" + "ef" * 32]),
+                    data="0x" + "00" * 128,
+                    log_index=index % events_per_transaction,
+                    contract_address=contract_address,
+                    block_number=transaction_index,
+                    transaction_id=tx.id,
+                )
+                inserted_rows_count += 1
+    duration = time.perf_counter() - started_at
+    reader.stop()
+    connection.close()
+
+    return {
+        "pragmas": pragmas,
+        "commit_every": commit_every,
+        "rows": inserted_rows_count,
+        "duration_seconds": round(duration, 3),
+        "inserts_per_second": round(inserted_rows_count / duration, 1),
+        "reader_exports": reader.exports_count,
+        "reader_locked_errors": reader.locked_errors_count,
+    }
+
+
+class ExportReader(object):
+    """
+    Repeatedly reads all events of the pool like `scripts/query_pickle.py` while the benchmark writes.
+    """
+
+    def __init__(self, database_path: Path, contract_address: str) -> None:
+        self.database_path = database_path
+        self.contract_address = contract_address
+        self.exports_count = 0
+        self.locked_errors_count = 0
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def _run(self) -> None:
+        reader_connection = sqlite3.connect(self.database_path, timeout=0)
+        while not self._stopped.is_set():
+            try:
+                reader_connection.execute(
+                    "SELECT events.name, events.topics, events.data, txs.transaction_hash FROM lp_pool_transaction_event "
+                    "events INNER JOIN lp_pool_transaction txs ON txs.id = events.transaction_id "
+                    "WHERE events.contract_address = ? ORDER BY events.block_number, events.log_index",
+                    (self.contract_address,),
+                ).fetchall()
+                self.exports_count += 1
+            except sqlite3.OperationalError:
+                self.locked_errors_count += 1
+            time.sleep(0.01)
+        reader_connection.close()
+
+
+def main() -> None:
+    args = get_parsed_args()
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "benchmarks.settings")
+    django.setup()
+
+    report = {
+        "parameters": {
+            "events": args.events,
+            "events_per_transaction": args.events_per_transaction,
+            "window_events": args.window_events,
+            "reader": not args.no_reader,
+        },
+        "profiles": {},
+    }
+    tuned_pragmas = settings.SQLITE_PRAGMAS
+    for name, profile in PROFILES.items():
+        report["profiles"][name] = run_profile(
+            name=name,
+            pragmas=tuned_pragmas if profile["pragmas"] is None else profile["pragmas"],
+            commit_every=profile["commit_every"] or args.window_events,
+            events_count=args.events,
+            events_per_transaction=args.events_per_transaction,
+            with_reader=not args.no_reader,
+        )
+    settings.SQLITE_PRAGMAS = tuned_pragmas
+
+    print(json.dumps(report, indent=2, default=str))
+    if args.output_file:
+        with open(args.output_file, "w") as output_file:
+            json.dump(report, output_file, indent=2, default=str)
+
+
+if __name__ == "__main__":
+    main()
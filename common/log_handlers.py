@@ -0,0 +1,72 @@
+import copy
+import importlib
+import logging
+import logging.handlers
+import multiprocessing.util
+import os
+import queue
+import typing
+import weakref
+
+_async_handlers = weakref.WeakSet()
+
+
+class AsyncHandler(logging.Handler):
+    """
+    Puts log records on an in-memory queue and emits them through the wrapped handler from a background thread.
+
+    Can be used from `LOGGING` settings by passing dotted path of the wrapped handler in `handler_class` and its
+    arguments as remaining keys. Formatting and I/O of the wrapped handler never block the logging thread.
+    Forked processes (ex. `ProcessPoolExecutor` workers) do not inherit the background thread, it is restarted in them.
+    """
+
+    def __init__(self, handler_class: str, **handler_kwargs: typing.Any) -> None:
+        super().__init__()
+        module_name, class_name = handler_class.rsplit(".", 1)
+        self.handler = getattr(importlib.import_module(module_name), class_name)(**handler_kwargs)
+        self._start_listener()
+        _async_handlers.add(self)
+
+    def setFormatter(self, fmt: typing.Optional[logging.Formatter]) -> None:
+        super().setFormatter(fmt)
+        self.handler.setFormatter(fmt)
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+
+        return record
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(self.prepare(record))
+        except Exception:
+            self.handleError(record)
+
+    def flush(self) -> None:
+        self.handler.flush()
+
+    def close(self) -> None:
+        self._stop_listener()
+        self.handler.close()
+        super().close()
+
+    def _start_listener(self) -> None:
+        self.queue = queue.SimpleQueue()
+        self._listener = logging.handlers.QueueListener(self.queue, self.handler)
+        self._listener.start()
+
+    def _stop_listener(self) -> None:
+        if self._listener._thread:
+            self._listener.stop()
+
+
+def _restart_listeners() -> None:
+    for handler in list(_async_handlers):
+        handler._start_listener()
+        # `multiprocessing` children exit without `atexit` hooks, its finalizers emit the queued records instead.
+        multiprocessing.util.Finalize(handler, handler._stop_listener, exitpriority=0)
+
+
+os.register_at_fork(after_in_child=_restart_listeners)
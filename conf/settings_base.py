@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.1/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -121,13 +122,17 @@ LOGGING = {
     "handlers": {
         "console": {
             "level": "INFO",
-            "class": "logging.StreamHandler",
+            "class": "common.log_handlers.AsyncHandler",
+            "handler_class": "logging.StreamHandler",
             "formatter": "verbose",
         },
         "log_file": {
             "level": "DEBUG",
-            "class": "logging.handlers.RotatingFileHandler",
+            "class": "common.log_handlers.AsyncHandler",
+            "handler_class": "logging.handlers.RotatingFileHandler",
             "filename": BASE_DIR / "logs/sinker.log",
+            "maxBytes": 100 * 1024 * 1024,
+            "backupCount": 5,
             "formatter": "verbose",
         },
     },
@@ -152,6 +157,17 @@ DATABASES = {
     }
 }
 
+# Applied to every SQLite connection. WAL lets readers (ex. exports) run next to the importer without blocking it,
+# commits only fsync at checkpoints with synchronous=NORMAL. Set to {} to keep SQLite defaults.
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": 5000,
+    "cache_size": -64 * 1024,
+    "mmap_size": 256 * 1024 * 1024,
+    "temp_store": "MEMORY",
+}
+
 CACHES = {
     "default": {
         "BACKEND": "django_redis.cache.RedisCache",
@@ -160,6 +176,106 @@ CACHES = {
     }
 }
 
+# Cache of imported transaction ids, event keys and block references shared by importers.
+# Entries expire after `timeout` seconds, the size is bounded by maxmemory policy of the cache server.
+LP_IMPORTER_CACHE = {
+    "alias": "default",
+    "timeout": 7 * 24 * 60 * 60,
+}
+
+# Partitioning of transaction and event tables by pool and block range, Postgres only.
+# Tables are converted with `partition_tables` command, importers then create block range partitions on demand.
+LP_PARTITIONING = {
+    "enabled": False,
+    "partition_size_blocks": 1_000_000,
+}
+
+# Directory of per pool columnar event stores appended by `update_event_store` command.
+LP_EVENT_STORE_DIR = BASE_DIR / "liquidity_provider_data"
+
+# Discovery of liquidity pools from `PairCreated` events of DEX factories (`factory` key of DEX config).
+# Discovered pools are backfilled in groups of `backfill_addresses_per_request` pools sharing one log filter.
+LP_DISCOVERY = {
+    "backfill_addresses_per_request": 100,
+}
+
+# Disk cache of JSON-RPC results (logs, transactions, blocks) of blocks at least `finality_blocks` of the chain below
+# the node head, shared by importers of a chain in `<directory>/<CHAIN>`. Chains without `finality_blocks` cache nothing.
+# Least recently used entries are removed when the cache grows over `max_size_bytes`. Only the raw JSON-RPC client (`json_rpc.enabled`) reads and writes the cache.
+LP_RPC_CACHE = {
+    "enabled": False,
+    "directory": BASE_DIR / "rpc_cache",
+    "max_size_bytes": 10 * 1024**3,
+    "compression_level": 3,
+    "methods": ["eth_getLogs", "eth_getTransactionByHash", "eth_getBlockByNumber"],
+    "head_refresh_seconds": 10,
+}
+
+# Rebuilds of derived tables (`rebuild_derived_table` command) split block ranges of pools into chunks of
+# `chunk_size_blocks` blocks derived by `workers` processes, all cores by default.
+LP_DERIVATION = {
+    "chunk_size_blocks": 100_000,
+    "workers": os.cpu_count(),
+}
+
+# USD price index of tokens per chain and DEX (`rebuild_price_index` command), derived from reserves of pools
+# (`reserves` derived table) and maintained by importers of routed pools. Tokens of `usd_tokens` are priced at 1, the
+# price of a token of `routes` is the average of its prices through the routed pools weighted by their USD liquidity,
+# the other token of a routed pool has to be priced as well. Pool names are <TOKEN0>_<TOKEN1>. Rebuilds derive
+# `batch_size_blocks` blocks at once.
+LP_PRICE_INDEX = {
+    "batch_size_blocks": 100_000,
+    "chains": {
+        "PULSE": {
+            "PULSEX": {
+                "token_decimals": {
+                    "WPLS": 18,
+                    "DAI": 18,
+                    "USDC": 6,
+                    "USDT": 6,
+                    "WBTC": 8,
+                    "WETH": 18,
+                    "stETH": 18,
+                    "PLSX": 18,
+                    "HEX": 8,
+                },
+                "usd_tokens": ["DAI", "USDC", "USDT"],
+                "routes": {
+                    "WPLS": ["WPLS_DAI", "USDC_WPLS", "WPLS_USDT"],
+                    "WBTC": ["WBTC_WPLS"],
+                    "WETH": ["WETH_WPLS"],
+                    "stETH": ["WPLS_stETH"],
+                    "PLSX": ["PLSX_WPLS"],
+                    "HEX": ["HEX_WPLS"],
+                },
+            },
+        },
+        "ETH": {
+            "UNISWAP": {
+                "token_decimals": {
+                    "WETH": 18,
+                    "DAI": 18,
+                    "USDC": 6,
+                    "USDT": 6,
+                },
+                "usd_tokens": ["DAI", "USDC", "USDT"],
+                "routes": {
+                    "WETH": ["USDC_WETH", "WETH_USDT", "DAI_WETH"],
+                },
+            },
+        },
+    },
+}
+
+# Read-only HTTP query API. Pages of fully imported block ranges are cached for `cache_timeout` seconds.
+LP_API = {
+    "cache_alias": "default",
+    "cache_timeout": 24 * 60 * 60,
+    "default_page_size": 100,
+    "max_page_size": 1000,
+    "stream_chunk_size": 500,
+}
+
 EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
 EMAIL_HOST = "smtp.gmail.com"
 EMAIL_HOST_USER = "<TAG>"
@@ -171,10 +287,37 @@ LOGGING_EMAIL_RECIPIENT_LIST = ["hajdukbet@gmail.com"]
 
 CHAIN_DEX_LP_CONFIG = {
     "PULSE": {
-        "validator_node_url": "http://localhost:8545",
+        "validator_node_urls": ["http://localhost:8545"],
+        "confirmation_blocks": 0,
+        "finality_blocks": 64,
+        "json_rpc": {
+            "enabled": True,
+            "batch_size": 100,
+        },
+        "load_balancer": {
+            "latency_ewma_alpha": 0.2,
+            "error_ewma_alpha": 0.1,
+            "error_penalty": 10,
+            "quarantine_error_threshold": 3,
+            "quarantine_seconds": 30,
+        },
+        "transport": {
+            "pool_connections": 4,
+            "pool_maxsize": 16,
+            "connect_timeout": 5,
+            "read_timeout": 60,
+            "max_retries": 5,
+            "retry_backoff_factor": 0.5,
+            "retry_backoff_max": 30,
+            "compress_responses": True,
+        },
         "dexes": {
             "PULSEX": {
                 "max_events_block_diff": 4320,
+                "factory": {
+                    "contract_address": "0x29eA7545DEf87022BAdc76323F373EA1e707C523",
+                    "start_block": 17233000,
+                },
                 "pools": {
                     "WPLS_DAI": {
                         "is_active": True,
@@ -211,5 +354,54 @@ CHAIN_DEX_LP_CONFIG = {
                 },
             }
         },
-    }
+    },
+    "ETH": {
+        "validator_node_urls": ["http://localhost:8546"],
+        "confirmation_blocks": 12,
+        "finality_blocks": 64,
+        "max_events_block_diff": 2000,
+        "json_rpc": {
+            "enabled": True,
+            "batch_size": 100,
+        },
+        "load_balancer": {
+            "latency_ewma_alpha": 0.2,
+            "error_ewma_alpha": 0.1,
+            "error_penalty": 10,
+            "quarantine_error_threshold": 3,
+            "quarantine_seconds": 30,
+        },
+        "transport": {
+            "pool_connections": 4,
+            "pool_maxsize": 16,
+            "connect_timeout": 5,
+            "read_timeout": 60,
+            "max_retries": 5,
+            "retry_backoff_factor": 0.5,
+            "retry_backoff_max": 30,
+            "compress_responses": True,
+        },
+        "dexes": {
+            "UNISWAP": {
+                "factory": {
+                    "contract_address": "0x5C69bEe701ef814a2B6a3EDD4B1652CB9cc5aA6f",
+                    "start_block": 10000835,
+                },
+                "pools": {
+                    "USDC_WETH": {
+                        "is_active": True,
+                        "contract_address": "0xB4e16d0168e52d35CaCD2c6185b44281Ec28C9Dc",
+                    },
+                    "WETH_USDT": {
+                        "is_active": True,
+                        "contract_address": "0x0d4a11d5EEaaC28EC3F61d100daF4d40471f1852",
+                    },
+                    "DAI_WETH": {
+                        "is_active": True,
+                        "contract_address": "0xA478c2975Ab1Ea89e8196811F51A7B7Ade33eB11",
+                    },
+                },
+            }
+        },
+    },
 }
@@ -0,0 +1,75 @@
+# Generated by Django 4.2.4 on 2026-10-19 11:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("src", "0004_remove_transactionevent_lp_pool_tra_name_aef13e_idx_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LiquidityPoolRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("chain", models.IntegerField()),
+                ("dex", models.IntegerField()),
+                ("liquidity_pool", models.IntegerField()),
+                ("granularity", models.IntegerField()),
+                ("bucket_start", models.BigIntegerField()),
+                ("first_block_number", models.IntegerField()),
+                ("last_block_number", models.IntegerField()),
+                ("open_price", models.FloatField(null=True)),
+                ("high_price", models.FloatField(null=True)),
+                ("low_price", models.FloatField(null=True)),
+                ("close_price", models.FloatField(null=True)),
+                ("volume_token0", models.CharField(max_length=255)),
+                ("volume_token1", models.CharField(max_length=255)),
+                ("swap_count", models.IntegerField(default=0)),
+                ("sync_count", models.IntegerField(default=0)),
+                ("mint_count", models.IntegerField(default=0)),
+                ("burn_count", models.IntegerField(default=0)),
+                ("transfer_count", models.IntegerField(default=0)),
+                ("approval_count", models.IntegerField(default=0)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "db_table": "lp_pool_rollup",
+            },
+        ),
+        migrations.AddField(
+            model_name="transaction",
+            name="block_timestamp",
+            field=models.BigIntegerField(null=True),
+        ),
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(
+                fields=["contract_address", "block_number"],
+                name="lp_pool_tra_contrac_24f34d_idx",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="liquiditypoolrollup",
+            constraint=models.UniqueConstraint(
+                fields=(
+                    "chain",
+                    "dex",
+                    "liquidity_pool",
+                    "granularity",
+                    "bucket_start",
+                ),
+                name="lp_pool_rollup_bucket_unique",
+            ),
+        ),
+    ]
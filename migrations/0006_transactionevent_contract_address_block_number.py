@@ -0,0 +1,62 @@
+# Generated by Django 4.2.4 on 2026-10-19 12:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def set_transaction_event_partition_keys(apps, schema_editor):
+    Transaction = apps.get_model("src", "Transaction")
+    TransactionEvent = apps.get_model("src", "TransactionEvent")
+    transactions = Transaction.objects.filter(id=models.OuterRef("transaction_id"))
+    TransactionEvent.objects.update(
+        contract_address=models.Subquery(transactions.values("contract_address")[:1]),
+        block_number=models.Subquery(transactions.values("block_number")[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("src", "0005_transaction_block_timestamp_liquiditypoolrollup"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="transactionevent",
+            name="contract_address",
+            field=models.CharField(max_length=255, null=True),
+        ),
+        migrations.AddField(
+            model_name="transactionevent",
+            name="block_number",
+            field=models.IntegerField(null=True),
+        ),
+        migrations.RunPython(
+            set_transaction_event_partition_keys, migrations.RunPython.noop
+        ),
+        migrations.AlterField(
+            model_name="transactionevent",
+            name="contract_address",
+            field=models.CharField(max_length=255),
+        ),
+        migrations.AlterField(
+            model_name="transactionevent",
+            name="block_number",
+            field=models.IntegerField(),
+        ),
+        migrations.AlterField(
+            model_name="transactionevent",
+            name="transaction",
+            field=models.ForeignKey(
+                db_constraint=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                to="src.transaction",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="transactionevent",
+            index=models.Index(
+                fields=["contract_address", "block_number"],
+                name="lp_pool_tra_contrac_f61391_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,86 @@
+# Generated by Django 4.2.4 on 2026-10-19 13:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("src", "0006_transactionevent_contract_address_block_number"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DexFactoryBlockReference",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("chain", models.IntegerField()),
+                ("chain_name", models.CharField(max_length=255)),
+                ("dex", models.IntegerField()),
+                ("dex_name", models.CharField(max_length=255)),
+                ("block_number", models.IntegerField()),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "db_table": "lp_dex_factory_block_reference",
+            },
+        ),
+        migrations.CreateModel(
+            name="LiquidityPool",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("chain", models.IntegerField()),
+                ("chain_name", models.CharField(max_length=255)),
+                ("dex", models.IntegerField()),
+                ("dex_name", models.CharField(max_length=255)),
+                ("contract_address", models.CharField(max_length=255)),
+                ("token0_address", models.CharField(max_length=255)),
+                ("token1_address", models.CharField(max_length=255)),
+                ("pair_index", models.BigIntegerField()),
+                ("created_block_number", models.IntegerField()),
+                ("created_transaction_hash", models.CharField(max_length=255)),
+                ("block_number", models.IntegerField(null=True)),
+                ("is_active", models.BooleanField(default=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "db_table": "lp_pool",
+                "indexes": [
+                    models.Index(
+                        fields=["chain", "dex", "block_number"],
+                        name="lp_pool_chain_7225f3_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="liquiditypool",
+            constraint=models.UniqueConstraint(
+                fields=("chain", "contract_address"),
+                name="lp_pool_contract_address_unique",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="dexfactoryblockreference",
+            constraint=models.UniqueConstraint(
+                fields=("chain", "dex"), name="lp_dex_factory_block_reference_unique"
+            ),
+        ),
+    ]
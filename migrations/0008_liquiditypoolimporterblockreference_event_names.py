@@ -0,0 +1,22 @@
+# Generated by Django 4.2.4 on 2026-10-19 12:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("src", "0007_liquiditypool_dexfactoryblockreference"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="liquiditypoolimporterblockreference",
+            name="event_names",
+            field=models.TextField(null=True),
+        ),
+        migrations.AddField(
+            model_name="liquiditypoolimporterblockreference",
+            name="start_block_number",
+            field=models.IntegerField(null=True),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 4.2.4 on 2026-10-19 12:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("src", "0008_liquiditypoolimporterblockreference_event_names"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LiquidityPoolBlockRange",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("chain", models.IntegerField()),
+                ("dex", models.IntegerField()),
+                ("liquidity_pool", models.IntegerField()),
+                ("from_block_number", models.IntegerField()),
+                ("to_block_number", models.IntegerField()),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "db_table": "lp_pool_block_range",
+                "indexes": [
+                    models.Index(
+                        fields=["chain", "dex", "liquidity_pool", "from_block_number"],
+                        name="lp_pool_blo_chain_b65b7b_idx",
+                    )
+                ],
+            },
+        ),
+    ]
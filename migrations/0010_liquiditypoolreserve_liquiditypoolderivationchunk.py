@@ -0,0 +1,85 @@
+# Generated by Django 4.2.4 on 2026-10-19 12:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("src", "0009_liquiditypoolblockrange"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LiquidityPoolDerivationChunk",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("derivation", models.CharField(max_length=255)),
+                ("version", models.IntegerField()),
+                ("chain", models.IntegerField()),
+                ("dex", models.IntegerField()),
+                ("liquidity_pool", models.IntegerField()),
+                ("from_block_number", models.IntegerField()),
+                ("to_block_number", models.IntegerField()),
+                ("row_count", models.IntegerField()),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "db_table": "lp_derivation_chunk",
+            },
+        ),
+        migrations.CreateModel(
+            name="LiquidityPoolReserve",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("chain", models.IntegerField()),
+                ("dex", models.IntegerField()),
+                ("liquidity_pool", models.IntegerField()),
+                ("block_number", models.IntegerField()),
+                ("log_index", models.IntegerField()),
+                ("reserve0", models.CharField(max_length=255)),
+                ("reserve1", models.CharField(max_length=255)),
+                ("price", models.FloatField(null=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "db_table": "lp_pool_reserve",
+                "indexes": [
+                    models.Index(
+                        fields=["chain", "dex", "liquidity_pool", "block_number"],
+                        name="lp_pool_res_chain_37fdff_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="liquiditypoolderivationchunk",
+            constraint=models.UniqueConstraint(
+                fields=(
+                    "derivation",
+                    "chain",
+                    "dex",
+                    "liquidity_pool",
+                    "from_block_number",
+                ),
+                name="lp_derivation_chunk_unique",
+            ),
+        ),
+    ]
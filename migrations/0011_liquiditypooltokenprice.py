@@ -0,0 +1,43 @@
+# Generated by Django 4.2.4 on 2026-10-19 13:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("src", "0010_liquiditypoolreserve_liquiditypoolderivationchunk"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LiquidityPoolTokenPrice",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("chain", models.IntegerField()),
+                ("dex", models.IntegerField()),
+                ("token", models.CharField(max_length=255)),
+                ("block_number", models.IntegerField()),
+                ("price", models.FloatField()),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "db_table": "lp_token_price",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="liquiditypooltokenprice",
+            constraint=models.UniqueConstraint(
+                fields=("chain", "dex", "token", "block_number"),
+                name="lp_token_price_unique",
+            ),
+        ),
+    ]
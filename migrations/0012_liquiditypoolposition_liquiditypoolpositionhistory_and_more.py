@@ -0,0 +1,122 @@
+# Generated by Django 4.2.4 on 2026-10-19 13:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("src", "0011_liquiditypooltokenprice"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LiquidityPoolPosition",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("chain", models.IntegerField()),
+                ("dex", models.IntegerField()),
+                ("liquidity_pool", models.IntegerField()),
+                ("address", models.CharField(max_length=255)),
+                ("balance", models.CharField(max_length=255)),
+                ("balance_value", models.FloatField()),
+                ("block_number", models.IntegerField()),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "db_table": "lp_position",
+            },
+        ),
+        migrations.CreateModel(
+            name="LiquidityPoolPositionHistory",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("chain", models.IntegerField()),
+                ("dex", models.IntegerField()),
+                ("liquidity_pool", models.IntegerField()),
+                ("address", models.CharField(max_length=255)),
+                ("block_number", models.IntegerField()),
+                ("balance", models.CharField(max_length=255)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "db_table": "lp_position_history",
+            },
+        ),
+        migrations.CreateModel(
+            name="LiquidityPoolTotalSupply",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("chain", models.IntegerField()),
+                ("dex", models.IntegerField()),
+                ("liquidity_pool", models.IntegerField()),
+                ("block_number", models.IntegerField()),
+                ("total_supply", models.CharField(max_length=255)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "db_table": "lp_pool_total_supply",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="liquiditypooltotalsupply",
+            constraint=models.UniqueConstraint(
+                fields=("chain", "dex", "liquidity_pool", "block_number"),
+                name="lp_pool_total_supply_unique",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="liquiditypoolpositionhistory",
+            index=models.Index(
+                fields=["chain", "dex", "liquidity_pool", "block_number"],
+                name="lp_position_chain_dd9918_idx",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="liquiditypoolpositionhistory",
+            constraint=models.UniqueConstraint(
+                fields=("chain", "dex", "liquidity_pool", "address", "block_number"),
+                name="lp_position_history_unique",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="liquiditypoolposition",
+            index=models.Index(
+                fields=["chain", "dex", "liquidity_pool", "-balance_value"],
+                name="lp_position_balance_idx",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="liquiditypoolposition",
+            constraint=models.UniqueConstraint(
+                fields=("chain", "dex", "liquidity_pool", "address"),
+                name="lp_position_unique",
+            ),
+        ),
+    ]
@@ -1,39 +1,108 @@
+"""
+Fast-start export of liquidity pool events to a pickle file without Django.
+
+Pool addresses and the database are read from the settings module (`DJANGO_SETTINGS_MODULE`, `settings` by default),
+which is plain python. Output is identical to `LiquidityPoolExporter.get_liquidity_provider_data`.
+ex. python scripts/query_pickle.py --chain=PULSE --dex=PULSEX --pool=WPLS_DAI --output-file=my_file.pkl [--overwrite]
+    python scripts/query_pickle.py --chain=PULSE --dex=PULSEX --pool=ALL --output-dir=exports [--compression=zstd]
+"""
 import argparse
+import concurrent.futures
+import importlib
 import json
 import logging
+import os
 import pickle
-import sqlite3
+import sys
+import time
 import typing
 from pathlib import Path
 
-liquidity_pool_contract_addresses = {
-    "WPLS_DAI": "0xE56043671df55dE5CDf8459710433C10324DE0aE",  # This is case-sensitive
-    # TODO: Will add others here
-}
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+FETCH_SIZE = 10_000
+
+ALL_POOLS = "ALL"
+
+COMPRESSION_FILE_SUFFIXES = {"none": "", "zstd": ".zst"}
+
+# Keys of exported rows in the order of `LiquidityPoolExporter.get_event_data`.
+EVENT_DATA_KEYS = (
+    "contract_address",
+    "event_name",
+    "topics",
+    "data",
+    "block_number",
+    "transaction_hash",
+    "transaction_index",
+    "block_hash",
+    "log_index",
+    "transaction_from_address",
+    "transaction_to_address",
+    "transaction_gas",
+    "transaction_gas_price",
+)
+
+EVENTS_QUERY = """
+    SELECT
+        events.contract_address,
+        events.name,
+        events.topics,
+        events.data,
+        events.block_number,
+        txs.transaction_hash,
+        txs.transaction_index,
+        txs.block_hash,
+        events.log_index,
+        txs.from_address,
+        txs.to_address,
+        txs.gas,
+        txs.gas_price
+    FROM lp_pool_transaction_event events INNER JOIN lp_pool_transaction txs ON txs.id = events.transaction_id
+    WHERE events.contract_address IN ({placeholders})
+    ORDER BY events.contract_address, events.block_number, events.log_index
+"""
 
 logger = logging.getLogger(__name__)
 log_prefix = "[QT2P]"
 
 
-def get_parsed_args():
+class ExportException(Exception):
+    pass
+
+
+def get_parsed_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(
         prog="QT2P - Query Transaction to Pickle",
-        description="Query stored transactional data - transactions & events to a pickle file.\nYou can filter by a given liquidity pool.",
+        description="Query stored transactional data - transactions & events of a liquidity pool to a pickle file.",
+    )
+    parser.add_argument(
+        "--chain", required=True, type=str, help="Denotes the chain on which dex of liquidity pools is hosted."
     )
+    parser.add_argument("--dex", required=True, type=str, help="Denotes the DEX on which liquidity pools are hosted.")
     parser.add_argument(
         "--pool",
         required=True,
         type=str,
-        help="Denotes the liquidity pool to be extracted.",
+        help="Denotes the liquidity pool to be extracted, a comma separated list of pools or ALL pools of the DEX.",
     )
     parser.add_argument(
-        "--sqlite-path",
-        required=True,
+        "--output-file",
+        required=False,
         type=str,
-        help="Path to the SQLite database file.",
+        help="Path to the output pickle file of a single liquidity pool, '.pkl' is appended.",
     )
     parser.add_argument(
-        "--output-file", required=True, type=str, help="Path to the output pickle file."
+        "--output-dir",
+        required=False,
+        type=str,
+        help="Directory of output files named <POOL_NAME>.pkl, required when exporting multiple liquidity pools.",
+    )
+    parser.add_argument(
+        "--sqlite-path",
+        required=False,
+        type=str,
+        help="Path to the SQLite database file, the database of the settings module is used by default.",
     )
     parser.add_argument(
         "--overwrite",
@@ -41,107 +110,259 @@ def get_parsed_args():
         action="store_true",
         help="If the target pickle file already exists it will overwrite it.",
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--compression",
+        required=False,
+        type=str,
+        default="none",
+        choices=list(COMPRESSION_FILE_SUFFIXES),
+        help="Compresses files of --output-dir, zstd requires `zstandard` package.",
+    )
+    parser.add_argument(
+        "--protocol",
+        required=False,
+        type=int,
+        default=pickle.DEFAULT_PROTOCOL,
+        choices=range(2, pickle.HIGHEST_PROTOCOL + 1),
+        help="Pickle protocol, the default one produces files identical to `manage.py query_pickle`.",
+    )
+    parser.add_argument(
+        "--workers", required=False, type=int, default=4, help="Number of threads writing output files."
+    )
+    args = parser.parse_args()
+    if not args.output_file and not args.output_dir:
+        parser.error("one of --output-file or --output-dir is required")
+
+    return args
+
 
+def get_settings() -> typing.Any:
+    sys.path.insert(0, str(BASE_DIR))
+    return importlib.import_module(os.environ.get("DJANGO_SETTINGS_MODULE", "settings"))
 
-def dict_factory(cursor, row):
+
+def get_contract_addresses(
+    settings: typing.Any, chain: str, dex: str, liquidity_pools: typing.List[str]
+) -> typing.Dict[str, str]:
     """
-    Helps transform a SQLite row to a dictionary
+    Returns liquidity pool names by checksum contract addresses, `ALL` selects all pools of the DEX.
     """
-    fields = [column[0] for column in cursor.description]
-    # return {key: (value if key != 'topics' else json.loads(value.replace("'", "\""))) for key, value in zip(fields, row)}
-    return {
-        key: (value if key != "topics" else json.loads(value))
-        for key, value in zip(fields, row)
-    }
-
-
-def query_data(liquidity_pool, db_path: str) -> typing.List[typing.Dict]:
-    sqlite_path = Path(db_path)
-    if not sqlite_path.exists():
-        msg = "SQLite file does not exist. (path={})".format(
-            db_path,
-        )
-        logger.exception("{} {}.".format(log_prefix, msg))
-        raise Exception(msg)
+    try:
+        pools_config = settings.CHAIN_DEX_LP_CONFIG[chain]["dexes"][dex]["pools"]
+        if liquidity_pools == [ALL_POOLS]:
+            liquidity_pools = list(pools_config)
 
-    if liquidity_pool not in liquidity_pool_contract_addresses:
-        msg = "Liquidity pool not supported yet. (liquidity_pool={})".format(
-            liquidity_pool,
+        return {
+            to_checksum_address(address=pools_config[liquidity_pool]["contract_address"]): liquidity_pool
+            for liquidity_pool in liquidity_pools
+        }
+    except KeyError as e:
+        msg = "Liquidity pool is not configured (chain={}, dex={}, liquidity_pool={})".format(chain, dex, e)
+        logger.error("{} {}.".format(log_prefix, msg))
+        raise ExportException(msg)
+
+
+def to_checksum_address(address: str) -> str:
+    """
+    EIP-55 checksum address as stored by importers, without importing web3.
+    """
+    from Crypto.Hash import keccak
+
+    address = address.lower().replace("0x", "")
+    address_hash = keccak.new(data=address.encode("ascii"), digest_bits=256).hexdigest()
+
+    return "0x" + "".join(
+        character.upper() if int(address_hash[index], 16) >= 8 else character for index, character in enumerate(address)
+    )
+
+
+def connect(settings: typing.Any, sqlite_path: typing.Optional[str]) -> typing.Tuple[typing.Any, str]:
+    """
+    Returns DB-API connection and its parameter placeholder.
+    """
+    database = settings.DATABASES["default"]
+    if sqlite_path or database["ENGINE"] == "django.db.backends.sqlite3":
+        import sqlite3
+
+        path = Path(sqlite_path or database["NAME"])
+        if not path.exists():
+            msg = "SQLite file does not exist (path={})".format(path)
+            logger.error("{} {}.".format(log_prefix, msg))
+            raise ExportException(msg)
+
+        return sqlite3.connect("file:{}?mode=ro".format(path), uri=True), "?"
+
+    if database["ENGINE"] == "django.db.backends.postgresql":
+        import psycopg2
+
+        return (
+            psycopg2.connect(
+                dbname=database["NAME"],
+                user=database.get("USER"),
+                password=database.get("PASSWORD"),
+                host=database.get("HOST"),
+                port=database.get("PORT") or None,
+            ),
+            "%s",
         )
-        logger.exception("{} {}.".format(log_prefix, msg))
-        raise Exception(msg)
-
-    contract_address = liquidity_pool_contract_addresses[liquidity_pool]
-    query = """
-        SELECT 
-            contract_address,
-            name,
-            topics,
-            data,
-            block_number,
-            transaction_hash,
-            transaction_index,
-            block_hash,
-            log_index,
-            from_address AS transaction_from_address,
-            to_address AS transaction_to_address,
-            gas AS transaction_gas,
-            gas_price AS transaction_gas_price
-        FROM lp_pool_transaction txs LEFT JOIN lp_pool_transaction_event events ON txs.id = events.transaction_id
-        WHERE
-            txs.contract_address = '{}'
-    """.format(
-        contract_address
+
+    msg = "Unsupported database engine (engine={})".format(database["ENGINE"])
+    logger.error("{} {}.".format(log_prefix, msg))
+    raise ExportException(msg)
+
+
+def query_data(
+    connection: typing.Any, placeholder: str, contract_addresses: typing.List[str]
+) -> typing.Iterator[typing.Tuple[str, typing.List[typing.Dict]]]:
+    """
+    Scans events of all pools once ordered by contract address and yields (contract_address, data) of every pool
+    as soon as its rows are read. Pools without events yield empty data.
+    """
+    cursor = connection.cursor()
+    cursor.execute(
+        EVENTS_QUERY.format(placeholders=", ".join([placeholder] * len(contract_addresses))),
+        tuple(contract_addresses),
     )
-    db = sqlite3.connect(sqlite_path)
-    db.row_factory = dict_factory
-    results = db.execute(query).fetchall()
 
-    return results
+    pending_contract_addresses = set(contract_addresses)
+    contract_address = None
+    data = []
+    while True:
+        rows = cursor.fetchmany(FETCH_SIZE)
+        if not rows:
+            break
+        for row in rows:
+            if row[0] != contract_address:
+                if contract_address is not None:
+                    yield contract_address, data
+                contract_address = row[0]
+                pending_contract_addresses.discard(contract_address)
+                data = []
+            event_data = dict(zip(EVENT_DATA_KEYS, row))
+            event_data["topics"] = json.loads(event_data["topics"])
+            data.append(event_data)
+    cursor.close()
+
+    if contract_address is not None:
+        yield contract_address, data
+    for contract_address in pending_contract_addresses:
+        yield contract_address, []
 
 
 def persist_pickle(
-    data: typing.List[typing.Dict], path: str, overwrite_file: bool = False
+    data: typing.List[typing.Dict],
+    path: str,
+    overwrite_file: bool = False,
+    compression: str = "none",
+    protocol: int = pickle.DEFAULT_PROTOCOL,
 ) -> None:
     file_path = Path(path)
+    output_path = Path("{}.pkl{}".format(file_path, COMPRESSION_FILE_SUFFIXES[compression]))
     if not file_path.parent.exists():
-        msg = "Directory for pickle file does not exist (path={}).".format(
-            path,
-        )
+        msg = "Directory for pickle file does not exist (path={})".format(path)
         logger.error("{} {}.".format(log_prefix, msg))
-        raise Exception(msg)
+        raise ExportException(msg)
 
-    if file_path.exists() and not overwrite_file:
-        msg = "Pickle file already exists (path={}).".format(
-            path,
-        )
+    if output_path.exists() and not overwrite_file:
+        msg = "Pickle file already exists, use --overwrite to override it (path={})".format(output_path)
         logger.error("{} {}.".format(log_prefix, msg))
-        raise Exception(msg)
+        raise ExportException(msg)
+
+    with open(output_path, "wb") as pickle_file:
+        if compression == "zstd":
+            import zstandard
 
-    with open("{}.pkl".format(file_path), "wb") as pickle_file:
-        pickle.dump(data, pickle_file)
+            with zstandard.ZstdCompressor().stream_writer(pickle_file) as compressed_file:
+                pickle.dump(data, compressed_file, protocol=protocol)
+        else:
+            pickle.dump(data, pickle_file, protocol=protocol)
 
-    logger.info("Saved data to pickle file {}".format(file_path))
+    logger.info("{} Saved data to pickle file: '{}' (events={}).".format(log_prefix, output_path, len(data)))
 
 
-def main():
+def export(
+    connection: typing.Any,
+    placeholder: str,
+    contract_addresses: typing.Dict[str, str],
+    output_paths: typing.Dict[str, Path],
+    args: argparse.Namespace,
+) -> int:
+    """
+    Reads all pools in one scan and writes every pool by a writer thread while the scan continues. At most `workers`
+    read pools wait for their writer, which bounds memory of the export.
+    """
+    exported_events_count = 0
+    with concurrent.futures.ThreadPoolExecutor(max_workers=args.workers) as executor:
+        futures = set()
+        for contract_address, data in query_data(
+            connection=connection, placeholder=placeholder, contract_addresses=list(contract_addresses)
+        ):
+            if len(futures) >= args.workers:
+                done, futures = concurrent.futures.wait(futures, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    future.result()
+            exported_events_count += len(data)
+            futures.add(
+                executor.submit(
+                    persist_pickle,
+                    data=data,
+                    path=output_paths[contract_addresses[contract_address]],
+                    overwrite_file=args.overwrite,
+                    compression=args.compression,
+                    protocol=args.protocol,
+                )
+            )
+        for future in futures:
+            future.result()
+
+    return exported_events_count
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(asctime)s %(name)s:%(lineno)s %(message)s")
     args = get_parsed_args()
-    liquidity_pool = args.pool
-    sqlite_path = args.sqlite_path
-    path = args.output_file
-    overwrite = args.overwrite
-    logger.info("{} Exporting data to file='{}'.".format(log_prefix, path))
+    started_at = time.perf_counter()
+    logger.info(
+        "{} Exporting data (chain={}, dex={}, liquidity_pools={}, output_path={}).".format(
+            log_prefix, args.chain, args.dex, args.pool, args.output_file or args.output_dir
+        )
+    )
 
     try:
-        transaction_data = query_data(
-            liquidity_pool=liquidity_pool, db_path=sqlite_path
+        settings = get_settings()
+        contract_addresses = get_contract_addresses(
+            settings=settings, chain=args.chain, dex=args.dex, liquidity_pools=args.pool.split(",")
         )
-        persist_pickle(data=transaction_data, path=path, overwrite_file=overwrite)
-    except Exception as e:
-        logger.exception(e)
+        if args.output_dir:
+            output_paths = {
+                liquidity_pool: Path(args.output_dir) / liquidity_pool for liquidity_pool in contract_addresses.values()
+            }
+        elif len(contract_addresses) == 1:
+            output_paths = {liquidity_pool: Path(args.output_file) for liquidity_pool in contract_addresses.values()}
+        else:
+            msg = "Multiple liquidity pools are exported to --output-dir"
+            logger.error("{} {}.".format(log_prefix, msg))
+            raise ExportException(msg)
+
+        connection, placeholder = connect(settings=settings, sqlite_path=args.sqlite_path)
+        try:
+            exported_events_count = export(
+                connection=connection,
+                placeholder=placeholder,
+                contract_addresses=contract_addresses,
+                output_paths=output_paths,
+                args=args,
+            )
+        finally:
+            connection.close()
+    except ExportException:
+        sys.exit(1)
 
-    logger.info("{} Done.".format(log_prefix))
+    logger.info(
+        "{} Done (liquidity_pools={}, events={}, duration_seconds={:.3f}).".format(
+            log_prefix, len(contract_addresses), exported_events_count, time.perf_counter() - started_at
+        )
+    )
 
 
 if __name__ == "__main__":
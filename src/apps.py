@@ -1,6 +1,12 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
 
 
 class CryptoConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "src"
+
+    def ready(self) -> None:
+        from src import db
+
+        connection_created.connect(db.configure_sqlite_connection, dispatch_uid="configure_sqlite_connection")
@@ -1,26 +1,51 @@
 import abc
+import logging
+import time
 import typing
+from pathlib import Path
 
 import web3
 from django.conf import settings
 
-from src import enums
+from common import utils as common_utils
+from src import enums, metrics
+from src.clients.dex import exceptions as dex_exceptions
+from src.clients.dex import json_rpc as dex_json_rpc
+from src.clients.dex import load_balancer as dex_load_balancer
 from src.clients.dex import messages as dex_messages
+from src.clients.dex import response_cache as dex_response_cache
+from src.clients.dex import transport as dex_transport
+
+logger = logging.getLogger(__name__)
 
 
 class BaseDexLPProvider(object):
     LP_CONFIG = settings.CHAIN_DEX_LP_CONFIG
+    RPC_CACHE_CONFIG = settings.LP_RPC_CACHE
+    EVENT_NAMES_SIGNATURE_MAP: typing.Dict[str, str] = {}
 
     def __init__(
-        self, chain: enums.Chain, dex: enums.Dex, liquidity_pool: enums.LiquidityPool
+        self,
+        chain: enums.Chain,
+        dex: enums.Dex,
+        liquidity_pool: typing.Optional[enums.LiquidityPool] = None,
     ) -> None:
+        """
+        Providers created without a liquidity pool serve DEX wide calls, ex. factory events
+        and events of many pool contracts at once.
+        """
         self.chain = chain
         self.dex = dex
         self.liquidity_pool = liquidity_pool
+        self._http_provider = None
         self._web3_client = None
-        self.log_prefix = "[{}-{}-{}-PROVIDER]".format(
-            self.chain.name, self.dex.name, self.liquidity_pool.name
+        self._json_rpc_client = None
+        self.log_prefix = "[{}-{}-{}PROVIDER]".format(
+            self.chain.name,
+            self.dex.name,
+            "{}-".format(self.liquidity_pool.name) if self.liquidity_pool else "",
         )
+        self.metric_labels = metrics.get_pool_labels(dex_provider_client=self)
 
     @property
     def chain_config(self) -> typing.Dict:
@@ -41,32 +66,219 @@ class BaseDexLPProvider(object):
         )
 
     @property
-    def chain_node_validator_url(self) -> str:
-        return self.chain_config["validator_node_url"]
+    def event_names(self) -> typing.List[str]:
+        """
+        Event types imported for the pool, `events` of the pool config or all events of the DEX.
+        """
+        return self.liquidity_pool_config.get("events") or list(
+            self.EVENT_NAMES_SIGNATURE_MAP
+        )
+
+    @property
+    def factory_config(self) -> typing.Optional[typing.Dict]:
+        return self.dex_config.get("factory")
+
+    @property
+    def chain_node_validator_urls(self) -> typing.List[str]:
+        if "validator_node_urls" in self.chain_config:
+            return self.chain_config["validator_node_urls"]
+
+        return [self.chain_config["validator_node_url"]]
+
+    @property
+    def load_balancer_config(self) -> typing.Dict:
+        return self.chain_config.get("load_balancer", {})
+
+    @property
+    def transport_config(self) -> typing.Dict:
+        return self.chain_config.get("transport", {})
+
+    @property
+    def json_rpc_config(self) -> typing.Dict:
+        return {
+            **dex_json_rpc.DEFAULT_JSON_RPC_CONFIG,
+            **self.chain_config.get("json_rpc", {}),
+        }
 
     @property
     def max_events_block_diff(self) -> int:
-        return self.dex_config["max_events_block_diff"]
+        if "max_events_block_diff" in self.dex_config:
+            return self.dex_config["max_events_block_diff"]
+
+        return self.chain_config["max_events_block_diff"]
+
+    @property
+    def confirmation_blocks(self) -> int:
+        return self.chain_config.get("confirmation_blocks", 0)
+
+    @property
+    def finality_blocks(self) -> int:
+        return self.chain_config.get("finality_blocks", 0)
+
+    def get_event_topics(
+        self, event_names: typing.List[str]
+    ) -> typing.Optional[typing.List[typing.List[str]]]:
+        """
+        Returns `topics` of a log filter matching any of the event types (OR of `topics[0]`),
+        `None` when all events of the DEX match.
+        """
+        unknown_event_names = set(event_names) - set(self.EVENT_NAMES_SIGNATURE_MAP)
+        if unknown_event_names:
+            msg = "Unknown event types (event_names={})".format(
+                sorted(unknown_event_names)
+            )
+            logger.error("{} {}.".format(self.log_prefix, msg))
+            raise dex_exceptions.DexProviderClientException(msg)
+
+        if set(event_names) == set(self.EVENT_NAMES_SIGNATURE_MAP):
+            return None
+
+        return [[self.EVENT_NAMES_SIGNATURE_MAP[name] for name in event_names]]
+
+    def get_http_provider(self) -> dex_load_balancer.LoadBalancedHTTPProvider:
+        if not self._http_provider:
+            self._http_provider = dex_load_balancer.LoadBalancedHTTPProvider(
+                load_balancer=dex_load_balancer.NodeLoadBalancer.get_instance(
+                    endpoint_urls=self.chain_node_validator_urls,
+                    config=self.load_balancer_config,
+                ),
+                transport=dex_transport.HttpTransport(config=self.transport_config),
+            )
+
+        return self._http_provider
 
     def get_web3_client(self) -> web3.Web3:
         if not self._web3_client:
-            self._web3_client = web3.Web3(
-                web3.Web3.HTTPProvider(endpoint_uri=self.chain_node_validator_url)
+            self._web3_client = web3.Web3(self.get_http_provider())
+            self._web3_client.middleware_onion.inject(
+                self._rpc_metrics_middleware, name="rpc_metrics", layer=0
             )
 
         return self._web3_client
 
+    def get_json_rpc_client(self) -> typing.Optional[dex_json_rpc.JsonRpcClient]:
+        """
+        Returns raw JSON-RPC client for hot calls, `None` when disabled in favour of web3.
+        """
+        if not self.json_rpc_config["enabled"]:
+            return None
+
+        if not self._json_rpc_client:
+            self._json_rpc_client = dex_json_rpc.JsonRpcClient(
+                provider=self.get_http_provider(),
+                metric_labels=self.metric_labels,
+                config=self.json_rpc_config,
+                response_cache=self.get_response_cache(),
+                finality_blocks=self.finality_blocks,
+            )
+
+        return self._json_rpc_client
+
+    def get_response_cache(
+        self,
+    ) -> typing.Optional[dex_response_cache.RpcResponseCache]:
+        if not self.RPC_CACHE_CONFIG["enabled"]:
+            return None
+
+        return dex_response_cache.RpcResponseCache.get_instance(
+            directory=Path(self.RPC_CACHE_CONFIG["directory"]) / self.chain.name,
+            chain=self.chain.name,
+            config=self.RPC_CACHE_CONFIG,
+        )
+
+    def _rpc_metrics_middleware(
+        self, make_request: typing.Callable, w3: web3.Web3
+    ) -> typing.Callable:
+        def middleware(method: str, params: typing.Any) -> typing.Dict:
+            started_at = time.perf_counter()
+            try:
+                response = make_request(method, params)
+            except Exception:
+                metrics.RPC_REQUEST_ERRORS.labels(
+                    method=method, **self.metric_labels
+                ).inc()
+                raise
+            finally:
+                metrics.RPC_REQUEST_DURATION.labels(
+                    method=method, **self.metric_labels
+                ).observe(time.perf_counter() - started_at)
+
+            if "error" in response:
+                metrics.RPC_REQUEST_ERRORS.labels(
+                    method=method, **self.metric_labels
+                ).inc()
+
+            return response
+
+        return middleware
+
     @abc.abstractmethod
     def get_transaction_events(
         self,
         from_block: typing.Union[str, int] = "earliest",
         to_block: typing.Union[str, int] = "latest",
-    ) -> typing.List[dex_messages.TransactionEvent]:
+        event_names: typing.Optional[typing.List[str]] = None,
+    ) -> dex_messages.TransactionEventBatch:
         raise NotImplementedError
 
     @abc.abstractmethod
     def get_transaction(self, transaction_hash: str) -> dex_messages.Transaction:
         raise NotImplementedError
 
+    def get_transactions(
+        self, transaction_hashes: typing.List[str]
+    ) -> typing.Dict[str, dex_messages.Transaction]:
+        return {
+            transaction_hash: self.get_transaction(transaction_hash=transaction_hash)
+            for transaction_hash in transaction_hashes
+        }
+
     def get_latest_block_number(self) -> int:
         return self.get_web3_client().eth.block_number
+
+    def get_confirmed_block_number(self) -> int:
+        """
+        Returns the latest block deep enough below the head not to be reorganized.
+        """
+        return self.get_latest_block_number() - self.confirmation_blocks
+
+    def get_block_timestamp(self, block_number: int) -> int:
+        try:
+            block = self.get_web3_client().eth.get_block(block_identifier=block_number)
+        except Exception as e:
+            msg = "Unable to get block (block_number={}). Error: {}".format(
+                block_number, common_utils.get_exception_message(exception=e)
+            )
+            logger.exception("{} {}.".format(self.log_prefix, msg))
+            raise dex_exceptions.DexProviderClientException(msg)
+
+        return block["timestamp"]
+
+    def get_block_timestamps(
+        self, block_numbers: typing.List[int]
+    ) -> typing.Dict[int, int]:
+        json_rpc_client = self.get_json_rpc_client()
+        if not json_rpc_client:
+            return {
+                block_number: self.get_block_timestamp(block_number=block_number)
+                for block_number in block_numbers
+            }
+
+        try:
+            blocks = json_rpc_client.batch_call(
+                method="eth_getBlockByNumber",
+                params_list=[
+                    [hex(block_number), False] for block_number in block_numbers
+                ],
+                block_number=max(block_numbers, default=None),
+            )
+            return {
+                block_number: int(block["timestamp"], 16)
+                for block_number, block in zip(block_numbers, blocks)
+            }
+        except Exception as e:
+            msg = "Unable to get blocks (block_numbers_count={}). Error: {}".format(
+                len(block_numbers), common_utils.get_exception_message(exception=e)
+            )
+            logger.exception("{} {}.".format(self.log_prefix, msg))
+            raise dex_exceptions.DexProviderClientException(msg)
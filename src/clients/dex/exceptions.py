@@ -8,3 +8,7 @@ class DexProviderClientException(DexProviderException):
 
 class DexProviderDataValidationError(DexProviderException):
     pass
+
+
+class DexProviderJsonRpcException(DexProviderClientException):
+    pass
@@ -6,6 +6,7 @@ from django.conf import settings
 from src import enums
 from src.clients.dex import exceptions as provider_exceptions
 from src.clients.dex.pulsex import client as pulsex_client
+from src.clients.dex.uniswap_v2 import client as uniswap_v2_client
 
 logger = logging.getLogger(__name__)
 
@@ -14,6 +15,7 @@ class DexProviderFactory(object):
     _LOG_PREFIX = "[DEX-PROVIDER-FACTORY]"
     _PROVIDER_IMPLEMENTATION_MAP = {
         enums.Dex.PULSEX: pulsex_client.PulseXDexProvider,
+        enums.Dex.UNISWAP: uniswap_v2_client.UniswapV2DexProvider,
     }
 
     @classmethod
@@ -22,7 +24,7 @@ class DexProviderFactory(object):
         chain: enums.Chain,
         dex: enums.Dex,
         liquidity_pool: enums.LiquidityPool,
-    ) -> pulsex_client.PulseXDexProvider:
+    ) -> uniswap_v2_client.UniswapV2DexProvider:
         if not settings.CHAIN_DEX_LP_CONFIG[chain.name]["dexes"][dex.name]["pools"][liquidity_pool.name][
             "is_active"
         ]:
@@ -38,3 +40,15 @@ class DexProviderFactory(object):
             raise provider_exceptions.DexProviderException(msg)
 
         return cls._PROVIDER_IMPLEMENTATION_MAP[dex](chain=chain, dex=dex, liquidity_pool=liquidity_pool)
+
+    @classmethod
+    def create_dex_client(cls, chain: enums.Chain, dex: enums.Dex) -> uniswap_v2_client.UniswapV2DexProvider:
+        """
+        Creates provider of DEX wide calls, ex. factory events and events of many pools.
+        """
+        if dex not in cls._PROVIDER_IMPLEMENTATION_MAP:
+            msg = "Dex {} is not supported".format(dex.name)
+            logger.error("{} {}.".format(cls._LOG_PREFIX, msg))
+            raise provider_exceptions.DexProviderException(msg)
+
+        return cls._PROVIDER_IMPLEMENTATION_MAP[dex](chain=chain, dex=dex)
@@ -0,0 +1,208 @@
+import itertools
+import json
+import logging
+import time
+import typing
+
+from src import metrics
+from src.clients.dex import exceptions as dex_exceptions
+from src.clients.dex import load_balancer as dex_load_balancer
+from src.clients.dex import response_cache as dex_response_cache
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_JSON_RPC_CONFIG = {
+    "enabled": True,
+    "batch_size": 100,
+}
+
+
+def dumps(data: typing.Any) -> bytes:
+    if orjson:
+        return orjson.dumps(data)
+
+    return json.dumps(data, separators=(",", ":")).encode("utf-8")
+
+
+def loads(data: bytes) -> typing.Any:
+    if orjson:
+        return orjson.loads(data)
+
+    return json.loads(data)
+
+
+def to_block_identifier(block: typing.Union[str, int]) -> str:
+    return hex(block) if isinstance(block, int) else block
+
+
+class JsonRpcClient(object):
+    """
+    Lean JSON-RPC client for hot calls bypassing web3 middlewares and result formatters.
+
+    Results are returned as decoded JSON, hex strings are kept as returned by the node. With `response_cache`
+    results of blocks at least `finality_blocks` below the node head are read from and written to the cache, nothing is
+    cached without a finality depth.
+    """
+
+    def __init__(
+        self,
+        provider: dex_load_balancer.LoadBalancedHTTPProvider,
+        metric_labels: typing.Dict[str, str],
+        config: typing.Optional[typing.Dict] = None,
+        response_cache: typing.Optional[dex_response_cache.RpcResponseCache] = None,
+        finality_blocks: int = 0,
+    ) -> None:
+        self.config = {**DEFAULT_JSON_RPC_CONFIG, **(config or {})}
+        self._provider = provider
+        self._metric_labels = metric_labels
+        self._request_ids = itertools.count()
+        self._response_cache = response_cache
+        self._finality_blocks = finality_blocks
+        self._finalized_block_number = None
+        self._finalized_block_number_refreshed_at = 0.0
+        self.log_prefix = "[JSON-RPC-CLIENT]"
+
+    def call(self, method: str, params: typing.List, block_number: typing.Optional[int] = None) -> typing.Any:
+        is_cacheable = self._is_cacheable(method=method)
+        if is_cacheable:
+            cached_result = self._get_cached_result(method=method, params=params)
+            if cached_result is not None:
+                return cached_result
+
+        response = self._send(
+            method=method,
+            request_data={"jsonrpc": "2.0", "method": method, "params": params, "id": next(self._request_ids)},
+            block_number=block_number,
+        )
+        result = self._get_result(method=method, response=response)
+
+        if is_cacheable:
+            self._set_cached_result(method=method, params=params, result=result, block_number=block_number)
+        return result
+
+    def batch_call(
+        self, method: str, params_list: typing.List[typing.List], block_number: typing.Optional[int] = None
+    ) -> typing.List[typing.Any]:
+        is_cacheable = self._is_cacheable(method=method)
+        results = [None] * len(params_list)
+        missing_indexes = []
+        for index, params in enumerate(params_list):
+            cached_result = self._get_cached_result(method=method, params=params) if is_cacheable else None
+            if cached_result is None:
+                missing_indexes.append(index)
+            else:
+                results[index] = cached_result
+
+        for index in range(0, len(missing_indexes), self.config["batch_size"]):
+            requests_data = {
+                next(self._request_ids): missing_index
+                for missing_index in missing_indexes[index : index + self.config["batch_size"]]
+            }
+            response = self._send(
+                method=method,
+                request_data=[
+                    {"jsonrpc": "2.0", "method": method, "params": params_list[missing_index], "id": request_id}
+                    for request_id, missing_index in requests_data.items()
+                ],
+                block_number=block_number,
+            )
+            if not isinstance(response, list):
+                # Nodes reply to rejected batches with a single error object.
+                self._get_result(method=method, response=response)
+
+            responses = {response_item.get("id"): response_item for response_item in response}
+            for request_id, missing_index in requests_data.items():
+                results[missing_index] = self._get_result(method=method, response=responses.get(request_id, {}))
+                if is_cacheable:
+                    self._set_cached_result(
+                        method=method,
+                        params=params_list[missing_index],
+                        result=results[missing_index],
+                        block_number=block_number,
+                    )
+
+        return results
+
+    def _send(
+        self,
+        method: str,
+        request_data: typing.Union[typing.Dict, typing.List[typing.Dict]],
+        block_number: typing.Optional[int],
+    ) -> typing.Any:
+        started_at = time.perf_counter()
+        try:
+            _, raw_response = self._provider.send_request(
+                request_data=dumps(request_data), method=method, block_number=block_number
+            )
+            return loads(raw_response)
+        except Exception:
+            metrics.RPC_REQUEST_ERRORS.labels(method=method, **self._metric_labels).inc()
+            raise
+        finally:
+            metrics.RPC_REQUEST_DURATION.labels(method=method, **self._metric_labels).observe(
+                time.perf_counter() - started_at
+            )
+
+    def _is_cacheable(self, method: str) -> bool:
+        return self._response_cache is not None and self._response_cache.is_cacheable(method=method)
+
+    def _get_cached_result(self, method: str, params: typing.List) -> typing.Optional[typing.Any]:
+        result_data = self._response_cache.get(method=method, params=params)
+        metrics.RPC_CACHE_REQUESTS.labels(
+            method=method, result="miss" if result_data is None else "hit", **self._metric_labels
+        ).inc()
+
+        return None if result_data is None else loads(result_data)
+
+    def _set_cached_result(
+        self, method: str, params: typing.List, result: typing.Any, block_number: typing.Optional[int]
+    ) -> None:
+        """
+        Caches the result if its block is finalized. The block of transactions and blocks is read from the result,
+        other results (ex. logs) are cached if the request is pinned to a finalized `block_number`.
+        """
+        # Cached results never expire, so results of blocks which may still be reorganized are not cached.
+        if result is None or self._finality_blocks <= 0:
+            return
+
+        if isinstance(result, dict):
+            result_block_number = result.get("blockNumber") or result.get("number")
+            block_number = int(result_block_number, 16) if result_block_number else None
+        if block_number is None or not self._is_finalized(block_number=block_number):
+            return
+
+        self._response_cache.set(method=method, params=params, result_data=dumps(result))
+
+    def _is_finalized(self, block_number: int) -> bool:
+        """
+        Compares the block with the node head, the head is refreshed at most every `head_refresh_seconds`
+        when the block is above the known finalized block.
+        """
+        is_refresh_due = (
+            time.monotonic() - self._finalized_block_number_refreshed_at
+            >= self._response_cache.config["head_refresh_seconds"]
+        )
+        if is_refresh_due and (self._finalized_block_number is None or block_number > self._finalized_block_number):
+            self._finalized_block_number_refreshed_at = time.monotonic()
+            try:
+                head_block_number = int(self.call(method="eth_blockNumber", params=[]), 16)
+            except Exception as e:
+                logger.warning("{} Unable to refresh head block number. Error: {}.".format(self.log_prefix, e))
+            else:
+                self._finalized_block_number = head_block_number - self._finality_blocks
+
+        return self._finalized_block_number is not None and block_number <= self._finalized_block_number
+
+    def _get_result(self, method: str, response: typing.Dict) -> typing.Any:
+        if "result" in response:
+            return response["result"]
+
+        metrics.RPC_REQUEST_ERRORS.labels(method=method, **self._metric_labels).inc()
+        msg = "JSON-RPC request failed (method={}). Error: {}".format(method, response.get("error", "missing result"))
+        logger.error("{} {}.".format(self.log_prefix, msg))
+        raise dex_exceptions.DexProviderJsonRpcException(msg)
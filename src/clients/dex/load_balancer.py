@@ -0,0 +1,243 @@
+import logging
+import random
+import threading
+import time
+import typing
+
+import requests
+from web3.providers import base as web3_base_providers
+
+from common import utils as common_utils
+from src.clients.dex import transport as dex_transport
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LOAD_BALANCER_CONFIG = {
+    "latency_ewma_alpha": 0.2,
+    "error_ewma_alpha": 0.1,
+    "error_penalty": 10,
+    "quarantine_error_threshold": 3,
+    "quarantine_seconds": 30,
+}
+
+
+class NodeEndpoint(object):
+    def __init__(self, url: str) -> None:
+        self.url = url
+        self.latency_ewma = None
+        self.error_ewma = 0.0
+        self.consecutive_errors = 0
+        self.quarantined_until = 0.0
+        self.latest_block_number = None
+
+    def is_quarantined(self, now: float) -> bool:
+        return self.quarantined_until > now
+
+    def has_block(self, block_number: typing.Optional[int]) -> bool:
+        return block_number is None or (
+            self.latest_block_number is not None and self.latest_block_number >= block_number
+        )
+
+
+class NodeLoadBalancer(object):
+    """
+    Spreads requests over validator node endpoints weighted by their measured latency and error rate.
+
+    Endpoints failing `quarantine_error_threshold` times in a row are quarantined for `quarantine_seconds`.
+    Balancers are shared per list of endpoints, so all providers of a process see the same endpoint health.
+    """
+
+    _INSTANCES = {}
+    _INSTANCES_LOCK = threading.Lock()
+
+    def __init__(self, endpoint_urls: typing.List[str], config: typing.Optional[typing.Dict] = None) -> None:
+        self.endpoints = [NodeEndpoint(url=url) for url in endpoint_urls]
+        self.config = {**DEFAULT_LOAD_BALANCER_CONFIG, **(config or {})}
+        self.log_prefix = "[NODE-LOAD-BALANCER]"
+        self._lock = threading.Lock()
+
+    @classmethod
+    def get_instance(
+        cls, endpoint_urls: typing.List[str], config: typing.Optional[typing.Dict] = None
+    ) -> "NodeLoadBalancer":
+        with cls._INSTANCES_LOCK:
+            key = tuple(endpoint_urls)
+            if key not in cls._INSTANCES:
+                cls._INSTANCES[key] = cls(endpoint_urls=endpoint_urls, config=config)
+
+        return cls._INSTANCES[key]
+
+    def get_endpoints(self, block_number: typing.Optional[int] = None) -> typing.List[NodeEndpoint]:
+        """
+        Returns endpoints in the order they should be tried for a request pinned to `block_number`.
+        """
+        with self._lock:
+            healthy_endpoints = self.get_healthy_endpoints()
+            synced_endpoints = [endpoint for endpoint in healthy_endpoints if endpoint.has_block(block_number)]
+            preferred_endpoints = self._shuffle_weighted(endpoints=synced_endpoints or healthy_endpoints)
+            remaining_endpoints = sorted(
+                [endpoint for endpoint in self.endpoints if endpoint not in preferred_endpoints],
+                key=lambda endpoint: endpoint.quarantined_until,
+            )
+
+        return preferred_endpoints + remaining_endpoints
+
+    def get_healthy_endpoints(self) -> typing.List[NodeEndpoint]:
+        now = time.monotonic()
+
+        return [endpoint for endpoint in self.endpoints if not endpoint.is_quarantined(now=now)]
+
+    def record_success(self, endpoint: NodeEndpoint, latency: float) -> None:
+        with self._lock:
+            alpha = self.config["latency_ewma_alpha"]
+            endpoint.latency_ewma = (
+                latency if endpoint.latency_ewma is None else alpha * latency + (1 - alpha) * endpoint.latency_ewma
+            )
+            endpoint.error_ewma *= 1 - self.config["error_ewma_alpha"]
+            endpoint.consecutive_errors = 0
+
+    def record_failure(self, endpoint: NodeEndpoint, error_message: str) -> None:
+        with self._lock:
+            alpha = self.config["error_ewma_alpha"]
+            endpoint.error_ewma = alpha + (1 - alpha) * endpoint.error_ewma
+            endpoint.consecutive_errors += 1
+            if endpoint.consecutive_errors >= self.config["quarantine_error_threshold"]:
+                endpoint.quarantined_until = time.monotonic() + self.config["quarantine_seconds"]
+                endpoint.consecutive_errors = 0
+                logger.warning(
+                    "{} Quarantined node endpoint for {}s (url={}). Error: {}.".format(
+                        self.log_prefix, self.config["quarantine_seconds"], endpoint.url, error_message
+                    )
+                )
+
+    def record_block_number(self, endpoint: NodeEndpoint, block_number: int) -> None:
+        with self._lock:
+            if endpoint.latest_block_number is None or block_number > endpoint.latest_block_number:
+                endpoint.latest_block_number = block_number
+
+    def _shuffle_weighted(self, endpoints: typing.List[NodeEndpoint]) -> typing.List[NodeEndpoint]:
+        measured_latencies = [endpoint.latency_ewma for endpoint in endpoints if endpoint.latency_ewma is not None]
+        default_latency = min(measured_latencies) if measured_latencies else 1.0
+        weighted_endpoints = [
+            (
+                random.random()
+                ** (
+                    ((endpoint.latency_ewma or default_latency) or 1e-6)
+                    * (1 + self.config["error_penalty"] * endpoint.error_ewma)
+                ),
+                endpoint,
+            )
+            for endpoint in endpoints
+        ]
+
+        return [endpoint for _, endpoint in sorted(weighted_endpoints, key=lambda item: item[0], reverse=True)]
+
+
+class LoadBalancedHTTPProvider(web3_base_providers.JSONBaseProvider):
+    def __init__(self, load_balancer: NodeLoadBalancer, transport: dex_transport.HttpTransport) -> None:
+        super().__init__()
+        self._load_balancer = load_balancer
+        self._transport = transport
+        self.log_prefix = "[LOAD-BALANCED-HTTP-PROVIDER]"
+
+    def make_request(self, method: str, params: typing.Any) -> typing.Dict:
+        request_data = self.encode_rpc_request(method, params)
+        if method == "eth_blockNumber":
+            response = self._get_highest_block_number_response(request_data=request_data)
+            if response:
+                return response
+
+        block_number = self._get_pinned_block_number(method=method, params=params)
+        endpoint, raw_response = self.send_request(request_data=request_data, method=method, block_number=block_number)
+        response = self.decode_rpc_response(raw_response)
+        # Nodes answer log queries beyond their head with empty results, only returned blocks prove the height.
+        if method == "eth_getBlockByNumber" and block_number is not None and response.get("result"):
+            self._load_balancer.record_block_number(endpoint=endpoint, block_number=block_number)
+
+        return response
+
+    def send_request(
+        self, request_data: bytes, method: str, block_number: typing.Optional[int] = None
+    ) -> typing.Tuple[NodeEndpoint, bytes]:
+        """
+        Sends encoded JSON-RPC request (or batch of requests of the same method) to the best endpoint
+        having `block_number` and returns the endpoint together with its raw response.
+        """
+        endpoints = self._load_balancer.get_endpoints(block_number=block_number)
+        for index, endpoint in enumerate(endpoints):
+            # Fail over to the next endpoint right away, only the last candidate retries with backoff.
+            is_last_endpoint = index == len(endpoints) - 1
+            try:
+                raw_response = self._post(
+                    endpoint=endpoint,
+                    request_data=request_data,
+                    method=method,
+                    max_retries=None if is_last_endpoint else 0,
+                )
+            except requests.RequestException as e:
+                if is_last_endpoint:
+                    raise
+                logger.warning(
+                    "{} Request failed, failing over to next node endpoint (url={}, method={}). Error: {}.".format(
+                        self.log_prefix, endpoint.url, method, common_utils.get_exception_message(exception=e)
+                    )
+                )
+                continue
+
+            return endpoint, raw_response
+
+    def _get_highest_block_number_response(self, request_data: bytes) -> typing.Optional[typing.Dict]:
+        """
+        Asks every healthy endpoint for its head so that block pinned requests know where to go.
+        """
+        highest_response = None
+        for endpoint in self._load_balancer.get_healthy_endpoints():
+            try:
+                response = self.decode_rpc_response(
+                    self._post(endpoint=endpoint, request_data=request_data, method="eth_blockNumber")
+                )
+            except requests.RequestException:
+                continue
+
+            if "result" not in response:
+                continue
+
+            self._load_balancer.record_block_number(endpoint=endpoint, block_number=int(response["result"], 16))
+            if not highest_response or int(response["result"], 16) > int(highest_response["result"], 16):
+                highest_response = response
+
+        return highest_response
+
+    def _post(
+        self, endpoint: NodeEndpoint, request_data: bytes, method: str, max_retries: typing.Optional[int] = 0
+    ) -> bytes:
+        started_at = time.perf_counter()
+        try:
+            raw_response = self._transport.post(
+                endpoint_uri=endpoint.url, data=request_data, method=method, max_retries=max_retries
+            )
+        except requests.RequestException as e:
+            self._load_balancer.record_failure(
+                endpoint=endpoint, error_message=common_utils.get_exception_message(exception=e)
+            )
+            raise
+
+        self._load_balancer.record_success(endpoint=endpoint, latency=time.perf_counter() - started_at)
+
+        return raw_response
+
+    @staticmethod
+    def _get_pinned_block_number(method: str, params: typing.Any) -> typing.Optional[int]:
+        if method == "eth_getLogs":
+            block_identifier = params[0].get("toBlock")
+        elif method == "eth_getBlockByNumber":
+            block_identifier = params[0]
+        else:
+            return None
+
+        if isinstance(block_identifier, int):
+            return block_identifier
+        if isinstance(block_identifier, str) and block_identifier.startswith("0x"):
+            return int(block_identifier, 16)
+
+        return None
@@ -1,18 +1,22 @@
+import array
+import sys
 import typing
+from collections import abc
 from dataclasses import dataclass
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class TransactionEvent:
     name: str
     contract_address: str
-    topics: typing.List[str]
+    topics: typing.Tuple[str, ...]
     data: str
     transaction_hash: str
     log_index: int
+    block_number: int
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Transaction:
     block_number: int
     block_hash: str
@@ -22,3 +26,98 @@ class Transaction:
     gas_price: int
     transaction_hash: str
     transaction_index: int
+
+
+@dataclass(frozen=True, slots=True)
+class PairCreatedEvent:
+    pair_address: str
+    token0_address: str
+    token1_address: str
+    pair_index: int
+    transaction_hash: str
+    log_index: int
+    block_number: int
+
+
+class TransactionEventBatch(abc.Sequence):
+    """
+    Transaction events of one block window stored in parallel arrays.
+
+    Behaves as a sequence of `TransactionEvent`, which are created on access. Repeated values
+    (event names, contract addresses, event signatures) are interned so that every batch keeps a single copy.
+    """
+
+    __slots__ = (
+        "names",
+        "contract_addresses",
+        "topics",
+        "data",
+        "transaction_hashes",
+        "log_indexes",
+        "block_numbers",
+    )
+
+    def __init__(self) -> None:
+        self.names = []
+        self.contract_addresses = []
+        self.topics = []
+        self.data = []
+        self.transaction_hashes = []
+        self.log_indexes = array.array("q")
+        self.block_numbers = array.array("q")
+
+    @classmethod
+    def from_events(cls, transaction_events: typing.Iterable[TransactionEvent]) -> "TransactionEventBatch":
+        batch = cls()
+        for transaction_event in transaction_events:
+            batch.append(
+                name=transaction_event.name,
+                contract_address=transaction_event.contract_address,
+                topics=transaction_event.topics,
+                data=transaction_event.data,
+                transaction_hash=transaction_event.transaction_hash,
+                log_index=transaction_event.log_index,
+                block_number=transaction_event.block_number,
+            )
+
+        return batch
+
+    def append(
+        self,
+        name: str,
+        contract_address: str,
+        topics: typing.Iterable[str],
+        data: str,
+        transaction_hash: str,
+        log_index: int,
+        block_number: int,
+    ) -> None:
+        self.names.append(sys.intern(name))
+        self.contract_addresses.append(sys.intern(contract_address))
+        topics = tuple(topics)
+        self.topics.append((sys.intern(topics[0]),) + topics[1:] if topics else topics)
+        self.data.append(data)
+        self.transaction_hashes.append(transaction_hash)
+        self.log_indexes.append(log_index)
+        self.block_numbers.append(block_number)
+
+    def __len__(self) -> int:
+        return len(self.log_indexes)
+
+    def __getitem__(self, index: int) -> TransactionEvent:
+        if isinstance(index, slice):
+            raise TypeError("{} does not support slicing.".format(type(self).__name__))
+
+        return TransactionEvent(
+            name=self.names[index],
+            contract_address=self.contract_addresses[index],
+            topics=self.topics[index],
+            data=self.data[index],
+            transaction_hash=self.transaction_hashes[index],
+            log_index=self.log_indexes[index],
+            block_number=self.block_numbers[index],
+        )
+
+    def __iter__(self) -> typing.Iterator[TransactionEvent]:
+        for index in range(len(self)):
+            yield self[index]
@@ -0,0 +1,155 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import typing
+import zlib
+from pathlib import Path
+
+from src import metrics
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RPC_RESPONSE_CACHE_CONFIG = {
+    "enabled": False,
+    "max_size_bytes": 10 * 1024**3,
+    "compression_level": 3,
+    "methods": ["eth_getLogs", "eth_getTransactionByHash", "eth_getBlockByNumber"],
+    "head_refresh_seconds": 10,
+}
+
+# Share of `max_size_bytes` kept after eviction, so that eviction does not run on every write of a full cache.
+_EVICTION_TARGET_RATIO = 0.9
+
+
+class RpcResponseCache(object):
+    """
+    Content-addressed disk cache of serialized JSON-RPC results of one chain.
+
+    Results are stored compressed (zstd if `zstandard` is installed, zlib otherwise) in `<directory>/<aa>/<key>`
+    files, where the key is the sha256 of the method and params. Only results of finalized blocks are stored by
+    `JsonRpcClient`, so entries never expire. When the cache grows over `max_size_bytes` least recently used
+    entries are removed.
+    """
+
+    _INSTANCES = {}
+    _INSTANCES_LOCK = threading.Lock()
+
+    def __init__(
+        self, directory: typing.Union[str, Path], chain: str, config: typing.Optional[typing.Dict] = None
+    ) -> None:
+        self.config = {**DEFAULT_RPC_RESPONSE_CACHE_CONFIG, **(config or {})}
+        self.directory = Path(directory)
+        self.chain = chain
+        self._suffix = ".zst" if zstandard else ".zlib"
+        self._size = None
+        self._lock = threading.Lock()
+        self.log_prefix = "[{}-RPC-RESPONSE-CACHE]".format(chain)
+
+    @classmethod
+    def get_instance(
+        cls, directory: typing.Union[str, Path], chain: str, config: typing.Optional[typing.Dict] = None
+    ) -> "RpcResponseCache":
+        with cls._INSTANCES_LOCK:
+            key = str(Path(directory).resolve())
+            if key not in cls._INSTANCES:
+                cls._INSTANCES[key] = cls(directory=directory, chain=chain, config=config)
+
+        return cls._INSTANCES[key]
+
+    def is_cacheable(self, method: str) -> bool:
+        return method in self.config["methods"]
+
+    def get(self, method: str, params: typing.List) -> typing.Optional[bytes]:
+        """
+        Returns the serialized cached result, `None` on a miss.
+        """
+        path = self._get_path(method=method, params=params)
+        try:
+            with open(path, "rb") as cache_file:
+                data = cache_file.read()
+            # Access time is kept in mtime for eviction, filesystems are often mounted with noatime.
+            os.utime(path)
+            return self._decompress(data=data)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning("{} Unable to read cache entry (path={}). Error: {}.".format(self.log_prefix, path, e))
+            return None
+
+    def set(self, method: str, params: typing.List, result_data: bytes) -> None:
+        path = self._get_path(method=method, params=params)
+        data = self._compress(data=result_data)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            temporary_path = path.with_name("{}.{}.{}.tmp".format(path.name, os.getpid(), threading.get_ident()))
+            with open(temporary_path, "wb") as cache_file:
+                cache_file.write(data)
+            os.replace(temporary_path, path)
+        except OSError as e:
+            logger.warning("{} Unable to write cache entry (path={}). Error: {}.".format(self.log_prefix, path, e))
+            return
+
+        with self._lock:
+            self._size = (self._get_size() if self._size is None else self._size) + len(data)
+            if self._size > self.config["max_size_bytes"]:
+                self._evict()
+            metrics.RPC_CACHE_SIZE_BYTES.labels(chain=self.chain).set(self._size)
+
+    def _evict(self) -> None:
+        entries = []
+        for path in self.directory.glob("*/*{}".format(self._suffix)):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        self._size = sum(size for _, size, _ in entries)
+        target_size = self.config["max_size_bytes"] * _EVICTION_TARGET_RATIO
+        evicted_entries_count = 0
+        for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+            if self._size <= target_size:
+                break
+            path.unlink(missing_ok=True)
+            self._size -= size
+            evicted_entries_count += 1
+
+        logger.info(
+            "{} Evicted least recently used entries (evicted_entries={}, size_bytes={}).".format(
+                self.log_prefix, evicted_entries_count, self._size
+            )
+        )
+
+    def _get_size(self) -> int:
+        size = 0
+        for path in self.directory.glob("*/*{}".format(self._suffix)):
+            try:
+                size += path.stat().st_size
+            except FileNotFoundError:
+                continue
+
+        return size
+
+    def _get_path(self, method: str, params: typing.List) -> Path:
+        key = hashlib.sha256(json.dumps([method, params], separators=(",", ":")).encode("utf-8")).hexdigest()
+        return self.directory / key[:2] / "{}{}".format(key, self._suffix)
+
+    def _compress(self, data: bytes) -> bytes:
+        if zstandard:
+            return zstandard.ZstdCompressor(level=self.config["compression_level"]).compress(data)
+
+        return zlib.compress(data, self.config["compression_level"])
+
+    @staticmethod
+    def _decompress(data: bytes) -> bytes:
+        if zstandard:
+            return zstandard.ZstdDecompressor().decompress(data)
+
+        return zlib.decompress(data)
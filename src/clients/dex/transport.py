@@ -0,0 +1,109 @@
+import logging
+import random
+import threading
+import time
+import typing
+
+import requests
+from requests import adapters as requests_adapters
+
+from common import utils as common_utils
+from src import metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TRANSPORT_CONFIG = {
+    "pool_connections": 4,
+    "pool_maxsize": 16,
+    "connect_timeout": 5,
+    "read_timeout": 60,
+    "max_retries": 5,
+    "retry_backoff_factor": 0.5,
+    "retry_backoff_max": 30,
+    "compress_responses": True,
+}
+
+IDEMPOTENT_RPC_METHODS = frozenset(
+    [
+        "eth_blockNumber",
+        "eth_call",
+        "eth_chainId",
+        "eth_getBlockByHash",
+        "eth_getBlockByNumber",
+        "eth_getLogs",
+        "eth_getTransactionByHash",
+        "eth_getTransactionReceipt",
+        "net_version",
+    ]
+)
+
+_RETRY_STATUS_CODES = frozenset([429, 500, 502, 503, 504])
+
+
+class HttpTransport(object):
+    """
+    Keep-alive HTTP transport with one connection pooled session per node URL shared by all providers.
+    """
+
+    _SESSIONS = {}
+    _SESSIONS_LOCK = threading.Lock()
+
+    def __init__(self, config: typing.Optional[typing.Dict] = None) -> None:
+        self.config = {**DEFAULT_TRANSPORT_CONFIG, **(config or {})}
+        self.log_prefix = "[HTTP-TRANSPORT]"
+
+    def get_session(self, endpoint_uri: str) -> requests.Session:
+        with self._SESSIONS_LOCK:
+            session = self._SESSIONS.get(endpoint_uri)
+            if not session:
+                session = requests.Session()
+                adapter = requests_adapters.HTTPAdapter(
+                    pool_connections=self.config["pool_connections"],
+                    pool_maxsize=self.config["pool_maxsize"],
+                    max_retries=0,
+                )
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                session.headers.update(
+                    {
+                        "Content-Type": "application/json",
+                        "Accept-Encoding": "gzip, deflate" if self.config["compress_responses"] else "identity",
+                    }
+                )
+                self._SESSIONS[endpoint_uri] = session
+
+        return session
+
+    def post(self, endpoint_uri: str, data: bytes, method: str, max_retries: typing.Optional[int] = None) -> bytes:
+        if method not in IDEMPOTENT_RPC_METHODS:
+            max_retries = 0
+        elif max_retries is None:
+            max_retries = self.config["max_retries"]
+        attempt = 0
+        while True:
+            try:
+                response = self.get_session(endpoint_uri=endpoint_uri).post(
+                    endpoint_uri,
+                    data=data,
+                    timeout=(self.config["connect_timeout"], self.config["read_timeout"]),
+                )
+                if response.status_code not in _RETRY_STATUS_CODES or attempt >= max_retries:
+                    response.raise_for_status()
+                    return response.content
+                error_message = "HTTP status {}".format(response.status_code)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt >= max_retries:
+                    raise
+                error_message = common_utils.get_exception_message(exception=e)
+
+            attempt += 1
+            backoff = min(
+                self.config["retry_backoff_factor"] * 2 ** (attempt - 1), self.config["retry_backoff_max"]
+            ) * random.uniform(0.5, 1)
+            metrics.RPC_REQUEST_RETRIES.labels(method=method).inc()
+            logger.warning(
+                "{} Retrying request (endpoint_uri={}, method={}, attempt={}, backoff_seconds={:.2f}). Error: {}.".format(
+                    self.log_prefix, endpoint_uri, method, attempt, backoff, error_message
+                )
+            )
+            time.sleep(backoff)
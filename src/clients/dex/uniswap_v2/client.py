@@ -0,0 +1,344 @@
+import logging
+import typing
+
+import web3
+
+from common import exceptions as common_exceptions
+from common import utils as common_utils
+from src import enums, metrics
+from src.clients.dex import base as base_dex_provider
+from src.clients.dex import exceptions as dex_exceptions
+from src.clients.dex import json_rpc as dex_json_rpc
+from src.clients.dex import messages as dex_messages
+from src.clients.dex.uniswap_v2 import constants as uniswap_v2_constants
+from src.clients.dex.uniswap_v2 import schemas as uniswap_v2_schemas
+
+logger = logging.getLogger(__name__)
+
+
+class UniswapV2DexProvider(base_dex_provider.BaseDexLPProvider):
+    """
+    Provider of UniswapV2 pair contracts and their forks sharing the same events, ex. PulseX.
+
+    Forks with different event signatures override `EVENT_NAMES_SIGNATURE_MAP` and `EVENT_SIGNATURES_NAME_MAP`.
+    """
+
+    EVENT_NAMES_SIGNATURE_MAP = uniswap_v2_constants.EVENT_NAMES_SIGNATURE_MAP
+    EVENT_SIGNATURES_NAME_MAP = uniswap_v2_constants.EVENT_SIGNATURES_NAME_MAP
+
+    def __init__(
+        self, chain: enums.Chain, dex: enums.Dex, liquidity_pool: typing.Optional[enums.LiquidityPool] = None
+    ) -> None:
+        super().__init__(chain=chain, dex=dex, liquidity_pool=liquidity_pool)
+
+    def get_transaction_events(
+        self,
+        from_block: typing.Union[str, int] = "earliest",
+        to_block: typing.Union[str, int] = "latest",
+        event_names: typing.Optional[typing.List[str]] = None,
+    ) -> dex_messages.TransactionEventBatch:
+        """
+        Returns events of the pool, only event types of the pool config (`events`) unless `event_names` are given.
+        """
+        return self.get_contracts_transaction_events(
+            contract_addresses=[self.lp_contract_address],
+            from_block=from_block,
+            to_block=to_block,
+            event_names=self.event_names if event_names is None else event_names,
+        )
+
+    def get_contracts_transaction_events(
+        self,
+        contract_addresses: typing.List[str],
+        from_block: typing.Union[str, int] = "earliest",
+        to_block: typing.Union[str, int] = "latest",
+        event_names: typing.Optional[typing.List[str]] = None,
+    ) -> dex_messages.TransactionEventBatch:
+        """
+        Returns events of all given pair contracts in the block range fetched by one log filter. Other event types
+        than `event_names` are filtered out by the node.
+        """
+        topics = self.get_event_topics(event_names=event_names) if event_names is not None else None
+        json_rpc_client = self.get_json_rpc_client()
+        if json_rpc_client:
+            return self._get_raw_transaction_events(
+                json_rpc_client=json_rpc_client,
+                contract_addresses=contract_addresses,
+                topics=topics,
+                from_block=from_block,
+                to_block=to_block,
+            )
+
+        transaction_events = dex_messages.TransactionEventBatch()
+        for event in self._get_web3_logs(
+            contract_addresses=contract_addresses, topics=topics, from_block=from_block, to_block=to_block
+        ):
+            transaction_events.append(
+                name=self.EVENT_SIGNATURES_NAME_MAP[event["topics"][0]],
+                contract_address=event["contract_address"],
+                topics=event["topics"],
+                data=event["data"],
+                transaction_hash=event["transaction_hash"],
+                log_index=event["log_index"],
+                block_number=event["block_number"],
+            )
+
+        metrics.EVENTS_FETCHED.labels(**self.metric_labels).inc(len(transaction_events))
+        return transaction_events
+
+    def get_pair_created_events(
+        self, from_block: typing.Union[str, int], to_block: typing.Union[str, int]
+    ) -> typing.List[dex_messages.PairCreatedEvent]:
+        """
+        Returns pairs created by the DEX factory contract (`factory` of the DEX config) in the block range.
+        """
+        factory_address = web3.Web3.to_checksum_address(value=self.factory_config["contract_address"])
+        topics = [[uniswap_v2_constants.PAIR_CREATED_EVENT_SIGNATURE]]
+        json_rpc_client = self.get_json_rpc_client()
+        if json_rpc_client:
+            events = [
+                (
+                    item["topics"],
+                    item["data"],
+                    item["transactionHash"],
+                    int(item["logIndex"], 16),
+                    int(item["blockNumber"], 16),
+                )
+                for item in self._get_raw_logs(
+                    json_rpc_client=json_rpc_client,
+                    contract_addresses=[factory_address],
+                    topics=topics,
+                    from_block=from_block,
+                    to_block=to_block,
+                )
+            ]
+        else:
+            events = [
+                (event["topics"], event["data"], event["transaction_hash"], event["log_index"], event["block_number"])
+                for event in self._get_web3_logs(
+                    contract_addresses=[factory_address], topics=topics, from_block=from_block, to_block=to_block
+                )
+            ]
+
+        # PairCreated(address indexed token0, address indexed token1, address pair, uint256 pair_index)
+        try:
+            return [
+                dex_messages.PairCreatedEvent(
+                    pair_address=web3.Web3.to_checksum_address("0x" + data[26:66]),
+                    token0_address=web3.Web3.to_checksum_address("0x" + topics[1][-40:]),
+                    token1_address=web3.Web3.to_checksum_address("0x" + topics[2][-40:]),
+                    pair_index=int(data[66:130], 16),
+                    transaction_hash=transaction_hash,
+                    log_index=log_index,
+                    block_number=block_number,
+                )
+                for topics, data, transaction_hash, log_index, block_number in events
+            ]
+        except (IndexError, KeyError, TypeError, ValueError) as e:
+            msg = "Unable to decode pair created events (raw_data={}). Error: {}".format(
+                events, common_utils.get_exception_message(exception=e)
+            )
+            logger.error("{} {}.".format(self.log_prefix, msg))
+            raise dex_exceptions.DexProviderDataValidationError(msg)
+
+    def get_transaction(self, transaction_hash: str) -> dex_messages.Transaction:
+        json_rpc_client = self.get_json_rpc_client()
+        if json_rpc_client:
+            return self.get_transactions(transaction_hashes=[transaction_hash])[transaction_hash]
+
+        try:
+            response = self.get_web3_client().eth.get_transaction(transaction_hash=transaction_hash)
+        except Exception as e:
+            msg = "Unable to get transaction (contract_address={}, transaction_hash={}). Error: {}".format(
+                self.lp_contract_address,
+                transaction_hash,
+                common_utils.get_exception_message(exception=e),
+            )
+            logger.exception("{} {}.".format(self.log_prefix, msg))
+            raise dex_exceptions.DexProviderClientException(msg)
+
+        try:
+            with metrics.VALIDATION_DURATION.labels(schema="Transaction", **self.metric_labels).time():
+                validated_response_data = common_utils.validate_data_schema(
+                    data=dict(response),
+                    schema=uniswap_v2_schemas.Transaction(),
+                )
+        except common_exceptions.ValidationSchemaException as e:
+            msg = "Unable to validate transaction data (raw_data={}). Error: {}".format(
+                response, common_utils.get_exception_message(exception=e)
+            )
+            logger.error("{} {}.".format(self.log_prefix, msg))
+            raise dex_exceptions.DexProviderDataValidationError(msg)
+
+        return dex_messages.Transaction(
+            transaction_hash=validated_response_data["transaction_hash"],
+            transaction_index=validated_response_data["transaction_index"],
+            block_number=validated_response_data["block_number"],
+            block_hash=validated_response_data["block_hash"],
+            from_address=validated_response_data["from_address"],
+            to_address=validated_response_data["to_address"],
+            gas=validated_response_data["gas"],
+            gas_price=validated_response_data["gas_price"],
+        )
+
+    def get_transactions(self, transaction_hashes: typing.List[str]) -> typing.Dict[str, dex_messages.Transaction]:
+        json_rpc_client = self.get_json_rpc_client()
+        if not json_rpc_client:
+            return super().get_transactions(transaction_hashes=transaction_hashes)
+
+        try:
+            response = json_rpc_client.batch_call(
+                method="eth_getTransactionByHash",
+                params_list=[[transaction_hash] for transaction_hash in transaction_hashes],
+            )
+        except Exception as e:
+            msg = "Unable to get transactions (contract_address={}, transaction_hashes_count={}). Error: {}".format(
+                self.lp_contract_address,
+                len(transaction_hashes),
+                common_utils.get_exception_message(exception=e),
+            )
+            logger.exception("{} {}.".format(self.log_prefix, msg))
+            raise dex_exceptions.DexProviderClientException(msg)
+
+        missing_transaction_hashes = [
+            transaction_hash for transaction_hash, item in zip(transaction_hashes, response) if item is None
+        ]
+        if missing_transaction_hashes:
+            msg = "Unable to get transactions (contract_address={}, transaction_hashes={}). Error: Transactions not found".format(
+                self.lp_contract_address, missing_transaction_hashes
+            )
+            logger.error("{} {}.".format(self.log_prefix, msg))
+            raise dex_exceptions.DexProviderClientException(msg)
+
+        try:
+            with metrics.VALIDATION_DURATION.labels(schema="RawTransaction", **self.metric_labels).time():
+                transactions = [
+                    dex_messages.Transaction(
+                        transaction_hash=item["hash"],
+                        transaction_index=int(item["transactionIndex"], 16),
+                        block_number=int(item["blockNumber"], 16),
+                        block_hash=item["blockHash"],
+                        from_address=web3.Web3.to_checksum_address(item["from"]),
+                        to_address=web3.Web3.to_checksum_address(item["to"]) if item.get("to") else None,
+                        gas=int(item["gas"], 16),
+                        gas_price=int(item["gasPrice"], 16),
+                    )
+                    for item in response
+                ]
+        except (KeyError, TypeError, ValueError) as e:
+            msg = "Unable to validate transactions data (raw_data={}). Error: {}".format(
+                response, common_utils.get_exception_message(exception=e)
+            )
+            logger.error("{} {}.".format(self.log_prefix, msg))
+            raise dex_exceptions.DexProviderDataValidationError(msg)
+
+        return dict(zip(transaction_hashes, transactions))
+
+    def _get_web3_logs(
+        self,
+        contract_addresses: typing.List[str],
+        topics: typing.Optional[typing.List],
+        from_block: typing.Union[str, int],
+        to_block: typing.Union[str, int],
+    ) -> typing.List[typing.Dict]:
+        log_filter = {"address": contract_addresses, "fromBlock": from_block, "toBlock": to_block}
+        if topics:
+            log_filter["topics"] = topics
+        try:
+            response = self.get_web3_client().eth.get_logs(log_filter)
+        except Exception as e:
+            msg = "Unable to get contract events (contract_addresses_count={}, from_block={}, to_block={}). Error: {}".format(
+                len(contract_addresses),
+                from_block,
+                to_block,
+                common_utils.get_exception_message(exception=e),
+            )
+            logger.exception("{} {}.".format(self.log_prefix, msg))
+            raise dex_exceptions.DexProviderClientException(msg)
+
+        try:
+            with metrics.VALIDATION_DURATION.labels(schema="TransactionEvents", **self.metric_labels).time():
+                validated_response_data = common_utils.validate_data_schema(
+                    data=[dict(response_item) for response_item in response],
+                    schema=uniswap_v2_schemas.TransactionEvents(),
+                )
+        except common_exceptions.ValidationSchemaException as e:
+            msg = "Unable to validate events data (raw_data={}). Error: {}".format(
+                response, common_utils.get_exception_message(exception=e)
+            )
+            logger.error("{} {}.".format(self.log_prefix, msg))
+            raise dex_exceptions.DexProviderDataValidationError(msg)
+
+        return validated_response_data["transaction_events"]
+
+    def _get_raw_logs(
+        self,
+        json_rpc_client: dex_json_rpc.JsonRpcClient,
+        contract_addresses: typing.List[str],
+        topics: typing.Optional[typing.List],
+        from_block: typing.Union[str, int],
+        to_block: typing.Union[str, int],
+    ) -> typing.List[typing.Dict]:
+        log_filter = {
+            "address": contract_addresses,
+            "fromBlock": dex_json_rpc.to_block_identifier(block=from_block),
+            "toBlock": dex_json_rpc.to_block_identifier(block=to_block),
+        }
+        if topics:
+            log_filter["topics"] = topics
+        try:
+            return json_rpc_client.call(
+                method="eth_getLogs",
+                params=[log_filter],
+                block_number=to_block if isinstance(to_block, int) else None,
+            )
+        except Exception as e:
+            msg = "Unable to get contract events (contract_addresses_count={}, from_block={}, to_block={}). Error: {}".format(
+                len(contract_addresses),
+                from_block,
+                to_block,
+                common_utils.get_exception_message(exception=e),
+            )
+            logger.exception("{} {}.".format(self.log_prefix, msg))
+            raise dex_exceptions.DexProviderClientException(msg)
+
+    def _get_raw_transaction_events(
+        self,
+        json_rpc_client: dex_json_rpc.JsonRpcClient,
+        contract_addresses: typing.List[str],
+        topics: typing.Optional[typing.List],
+        from_block: typing.Union[str, int],
+        to_block: typing.Union[str, int],
+    ) -> dex_messages.TransactionEventBatch:
+        response = self._get_raw_logs(
+            json_rpc_client=json_rpc_client,
+            contract_addresses=contract_addresses,
+            topics=topics,
+            from_block=from_block,
+            to_block=to_block,
+        )
+
+        # Logs are filtered by the pool addresses, so checksum addresses are taken from the filter.
+        checksum_addresses = {contract_address.lower(): contract_address for contract_address in contract_addresses}
+        try:
+            with metrics.VALIDATION_DURATION.labels(schema="RawTransactionEvents", **self.metric_labels).time():
+                transaction_events = dex_messages.TransactionEventBatch()
+                for item in response:
+                    transaction_events.append(
+                        name=self.EVENT_SIGNATURES_NAME_MAP[item["topics"][0]],
+                        contract_address=checksum_addresses[item["address"].lower()],
+                        topics=item["topics"],
+                        data=item["data"],
+                        transaction_hash=item["transactionHash"],
+                        log_index=int(item["logIndex"], 16),
+                        block_number=int(item["blockNumber"], 16),
+                    )
+        except (IndexError, KeyError, TypeError, ValueError) as e:
+            msg = "Unable to validate events data (raw_data={}). Error: {}".format(
+                response, common_utils.get_exception_message(exception=e)
+            )
+            logger.error("{} {}.".format(self.log_prefix, msg))
+            raise dex_exceptions.DexProviderDataValidationError(msg)
+
+        metrics.EVENTS_FETCHED.labels(**self.metric_labels).inc(len(transaction_events))
+        return transaction_events
@@ -7,3 +7,6 @@ EVENT_NAMES_SIGNATURE_MAP = {
     "Sync": "0x1c411e9a96e071241c2f21f7726b17ae89e3cab4c78be50e062b03a9fffbbad1",
 }
 EVENT_SIGNATURES_NAME_MAP = {signature: name for name, signature in EVENT_NAMES_SIGNATURE_MAP.items()}
+
+# Event of the factory contract, not of pair contracts.
+PAIR_CREATED_EVENT_SIGNATURE = "0x0d3648bd0f6ba80134a33ba9275ac585d9d315f0ad8355cddefde31afa28d0e9"
@@ -14,6 +14,7 @@ class TransactionEvent(Schema):
     data = marshmallow.fields.Str(required=True, data_key="data")
     transaction_hash = marshmallow.fields.Str(required=True, data_key="transactionHash")
     log_index = marshmallow.fields.Int(required=True, data_key="logIndex")
+    block_number = marshmallow.fields.Int(required=True, data_key="blockNumber")
 
     @marshmallow.pre_load
     def pre_process_data(self, data: typing.Dict, **kwargs: typing.Any) -> typing.Dict:
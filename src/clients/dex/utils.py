@@ -14,3 +14,8 @@ def get_liquidity_pools(
             dex.name
         ]["pools"].keys()
     ]
+
+
+def decode_event_data_words(data: str) -> typing.List[int]:
+    data = data[2:] if data.startswith("0x") else data
+    return [int(data[index : index + 64], 16) for index in range(0, len(data), 64)]
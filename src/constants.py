@@ -0,0 +1,19 @@
+from src import enums
+
+BLOCK_ROLLUP_GRANULARITY_SIZE_MAP = {
+    enums.RollupGranularity.BLOCK: 1,
+    enums.RollupGranularity.BLOCKS_100: 100,
+}
+TIME_ROLLUP_GRANULARITY_SECONDS_MAP = {
+    enums.RollupGranularity.HOUR: 60 * 60,
+    enums.RollupGranularity.DAY: 24 * 60 * 60,
+}
+
+ROLLUP_EVENT_COUNT_FIELD_MAP = {
+    "Swap": "swap_count",
+    "Sync": "sync_count",
+    "Mint": "mint_count",
+    "Burn": "burn_count",
+    "Transfer": "transfer_count",
+    "Approval": "approval_count",
+}
@@ -0,0 +1,69 @@
+import io
+import logging
+import typing
+
+from django.conf import settings
+from django.db import connection
+from django.db.backends.base.base import BaseDatabaseWrapper
+
+logger = logging.getLogger(__name__)
+
+
+def get_sqlite_pragma_statements(pragmas: typing.Dict[str, typing.Any]) -> typing.List[str]:
+    return ["PRAGMA {} = {}".format(name, value) for name, value in pragmas.items()]
+
+
+def configure_sqlite_connection(sender: typing.Any, connection: BaseDatabaseWrapper, **kwargs: typing.Any) -> None:
+    """
+    Applies `SQLITE_PRAGMAS` to every new SQLite connection, connected to `connection_created` signal.
+    """
+    if connection.vendor != "sqlite" or not settings.SQLITE_PRAGMAS:
+        return
+
+    with connection.cursor() as cursor:
+        for statement in get_sqlite_pragma_statements(pragmas=settings.SQLITE_PRAGMAS):
+            cursor.execute(statement)
+    logger.debug("[SQLITE] Configured connection (alias=%s, pragmas=%s).", connection.alias, settings.SQLITE_PRAGMAS)
+
+
+def bulk_insert(table: str, columns: typing.Sequence[str], rows: typing.Iterable[typing.Sequence]) -> int:
+    """
+    Inserts rows by the fastest path of the database backend and returns the number of inserted rows,
+    `COPY FROM STDIN` on Postgres and one prepared `executemany` elsewhere. Run it in a transaction.
+    """
+    rows = list(rows)
+    if not rows:
+        return 0
+
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            buffer = io.StringIO()
+            buffer.writelines("\t".join(_to_copy_value(value) for value in row) + "\n" for row in rows)
+            buffer.seek(0)
+            cursor.cursor.copy_expert(
+                "COPY {} ({}) FROM STDIN".format(
+                    connection.ops.quote_name(table), ", ".join(connection.ops.quote_name(column) for column in columns)
+                ),
+                buffer,
+            )
+        else:
+            cursor.executemany(
+                "INSERT INTO {} ({}) VALUES ({})".format(
+                    connection.ops.quote_name(table),
+                    ", ".join(connection.ops.quote_name(column) for column in columns),
+                    ", ".join(["%s"] * len(columns)),
+                ),
+                rows,
+            )
+
+    return len(rows)
+
+
+def _to_copy_value(value: typing.Any) -> str:
+    """
+    Formats a value for the text format of Postgres `COPY`.
+    """
+    if value is None:
+        return "\\N"
+
+    return str(value).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
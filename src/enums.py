@@ -20,3 +20,18 @@ class LiquidityPool(enum.Enum):
     WPLS_stETH = 6
     PLSX_WPLS = 7
     HEX_WPLS = 8
+    USDC_WETH = 9
+    WETH_USDT = 10
+    DAI_WETH = 11
+
+
+class RollupGranularity(enum.Enum):
+    BLOCK = 1
+    BLOCKS_100 = 2
+    HOUR = 3
+    DAY = 4
+
+
+class Profiler(enum.Enum):
+    CPROFILE = 1
+    SAMPLING = 2
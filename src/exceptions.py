@@ -4,3 +4,19 @@ class LiquidityPoolImporterException(Exception):
 
 class LiquidityPoolExporterException(Exception):
     pass
+
+
+class LiquidityPoolEventStoreException(Exception):
+    pass
+
+
+class LiquidityPoolDiscoveryException(Exception):
+    pass
+
+
+class LiquidityPoolSnapshotException(Exception):
+    pass
+
+
+class LiquidityPoolPriceIndexException(Exception):
+    pass
@@ -5,7 +5,7 @@ from django.conf import settings
 from django.core.management.base import BaseCommand, CommandParser
 
 from common import utils as common_utils
-from src import enums, exceptions
+from src import enums, exceptions, metrics, profiling
 from src.clients.dex import utils as dex_utils
 from src.clients.dex import exceptions as dex_exceptions
 from src.clients.dex import factory
@@ -39,9 +39,27 @@ class Command(BaseCommand):
             help="Denotes the DEX on which liquidity pools are hosted.",
         )
 
+        parser.add_argument(
+            "--metrics-file",
+            required=False,
+            type=str,
+            help="Path to the Prometheus textfile to which metrics are written after the import.",
+        )
+
+        profiling.add_profile_arguments(parser=parser)
+
     def handle(self, *args: typing.Any, **kwargs: typing.Any) -> None:
+        with profiling.profile_command(
+            command_name=__name__.split(".")[-1],
+            profiler=kwargs["profile"],
+            output_dir=kwargs["profile_dir"],
+        ):
+            self._handle(**kwargs)
+
+    def _handle(self, **kwargs: typing.Any) -> None:
         chain = enums.Chain[kwargs["chain"]]
         dex = enums.Dex[kwargs["dex"]]
+        metrics_file = kwargs["metrics_file"]
 
         logger.info(
             "{} Started command '{}' (chain={}, dex={}).".format(
@@ -87,6 +105,14 @@ class Command(BaseCommand):
                     )
                 )
 
+        if metrics_file:
+            metrics.write_textfile(path=metrics_file)
+            logger.info(
+                "{} Written metrics to textfile '{}'.".format(
+                    self.log_prefix, metrics_file
+                )
+            )
+
         logger.info(
             "{} Finished command '{}' (chain={}, dex={}).".format(
                 self.log_prefix,
@@ -0,0 +1,96 @@
+import logging
+import typing
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from common import utils as common_utils
+from src import enums, exceptions, metrics
+from src.clients.dex import exceptions as dex_exceptions
+from src.clients.dex import factory
+from src.services import lp_discovery as lp_discovery_services
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = """
+            Discovers liquidity pools from PairCreated events of the DEX factory and backfills events of new pools in bulk.
+            ex. python manage.py import_factory_liquidity_pools --chain=PULSE --dex=PULSEX
+            """
+
+    log_prefix = "[IMPORT-FACTORY-LIQUIDITY-POOLS]"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--chain",
+            required=True,
+            type=str,
+            choices=[chain.name for chain in enums.Chain],
+            help="Denotes the chain on which dex of liquidity pools is hosted.",
+        )
+
+        parser.add_argument(
+            "--dex",
+            required=True,
+            type=str,
+            choices=[dex.name for dex in enums.Dex],
+            help="Denotes the DEX on which liquidity pools are hosted.",
+        )
+
+        parser.add_argument(
+            "--skip-backfill",
+            action="store_true",
+            help="Only registers newly created liquidity pools without importing their events.",
+        )
+
+        parser.add_argument(
+            "--metrics-file",
+            required=False,
+            type=str,
+            help="Path to the Prometheus textfile to which metrics are written after the import.",
+        )
+
+    def handle(self, *args: typing.Any, **kwargs: typing.Any) -> None:
+        chain = enums.Chain[kwargs["chain"]]
+        dex = enums.Dex[kwargs["dex"]]
+
+        logger.info(
+            "{} Started command '{}' (chain={}, dex={}).".format(
+                self.log_prefix,
+                __name__.split(".")[-1],
+                chain.name,
+                dex.name,
+            )
+        )
+
+        try:
+            dex_client = factory.DexProviderFactory.create_dex_client(chain=chain, dex=dex)
+        except dex_exceptions.DexProviderException as e:
+            logger.exception(
+                "{} Unable to create dex provider (chain={}, dex={}). Error: {}.".format(
+                    self.log_prefix, chain.name, dex.name, common_utils.get_exception_message(exception=e)
+                )
+            )
+            return
+
+        discovery_service = lp_discovery_services.LiquidityPoolDiscoveryService(dex_provider_client=dex_client)
+        try:
+            discovered_pools_count = discovery_service.discover_liquidity_pools()
+            imported_events_count = 0 if kwargs["skip_backfill"] else discovery_service.backfill_liquidity_pools()
+        except exceptions.LiquidityPoolDiscoveryException as e:
+            logger.exception("{} {}.".format(self.log_prefix, common_utils.get_exception_message(exception=e)))
+            return
+        finally:
+            if kwargs["metrics_file"]:
+                metrics.write_textfile(path=kwargs["metrics_file"])
+
+        logger.info(
+            "{} Finished command '{}' (chain={}, dex={}, discovered_pools={}, imported_events={}).".format(
+                self.log_prefix,
+                __name__.split(".")[-1],
+                chain.name,
+                dex.name,
+                discovered_pools_count,
+                imported_events_count,
+            )
+        )
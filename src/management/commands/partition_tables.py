@@ -0,0 +1,49 @@
+import logging
+import typing
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from src.services import lp_partitioning as lp_partitioning_services
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = """
+            Converts transaction and event tables into tables partitioned by liquidity pool and block range (Postgres only).
+            Existing rows are copied into the partitions inside one transaction, so the importer should be stopped.
+            ex. python manage.py partition_tables [--partition-size-blocks=1000000]
+            """
+
+    log_prefix = "[PARTITION-TABLES]"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--partition-size-blocks",
+            required=False,
+            type=int,
+            default=settings.LP_PARTITIONING["partition_size_blocks"],
+            help="Number of blocks of one partition, has to match LP_PARTITIONING setting.",
+        )
+
+    def handle(self, *args: typing.Any, **kwargs: typing.Any) -> None:
+        partition_size = kwargs["partition_size_blocks"]
+        logger.info(
+            "{} Started command '{}' (partition_size_blocks={}).".format(
+                self.log_prefix, __name__.split(".")[-1], partition_size
+            )
+        )
+
+        if not lp_partitioning_services.is_partitioning_enabled():
+            msg = "Partitioning is disabled, enable LP_PARTITIONING setting on a Postgres database"
+            logger.error("{} {}.".format(self.log_prefix, msg))
+            raise CommandError(msg)
+
+        converted_tables = lp_partitioning_services.partition_tables(partition_size=partition_size)
+
+        logger.info(
+            "{} Finished command '{}' (converted_tables={}).".format(
+                self.log_prefix, __name__.split(".")[-1], converted_tables
+            )
+        )
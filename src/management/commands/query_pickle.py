@@ -1,12 +1,14 @@
 import logging
 import typing
+from pathlib import Path
 
-from django.core.management.base import BaseCommand, CommandParser
+from django.core.management.base import BaseCommand, CommandError, CommandParser
 
 from common import utils as common_utils
-from src import enums, exceptions
+from src import enums, exceptions, profiling
 from src.clients.dex import exceptions as dex_exceptions
 from src.clients.dex import factory
+from src.clients.dex import utils as dex_utils
 from src.services import lp_exporter as lp_exporter_services
 
 logger = logging.getLogger(__name__)
@@ -17,6 +19,7 @@ class Command(BaseCommand):
             Queries offline data for a chosen liquidity pool on a given DEX and chain and persists it to a .pickle file.
             Offline data consists of events and transactions.
             ex. python manage.py query_pickle --chain=PULSE --dex=PULSEX --pool=WPLS_DAI --output-file=my_file.pkl  [--overwrite]
+                python manage.py query_pickle --chain=PULSE --dex=PULSEX --pool=ALL --output-dir=exports [--overwrite]
             """
 
     log_prefix = "[IMPORT-CONTINOUS-LIQUIDITY-PROVIDER-DATA]"
@@ -42,15 +45,21 @@ class Command(BaseCommand):
             "--pool",
             required=True,
             type=str,
-            choices=[pool.name for pool in enums.LiquidityPool],
-            help="Denotes the liquidity pool to be extracted.",
+            help="Denotes the liquidity pool to be extracted, a comma separated list of pools or ALL pools of the DEX.",
         )
 
         parser.add_argument(
             "--output-file",
-            required=True,
+            required=False,
             type=str,
-            help="Path to the output pickle file.",
+            help="Path to the output pickle file of a single liquidity pool.",
+        )
+
+        parser.add_argument(
+            "--output-dir",
+            required=False,
+            type=str,
+            help="Directory of output files named <POOL_NAME>.pkl, required when exporting multiple liquidity pools.",
         )
 
         parser.add_argument(
@@ -61,60 +70,83 @@ class Command(BaseCommand):
             help="If the target pickle file already exists it will overwrite it.",
         )
 
+        profiling.add_profile_arguments(parser=parser)
+
     def handle(self, *args: typing.Any, **kwargs: typing.Any) -> None:
+        with profiling.profile_command(
+            command_name=__name__.split(".")[-1],
+            profiler=kwargs["profile"],
+            output_dir=kwargs["profile_dir"],
+        ):
+            self._handle(**kwargs)
+
+    def _handle(self, **kwargs: typing.Any) -> None:
         chain = enums.Chain[kwargs["chain"]]
         dex = enums.Dex[kwargs["dex"]]
-        liquidity_pool = enums.LiquidityPool[kwargs["pool"]]
-        output_path = kwargs["output_file"]
+        liquidity_pools = self._get_liquidity_pools(
+            chain=chain, dex=dex, pool=kwargs["pool"]
+        )
         overwrite_file = kwargs["overwrite"]
+        if kwargs["output_dir"]:
+            output_paths = {
+                liquidity_pool: str(Path(kwargs["output_dir"]) / liquidity_pool.name)
+                for liquidity_pool in liquidity_pools
+            }
+        elif kwargs["output_file"] and len(liquidity_pools) == 1:
+            output_paths = {liquidity_pools[0]: kwargs["output_file"]}
+        else:
+            raise CommandError(
+                "One of --output-file or --output-dir is required, multiple liquidity pools are exported to --output-dir."
+            )
 
         logger.info(
-            "{} Started command '{}' (chain={}, dex={}, liquidity_pool={}, output_path={}, overwrite_file={}).".format(
+            "{} Started command '{}' (chain={}, dex={}, liquidity_pools={}, output_path={}, overwrite_file={}).".format(
                 self.log_prefix,
                 __name__.split(".")[-1],
                 chain.name,
                 dex.name,
-                liquidity_pool.name,
-                output_path,
+                [liquidity_pool.name for liquidity_pool in liquidity_pools],
+                kwargs["output_file"] or kwargs["output_dir"],
                 overwrite_file,
             )
         )
 
-        try:
-            lp_client = factory.DexProviderFactory().create(
-                chain=chain, dex=dex, liquidity_pool=liquidity_pool
-            )
-        except dex_exceptions.DexProviderClientException as e:
-            logger.exception(
-                "{} Unable to create dex provider factory (chain={}, dex={}, liquidity_pool={}, output_path={}, overwrite_file={}). Error: {}.".format(
-                    self.log_prefix,
-                    chain.name,
-                    dex.name,
-                    liquidity_pool.name,
-                    output_path,
-                    overwrite_file,
-                    common_utils.get_exception_message(exception=e),
+        for liquidity_pool, output_path in output_paths.items():
+            try:
+                lp_client = factory.DexProviderFactory().create(
+                    chain=chain, dex=dex, liquidity_pool=liquidity_pool
                 )
-            )
-            raise e
+            except dex_exceptions.DexProviderClientException as e:
+                logger.exception(
+                    "{} Unable to create dex provider factory (chain={}, dex={}, liquidity_pool={}, output_path={}, overwrite_file={}). Error: {}.".format(
+                        self.log_prefix,
+                        chain.name,
+                        dex.name,
+                        liquidity_pool.name,
+                        output_path,
+                        overwrite_file,
+                        common_utils.get_exception_message(exception=e),
+                    )
+                )
+                raise e
 
-        try:
-            exporter = lp_exporter_services.LiquidityPoolExporter(
-                dex_provider_client=lp_client
-            )
-            transaction_data = exporter.get_liquidity_provider_data()
-            exporter.persist_pickle(
-                data=transaction_data,
-                path=output_path,
-                overwrite_file=overwrite_file,
-            )
-        except exceptions.LiquidityPoolImporterException as e:
-            logger.exception(
-                "{} {}.".format(
-                    self.log_prefix, common_utils.get_exception_message(exception=e)
+            try:
+                exporter = lp_exporter_services.LiquidityPoolExporter(
+                    dex_provider_client=lp_client
                 )
-            )
-            raise e
+                transaction_data = exporter.get_liquidity_provider_data()
+                exporter.persist_pickle(
+                    data=transaction_data,
+                    path=output_path,
+                    overwrite_file=overwrite_file,
+                )
+            except exceptions.LiquidityPoolImporterException as e:
+                logger.exception(
+                    "{} {}.".format(
+                        self.log_prefix, common_utils.get_exception_message(exception=e)
+                    )
+                )
+                raise e
 
         logger.info(
             "{} Finished command '{}' (chain={}, dex={}).".format(
@@ -124,3 +156,29 @@ class Command(BaseCommand):
                 dex.name,
             )
         )
+
+    @staticmethod
+    def _get_liquidity_pools(
+        chain: enums.Chain, dex: enums.Dex, pool: str
+    ) -> typing.List[enums.LiquidityPool]:
+        if pool == "ALL":
+            return dex_utils.get_liquidity_pools(chain=chain, dex=dex)
+
+        liquidity_pool_names = pool.split(",")
+        unknown_liquidity_pool_names = [
+            liquidity_pool_name
+            for liquidity_pool_name in liquidity_pool_names
+            if liquidity_pool_name not in enums.LiquidityPool.__members__
+        ]
+        if unknown_liquidity_pool_names:
+            raise CommandError(
+                "Unknown liquidity pools {}, choose from {}.".format(
+                    unknown_liquidity_pool_names,
+                    [liquidity_pool.name for liquidity_pool in enums.LiquidityPool],
+                )
+            )
+
+        return [
+            enums.LiquidityPool[liquidity_pool_name]
+            for liquidity_pool_name in liquidity_pool_names
+        ]
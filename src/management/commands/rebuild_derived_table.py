@@ -0,0 +1,147 @@
+import logging
+import typing
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandParser
+
+from common import utils as common_utils
+from src import enums
+from src.clients.dex import exceptions as dex_exceptions
+from src.clients.dex import factory
+from src.clients.dex import utils as dex_utils
+from src.services import lp_derivation as lp_derivation_services
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = """
+            Recomputes a derived table of liquidity pools from stored events in block range chunks processed by a pool of processes.
+            Chunks completed by the current derivation version are skipped, so an interrupted rebuild resumes when it is rerun.
+            ex. python manage.py rebuild_derived_table --derivation=reserves --chain=PULSE --dex=PULSEX [--pool=WPLS_DAI] [--from-block=17240384 --to-block=17300000] [--workers=8] [--restart]
+            """
+
+    log_prefix = "[REBUILD-DERIVED-TABLE]"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--derivation",
+            required=True,
+            type=str,
+            choices=list(lp_derivation_services.DERIVATIONS),
+            help="Derived table to rebuild.",
+        )
+
+        parser.add_argument(
+            "--chain",
+            required=True,
+            type=str,
+            choices=[chain.name for chain in enums.Chain],
+            help="Denotes the chain on which dex of liquidity pools is hosted.",
+        )
+
+        parser.add_argument(
+            "--dex",
+            required=True,
+            type=str,
+            choices=[dex.name for dex in enums.Dex],
+            help="Denotes the DEX on which liquidity pools are hosted.",
+        )
+
+        parser.add_argument(
+            "--pool",
+            required=False,
+            type=str,
+            action="append",
+            choices=[pool.name for pool in enums.LiquidityPool],
+            help="Liquidity pool to rebuild. Can be repeated, defaults to all pools of the DEX.",
+        )
+
+        parser.add_argument(
+            "--from-block",
+            required=False,
+            type=int,
+            help="First block to rebuild, defaults to the first stored event of the pool.",
+        )
+
+        parser.add_argument(
+            "--to-block",
+            required=False,
+            type=int,
+            help="Last block to rebuild, defaults to the block reference of the pool.",
+        )
+
+        parser.add_argument(
+            "--workers",
+            required=False,
+            type=int,
+            default=settings.LP_DERIVATION["workers"],
+            help="Number of processes deriving chunks, 1 derives chunks in the command process.",
+        )
+
+        parser.add_argument(
+            "--chunk-size-blocks",
+            required=False,
+            type=int,
+            default=settings.LP_DERIVATION["chunk_size_blocks"],
+            help="Number of blocks of one chunk.",
+        )
+
+        parser.add_argument(
+            "--restart",
+            required=False,
+            action="store_true",
+            help="Recomputes chunks completed by previous runs.",
+        )
+
+    def handle(self, *args: typing.Any, **kwargs: typing.Any) -> None:
+        chain = enums.Chain[kwargs["chain"]]
+        dex = enums.Dex[kwargs["dex"]]
+        liquidity_pools = [
+            enums.LiquidityPool[liquidity_pool] for liquidity_pool in kwargs["pool"] or []
+        ] or dex_utils.get_liquidity_pools(chain=chain, dex=dex)
+
+        logger.info(
+            "{} Started command '{}' (derivation={}, chain={}, dex={}, liquidity_pools={}, restart={}).".format(
+                self.log_prefix,
+                __name__.split(".")[-1],
+                kwargs["derivation"],
+                chain.name,
+                dex.name,
+                [liquidity_pool.name for liquidity_pool in liquidity_pools],
+                kwargs["restart"],
+            )
+        )
+
+        lp_clients = []
+        for liquidity_pool in liquidity_pools:
+            try:
+                lp_clients.append(
+                    factory.DexProviderFactory().create(chain=chain, dex=dex, liquidity_pool=liquidity_pool)
+                )
+            except dex_exceptions.DexProviderException as e:
+                logger.exception(
+                    "{} Unable to create dex provider factory (chain={}, dex={}, liquidity_pool={}). Error: {}. Continue.".format(
+                        self.log_prefix,
+                        chain.name,
+                        dex.name,
+                        liquidity_pool.name,
+                        common_utils.get_exception_message(exception=e),
+                    )
+                )
+
+        result = lp_derivation_services.rebuild_derivation(
+            derivation_name=kwargs["derivation"],
+            dex_provider_clients=lp_clients,
+            from_block=kwargs["from_block"],
+            to_block=kwargs["to_block"],
+            workers=kwargs["workers"],
+            chunk_size_blocks=kwargs["chunk_size_blocks"],
+            restart=kwargs["restart"],
+        )
+
+        logger.info(
+            "{} Finished command '{}' (derivation={}, chain={}, dex={}, result={}).".format(
+                self.log_prefix, __name__.split(".")[-1], kwargs["derivation"], chain.name, dex.name, result
+            )
+        )
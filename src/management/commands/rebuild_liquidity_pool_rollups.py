@@ -0,0 +1,127 @@
+import logging
+import typing
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from common import utils as common_utils
+from src import enums
+from src.clients.dex import exceptions as dex_exceptions
+from src.clients.dex import factory
+from src.services import lp_rollups as lp_rollups_services
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = """
+            Rebuilds OHLCV and event count rollups of a liquidity pool for a given block range from stored events.
+            ex. python manage.py rebuild_liquidity_pool_rollups --chain=PULSE --dex=PULSEX --pool=WPLS_DAI --from-block=17240384 --to-block=17300000 [--granularity=HOUR --granularity=DAY]
+            """
+
+    log_prefix = "[REBUILD-LIQUIDITY-POOL-ROLLUPS]"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--chain",
+            required=True,
+            type=str,
+            choices=[chain.name for chain in enums.Chain],
+            help="Denotes the chain on which dex of liquidity pools is hosted.",
+        )
+
+        parser.add_argument(
+            "--dex",
+            required=True,
+            type=str,
+            choices=[dex.name for dex in enums.Dex],
+            help="Denotes the DEX on which liquidity pools are hosted.",
+        )
+
+        parser.add_argument(
+            "--pool",
+            required=True,
+            type=str,
+            choices=[pool.name for pool in enums.LiquidityPool],
+            help="Denotes the liquidity pool for which rollups are rebuilt.",
+        )
+
+        parser.add_argument(
+            "--from-block",
+            required=True,
+            type=int,
+            help="First block of the range to rebuild.",
+        )
+
+        parser.add_argument(
+            "--to-block",
+            required=True,
+            type=int,
+            help="Last block of the range to rebuild.",
+        )
+
+        parser.add_argument(
+            "--granularity",
+            required=False,
+            type=str,
+            action="append",
+            choices=[granularity.name for granularity in enums.RollupGranularity],
+            help="Rollup granularity to rebuild. Can be repeated, defaults to all granularities.",
+        )
+
+    def handle(self, *args: typing.Any, **kwargs: typing.Any) -> None:
+        chain = enums.Chain[kwargs["chain"]]
+        dex = enums.Dex[kwargs["dex"]]
+        liquidity_pool = enums.LiquidityPool[kwargs["pool"]]
+        from_block = kwargs["from_block"]
+        to_block = kwargs["to_block"]
+        granularities = [enums.RollupGranularity[granularity] for granularity in kwargs["granularity"] or []] or list(
+            enums.RollupGranularity
+        )
+
+        logger.info(
+            "{} Started command '{}' (chain={}, dex={}, liquidity_pool={}, from_block={}, to_block={}, granularities={}).".format(
+                self.log_prefix,
+                __name__.split(".")[-1],
+                chain.name,
+                dex.name,
+                liquidity_pool.name,
+                from_block,
+                to_block,
+                [granularity.name for granularity in granularities],
+            )
+        )
+
+        try:
+            lp_client = factory.DexProviderFactory().create(chain=chain, dex=dex, liquidity_pool=liquidity_pool)
+        except dex_exceptions.DexProviderException as e:
+            logger.exception(
+                "{} Unable to create dex provider factory (chain={}, dex={}, liquidity_pool={}). Error: {}.".format(
+                    self.log_prefix,
+                    chain.name,
+                    dex.name,
+                    liquidity_pool.name,
+                    common_utils.get_exception_message(exception=e),
+                )
+            )
+            raise e
+
+        rollup_builder = lp_rollups_services.LiquidityPoolRollupBuilder(dex_provider_client=lp_client)
+        chunk_from_block = from_block
+        while chunk_from_block <= to_block:
+            chunk_to_block = min(chunk_from_block + lp_client.max_events_block_diff, to_block)
+            rollup_builder.update_rollups(
+                from_block=chunk_from_block,
+                to_block=chunk_to_block,
+                granularities=granularities,
+            )
+            chunk_from_block = chunk_to_block + 1
+
+        logger.info(
+            "{} Finished command '{}' (chain={}, dex={}, liquidity_pool={}).".format(
+                self.log_prefix,
+                __name__.split(".")[-1],
+                chain.name,
+                dex.name,
+                liquidity_pool.name,
+            )
+        )
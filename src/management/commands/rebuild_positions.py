@@ -0,0 +1,102 @@
+import logging
+import time
+import typing
+
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import transaction
+
+from common import utils as common_utils
+from src import enums
+from src.clients.dex import exceptions as dex_exceptions
+from src.clients.dex import factory
+from src.clients.dex import utils as dex_utils
+from src.services import lp_positions as lp_positions_services
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = """
+            Rebuilds the LP token position ledger of liquidity pools by replaying their stored Transfer events,
+            importers keep it up to date afterwards. Needed for pools imported before the ledger existed.
+            ex. python manage.py rebuild_positions --chain=PULSE --dex=PULSEX [--pool=WPLS_DAI]
+            """
+
+    log_prefix = "[REBUILD-POSITIONS]"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--chain",
+            required=True,
+            type=str,
+            choices=[chain.name for chain in enums.Chain],
+            help="Denotes the chain on which dex of liquidity pools is hosted.",
+        )
+
+        parser.add_argument(
+            "--dex",
+            required=True,
+            type=str,
+            choices=[dex.name for dex in enums.Dex],
+            help="Denotes the DEX on which liquidity pools are hosted.",
+        )
+
+        parser.add_argument(
+            "--pool",
+            required=False,
+            type=str,
+            action="append",
+            choices=[pool.name for pool in enums.LiquidityPool],
+            help="Liquidity pool to rebuild. Can be repeated, defaults to all pools of the DEX.",
+        )
+
+    def handle(self, *args: typing.Any, **kwargs: typing.Any) -> None:
+        chain = enums.Chain[kwargs["chain"]]
+        dex = enums.Dex[kwargs["dex"]]
+        liquidity_pools = [
+            enums.LiquidityPool[liquidity_pool] for liquidity_pool in kwargs["pool"] or []
+        ] or dex_utils.get_liquidity_pools(chain=chain, dex=dex)
+
+        logger.info(
+            "{} Started command '{}' (chain={}, dex={}, liquidity_pools={}).".format(
+                self.log_prefix,
+                __name__.split(".")[-1],
+                chain.name,
+                dex.name,
+                [liquidity_pool.name for liquidity_pool in liquidity_pools],
+            )
+        )
+
+        for liquidity_pool in liquidity_pools:
+            try:
+                lp_client = factory.DexProviderFactory().create(chain=chain, dex=dex, liquidity_pool=liquidity_pool)
+            except dex_exceptions.DexProviderException as e:
+                logger.exception(
+                    "{} Unable to create dex provider factory (chain={}, dex={}, liquidity_pool={}). Error: {}. Continue.".format(
+                        self.log_prefix,
+                        chain.name,
+                        dex.name,
+                        liquidity_pool.name,
+                        common_utils.get_exception_message(exception=e),
+                    )
+                )
+                continue
+
+            started_at = time.perf_counter()
+            # Importers of the pool wait for the rebuild instead of ledgering transfers next to it.
+            with transaction.atomic():
+                transfers_count = lp_positions_services.LiquidityPoolPositionLedger(
+                    dex_provider_client=lp_client
+                ).update_positions(from_block=0)
+
+            logger.info(
+                "{} Rebuilt positions (liquidity_pool={}, transfers={}, duration_seconds={:.3f}).".format(
+                    self.log_prefix, liquidity_pool.name, transfers_count, time.perf_counter() - started_at
+                )
+            )
+
+        logger.info(
+            "{} Finished command '{}' (chain={}, dex={}).".format(
+                self.log_prefix, __name__.split(".")[-1], chain.name, dex.name
+            )
+        )
@@ -0,0 +1,105 @@
+import logging
+import time
+import typing
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from common import utils as common_utils
+from src import enums, exceptions
+from src.services import lp_price_index as lp_price_index_services
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = """
+            Recomputes USD prices of tokens of a DEX from the reserves derived table, which has to be rebuilt first for
+            pools imported before it existed (rebuild_derived_table --derivation=reserves).
+            ex. python manage.py rebuild_price_index --chain=PULSE --dex=PULSEX [--token=HEX] [--from-block=17240384 --to-block=17300000]
+            """
+
+    log_prefix = "[REBUILD-PRICE-INDEX]"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--chain",
+            required=True,
+            type=str,
+            choices=[chain.name for chain in enums.Chain],
+            help="Denotes the chain on which the DEX is hosted.",
+        )
+
+        parser.add_argument(
+            "--dex",
+            required=True,
+            type=str,
+            choices=[dex.name for dex in enums.Dex],
+            help="Denotes the DEX whose token prices are rebuilt.",
+        )
+
+        parser.add_argument(
+            "--token",
+            required=False,
+            type=str,
+            action="append",
+            help="Token to rebuild. Can be repeated, defaults to all routed tokens of the DEX.",
+        )
+
+        parser.add_argument(
+            "--from-block",
+            required=False,
+            type=int,
+            help="First block to rebuild, defaults to the first stored reserves of the routed pools.",
+        )
+
+        parser.add_argument(
+            "--to-block",
+            required=False,
+            type=int,
+            help="Last block to rebuild, defaults to the last stored reserves of the routed pools.",
+        )
+
+    def handle(self, *args: typing.Any, **kwargs: typing.Any) -> None:
+        chain = enums.Chain[kwargs["chain"]]
+        dex = enums.Dex[kwargs["dex"]]
+
+        try:
+            price_indexer = lp_price_index_services.TokenPriceIndexer(chain=chain, dex=dex)
+        except exceptions.LiquidityPoolPriceIndexException as e:
+            raise CommandError(common_utils.get_exception_message(exception=e))
+
+        tokens = kwargs["token"] or price_indexer.tokens
+        unknown_tokens = [token for token in tokens if token not in price_indexer.tokens]
+        if unknown_tokens:
+            raise CommandError(
+                "Tokens {} are not routed, routed tokens are {}.".format(unknown_tokens, price_indexer.tokens)
+            )
+
+        logger.info(
+            "{} Started command '{}' (chain={}, dex={}, tokens={}).".format(
+                self.log_prefix, __name__.split(".")[-1], chain.name, dex.name, tokens
+            )
+        )
+
+        block_range = price_indexer.get_block_range(
+            tokens=tokens, from_block=kwargs["from_block"], to_block=kwargs["to_block"]
+        )
+        if not block_range:
+            logger.info("{} No stored reserves of routed pools to price tokens with.".format(self.log_prefix))
+            return
+
+        started_at = time.perf_counter()
+        prices_count = price_indexer.update_prices(from_block=block_range[0], to_block=block_range[1], tokens=tokens)
+
+        logger.info(
+            "{} Finished command '{}' (chain={}, dex={}, from_block={}, to_block={}, prices={}, duration_seconds={:.3f}).".format(
+                self.log_prefix,
+                __name__.split(".")[-1],
+                chain.name,
+                dex.name,
+                block_range[0],
+                block_range[1],
+                prices_count,
+                time.perf_counter() - started_at,
+            )
+        )
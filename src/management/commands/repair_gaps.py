@@ -0,0 +1,140 @@
+import logging
+import typing
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from common import utils as common_utils
+from src import enums, exceptions, metrics
+from src.clients.dex import exceptions as dex_exceptions
+from src.clients.dex import factory
+from src.clients.dex import utils as dex_utils
+from src.services import lp_importer as lp_importer_services
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = """
+            Imports only block ranges of liquidity pools without committed events (gaps of the coverage table).
+            ex. python manage.py repair_gaps --chain=PULSE --dex=PULSEX [--pool=WPLS_DAI] [--from-block=17240384 --to-block=17300000] [--workers=4] [--dry-run]
+            """
+
+    log_prefix = "[REPAIR-GAPS]"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--chain",
+            required=True,
+            type=str,
+            choices=[chain.name for chain in enums.Chain],
+            help="Denotes the chain on which dex of liquidity pools is hosted.",
+        )
+
+        parser.add_argument(
+            "--dex",
+            required=True,
+            type=str,
+            choices=[dex.name for dex in enums.Dex],
+            help="Denotes the DEX on which liquidity pools are hosted.",
+        )
+
+        parser.add_argument(
+            "--pool",
+            required=False,
+            type=str,
+            action="append",
+            choices=[pool.name for pool in enums.LiquidityPool],
+            help="Liquidity pool to repair. Can be repeated, defaults to all pools of the DEX.",
+        )
+
+        parser.add_argument(
+            "--from-block",
+            required=False,
+            type=int,
+            help="First block to check, defaults to the first imported block of the pool.",
+        )
+
+        parser.add_argument(
+            "--to-block",
+            required=False,
+            type=int,
+            help="Last block to check, defaults to the block reference of the pool.",
+        )
+
+        parser.add_argument(
+            "--workers",
+            required=False,
+            type=int,
+            default=4,
+            help="Number of block windows fetched from the node concurrently.",
+        )
+
+        parser.add_argument(
+            "--dry-run",
+            required=False,
+            action="store_true",
+            help="Only reports missing block ranges.",
+        )
+
+        parser.add_argument(
+            "--metrics-file",
+            required=False,
+            type=str,
+            help="Path to the Prometheus textfile to which metrics are written after the repair.",
+        )
+
+    def handle(self, *args: typing.Any, **kwargs: typing.Any) -> None:
+        chain = enums.Chain[kwargs["chain"]]
+        dex = enums.Dex[kwargs["dex"]]
+        liquidity_pools = [
+            enums.LiquidityPool[liquidity_pool] for liquidity_pool in kwargs["pool"] or []
+        ] or dex_utils.get_liquidity_pools(chain=chain, dex=dex)
+        metrics_file = kwargs["metrics_file"]
+
+        logger.info(
+            "{} Started command '{}' (chain={}, dex={}, liquidity_pools={}, dry_run={}).".format(
+                self.log_prefix,
+                __name__.split(".")[-1],
+                chain.name,
+                dex.name,
+                [liquidity_pool.name for liquidity_pool in liquidity_pools],
+                kwargs["dry_run"],
+            )
+        )
+
+        for liquidity_pool in liquidity_pools:
+            try:
+                lp_client = factory.DexProviderFactory().create(chain=chain, dex=dex, liquidity_pool=liquidity_pool)
+            except dex_exceptions.DexProviderClientException as e:
+                logger.exception(
+                    "{} Unable to create dex provider factory (chain={}, dex={}, liquidity_pool={}). Error: {}. Continue.".format(
+                        self.log_prefix,
+                        chain.name,
+                        dex.name,
+                        liquidity_pool.name,
+                        common_utils.get_exception_message(exception=e),
+                    )
+                )
+                continue
+
+            try:
+                lp_importer_services.LiquidityPoolImporter(dex_provider_client=lp_client).repair_missing_block_ranges(
+                    from_block=kwargs["from_block"],
+                    to_block=kwargs["to_block"],
+                    workers=kwargs["workers"],
+                    dry_run=kwargs["dry_run"],
+                )
+            except exceptions.LiquidityPoolImporterException as e:
+                logger.exception(
+                    "{} {}. Continue.".format(self.log_prefix, common_utils.get_exception_message(exception=e))
+                )
+
+        if metrics_file:
+            metrics.write_textfile(path=metrics_file)
+            logger.info("{} Written metrics to textfile '{}'.".format(self.log_prefix, metrics_file))
+
+        logger.info(
+            "{} Finished command '{}' (chain={}, dex={}).".format(
+                self.log_prefix, __name__.split(".")[-1], chain.name, dex.name
+            )
+        )
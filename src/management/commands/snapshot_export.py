@@ -0,0 +1,131 @@
+import logging
+import typing
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from common import utils as common_utils
+from src import enums, exceptions
+from src.clients.dex import exceptions as dex_exceptions
+from src.clients.dex import factory
+from src.clients.dex import utils as dex_utils
+from src.services import lp_snapshot as lp_snapshot_services
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = """
+            Exports transactions, events, rollups and import checkpoints of liquidity pools to a compressed columnar snapshot file.
+            ex. python manage.py snapshot_export --chain=PULSE --dex=PULSEX [--pool=WPLS_DAI] --output-file=pulsex.snapshot [--overwrite]
+            """
+
+    log_prefix = "[SNAPSHOT-EXPORT]"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--chain",
+            required=True,
+            type=str,
+            choices=[chain.name for chain in enums.Chain],
+            help="Denotes the chain on which dex of liquidity pools is hosted.",
+        )
+
+        parser.add_argument(
+            "--dex",
+            required=True,
+            type=str,
+            choices=[dex.name for dex in enums.Dex],
+            help="Denotes the DEX on which liquidity pools are hosted.",
+        )
+
+        parser.add_argument(
+            "--pool",
+            required=False,
+            type=str,
+            action="append",
+            choices=[pool.name for pool in enums.LiquidityPool],
+            help="Liquidity pool to export. Can be repeated, defaults to all pools of the DEX.",
+        )
+
+        parser.add_argument(
+            "--output-file",
+            required=True,
+            type=str,
+            help="Path to the output snapshot file.",
+        )
+
+        parser.add_argument(
+            "--overwrite",
+            required=False,
+            action="store_true",
+            help="If the target snapshot file already exists it will overwrite it.",
+        )
+
+        parser.add_argument(
+            "--compression-level",
+            required=False,
+            type=int,
+            default=3,
+            help="Compression level of column chunks.",
+        )
+
+    def handle(self, *args: typing.Any, **kwargs: typing.Any) -> None:
+        chain = enums.Chain[kwargs["chain"]]
+        dex = enums.Dex[kwargs["dex"]]
+        liquidity_pools = [
+            enums.LiquidityPool[liquidity_pool] for liquidity_pool in kwargs["pool"] or []
+        ] or dex_utils.get_liquidity_pools(chain=chain, dex=dex)
+        output_path = kwargs["output_file"]
+
+        logger.info(
+            "{} Started command '{}' (chain={}, dex={}, liquidity_pools={}, output_path={}).".format(
+                self.log_prefix,
+                __name__.split(".")[-1],
+                chain.name,
+                dex.name,
+                [liquidity_pool.name for liquidity_pool in liquidity_pools],
+                output_path,
+            )
+        )
+
+        try:
+            writer = lp_snapshot_services.LiquidityPoolSnapshotWriter(
+                path=output_path,
+                chain=chain,
+                dex=dex,
+                compression_level=kwargs["compression_level"],
+                overwrite_file=kwargs["overwrite"],
+            )
+        except exceptions.LiquidityPoolSnapshotException as e:
+            raise CommandError(common_utils.get_exception_message(exception=e))
+
+        with writer:
+            for liquidity_pool in liquidity_pools:
+                try:
+                    lp_client = factory.DexProviderFactory().create(chain=chain, dex=dex, liquidity_pool=liquidity_pool)
+                except dex_exceptions.DexProviderException as e:
+                    logger.exception(
+                        "{} Unable to create dex provider factory (chain={}, dex={}, liquidity_pool={}). Error: {}. Continue.".format(
+                            self.log_prefix,
+                            chain.name,
+                            dex.name,
+                            liquidity_pool.name,
+                            common_utils.get_exception_message(exception=e),
+                        )
+                    )
+                    continue
+
+                try:
+                    lp_snapshot_services.LiquidityPoolSnapshotter(dex_provider_client=lp_client).export_snapshot(
+                        writer=writer
+                    )
+                except exceptions.LiquidityPoolSnapshotException as e:
+                    logger.exception(
+                        "{} {}. Continue.".format(self.log_prefix, common_utils.get_exception_message(exception=e))
+                    )
+
+        logger.info(
+            "{} Finished command '{}' (chain={}, dex={}).".format(
+                self.log_prefix, __name__.split(".")[-1], chain.name, dex.name
+            )
+        )
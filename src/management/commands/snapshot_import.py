@@ -0,0 +1,94 @@
+import logging
+import typing
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from common import utils as common_utils
+from src import enums, exceptions
+from src.clients.dex import exceptions as dex_exceptions
+from src.clients.dex import factory
+from src.services import lp_snapshot as lp_snapshot_services
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = """
+            Bulk loads liquidity pools of a snapshot file into a database without their data and sets their block references,
+            import_liquidity_provider_data then continues from the snapshot blocks. Stop importers of the database while loading.
+            ex. python manage.py snapshot_import --input-file=pulsex.snapshot [--pool=WPLS_DAI]
+            """
+
+    log_prefix = "[SNAPSHOT-IMPORT]"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--input-file",
+            required=True,
+            type=str,
+            help="Path to the snapshot file.",
+        )
+
+        parser.add_argument(
+            "--pool",
+            required=False,
+            type=str,
+            action="append",
+            choices=[pool.name for pool in enums.LiquidityPool],
+            help="Liquidity pool to import. Can be repeated, defaults to all pools of the snapshot.",
+        )
+
+    def handle(self, *args: typing.Any, **kwargs: typing.Any) -> None:
+        input_path = kwargs["input_file"]
+        try:
+            reader = lp_snapshot_services.LiquidityPoolSnapshotReader(path=input_path)
+        except exceptions.LiquidityPoolSnapshotException as e:
+            raise CommandError(common_utils.get_exception_message(exception=e))
+
+        with reader:
+            chain = reader.chain
+            dex = reader.dex
+            liquidity_pools = [
+                enums.LiquidityPool[liquidity_pool] for liquidity_pool in kwargs["pool"] or []
+            ] or reader.liquidity_pools
+
+            logger.info(
+                "{} Started command '{}' (chain={}, dex={}, liquidity_pools={}, input_path={}).".format(
+                    self.log_prefix,
+                    __name__.split(".")[-1],
+                    chain.name,
+                    dex.name,
+                    [liquidity_pool.name for liquidity_pool in liquidity_pools],
+                    input_path,
+                )
+            )
+
+            for liquidity_pool in liquidity_pools:
+                try:
+                    lp_client = factory.DexProviderFactory().create(chain=chain, dex=dex, liquidity_pool=liquidity_pool)
+                except (dex_exceptions.DexProviderException, KeyError) as e:
+                    logger.exception(
+                        "{} Unable to create dex provider factory (chain={}, dex={}, liquidity_pool={}). Error: {}. Continue.".format(
+                            self.log_prefix,
+                            chain.name,
+                            dex.name,
+                            liquidity_pool.name,
+                            common_utils.get_exception_message(exception=e),
+                        )
+                    )
+                    continue
+
+                try:
+                    lp_snapshot_services.LiquidityPoolSnapshotter(dex_provider_client=lp_client).import_snapshot(
+                        reader=reader
+                    )
+                except exceptions.LiquidityPoolSnapshotException as e:
+                    logger.exception(
+                        "{} {}. Continue.".format(self.log_prefix, common_utils.get_exception_message(exception=e))
+                    )
+
+        logger.info(
+            "{} Finished command '{}' (chain={}, dex={}).".format(
+                self.log_prefix, __name__.split(".")[-1], chain.name, dex.name
+            )
+        )
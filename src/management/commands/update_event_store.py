@@ -0,0 +1,106 @@
+import logging
+import typing
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from common import utils as common_utils
+from src import enums, exceptions
+from src.clients.dex import exceptions as dex_exceptions
+from src.clients.dex import factory
+from src.clients.dex import utils as dex_utils
+from src.services import lp_exporter as lp_exporter_services
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = """
+            Appends newly imported events of liquidity pools to their columnar event stores in LP_EVENT_STORE_DIR.
+            ex. python manage.py update_event_store --chain=PULSE --dex=PULSEX [--pool=WPLS_DAI]
+            """
+
+    log_prefix = "[UPDATE-EVENT-STORE]"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--chain",
+            required=True,
+            type=str,
+            choices=[chain.name for chain in enums.Chain],
+            help="Denotes the chain on which dex of liquidity pools is hosted.",
+        )
+
+        parser.add_argument(
+            "--dex",
+            required=True,
+            type=str,
+            choices=[dex.name for dex in enums.Dex],
+            help="Denotes the DEX on which liquidity pools are hosted.",
+        )
+
+        parser.add_argument(
+            "--pool",
+            required=False,
+            type=str,
+            choices=[pool.name for pool in enums.LiquidityPool],
+            help="Denotes the liquidity pool to be updated. All liquidity pools of the DEX are updated by default.",
+        )
+
+    def handle(self, *args: typing.Any, **kwargs: typing.Any) -> None:
+        chain = enums.Chain[kwargs["chain"]]
+        dex = enums.Dex[kwargs["dex"]]
+        liquidity_pools = (
+            [enums.LiquidityPool[kwargs["pool"]]]
+            if kwargs["pool"]
+            else dex_utils.get_liquidity_pools(chain=chain, dex=dex)
+        )
+
+        logger.info(
+            "{} Started command '{}' (chain={}, dex={}, liquidity_pools={}).".format(
+                self.log_prefix,
+                __name__.split(".")[-1],
+                chain.name,
+                dex.name,
+                liquidity_pools,
+            )
+        )
+
+        for liquidity_pool in liquidity_pools:
+            try:
+                lp_client = factory.DexProviderFactory().create(chain=chain, dex=dex, liquidity_pool=liquidity_pool)
+            except dex_exceptions.DexProviderClientException as e:
+                logger.exception(
+                    "{} Unable to create dex provider factory (chain={}, dex={}, liquidity_pool={}). Error: {}. Continue.".format(
+                        self.log_prefix,
+                        chain.name,
+                        dex.name,
+                        liquidity_pool.name,
+                        common_utils.get_exception_message(exception=e),
+                    )
+                )
+                continue
+
+            try:
+                appended_rows_count = lp_exporter_services.LiquidityPoolExporter(
+                    dex_provider_client=lp_client
+                ).persist_event_store()
+            except exceptions.LiquidityPoolEventStoreException as e:
+                logger.exception(
+                    "{} {}. Continue.".format(self.log_prefix, common_utils.get_exception_message(exception=e))
+                )
+                continue
+
+            logger.info(
+                "{} Updated event store (liquidity_pool={}, appended_rows={}).".format(
+                    self.log_prefix, liquidity_pool.name, appended_rows_count
+                )
+            )
+
+        logger.info(
+            "{} Finished command '{}' (chain={}, dex={}).".format(
+                self.log_prefix,
+                __name__.split(".")[-1],
+                chain.name,
+                dex.name,
+            )
+        )
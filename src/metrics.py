@@ -0,0 +1,140 @@
+import atexit
+import os
+import time
+import typing
+
+import prometheus_client
+from prometheus_client import multiprocess
+
+# Directory shared by the server and command processes (cron importers), metrics of all processes are then served on
+# `/metrics`. Has to be set in the environment before `prometheus_client` is imported, see docs.
+MULTIPROCESS_DIR = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+
+POOL_LABELS = ["chain", "dex", "liquidity_pool"]
+
+RPC_REQUEST_DURATION = prometheus_client.Histogram(
+    "lp_indexer_rpc_request_duration_seconds",
+    "Duration of JSON-RPC requests to the validator node.",
+    POOL_LABELS + ["method"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+RPC_REQUEST_ERRORS = prometheus_client.Counter(
+    "lp_indexer_rpc_request_errors_total",
+    "Number of failed JSON-RPC requests to the validator node.",
+    POOL_LABELS + ["method"],
+)
+RPC_REQUEST_RETRIES = prometheus_client.Counter(
+    "lp_indexer_rpc_request_retries_total",
+    "Number of retried JSON-RPC requests to validator nodes.",
+    ["method"],
+)
+RPC_CACHE_REQUESTS = prometheus_client.Counter(
+    "lp_indexer_rpc_cache_requests_total",
+    "Number of JSON-RPC results looked up in the response cache by result (hit or miss).",
+    POOL_LABELS + ["method", "result"],
+)
+RPC_CACHE_SIZE_BYTES = prometheus_client.Gauge(
+    "lp_indexer_rpc_cache_size_bytes",
+    "Size of compressed entries of the JSON-RPC response cache.",
+    ["chain"],
+    multiprocess_mode="livemax",
+)
+VALIDATION_DURATION = prometheus_client.Histogram(
+    "lp_indexer_validation_duration_seconds",
+    "Duration of validating node responses with marshmallow schemas.",
+    POOL_LABELS + ["schema"],
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5),
+)
+EVENTS_FETCHED = prometheus_client.Counter(
+    "lp_indexer_events_fetched_total",
+    "Number of events fetched from the validator node.",
+    POOL_LABELS,
+)
+EVENTS_INSERTED = prometheus_client.Counter(
+    "lp_indexer_events_inserted_total",
+    "Number of events inserted into the database.",
+    POOL_LABELS,
+)
+TRANSACTIONS_INSERTED = prometheus_client.Counter(
+    "lp_indexer_transactions_inserted_total",
+    "Number of transactions inserted into the database.",
+    POOL_LABELS,
+)
+WINDOW_DURATION = prometheus_client.Histogram(
+    "lp_indexer_window_duration_seconds",
+    "Duration of importing one block window.",
+    POOL_LABELS,
+    buckets=(0.1, 0.5, 1, 5, 10, 30, 60, 120, 300, 600, 1800),
+)
+WINDOW_DB_DURATION = prometheus_client.Histogram(
+    "lp_indexer_window_db_duration_seconds",
+    "Time spent executing database queries while importing one block window.",
+    POOL_LABELS,
+    buckets=(0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 120, 300),
+)
+WINDOW_SIZE_BLOCKS = prometheus_client.Gauge(
+    "lp_indexer_window_size_blocks",
+    "Number of blocks in the last imported block window.",
+    POOL_LABELS,
+    multiprocess_mode="livemax",
+)
+BLOCKS_BEHIND_HEAD = prometheus_client.Gauge(
+    "lp_indexer_blocks_behind_head",
+    "Number of blocks between the last imported block window and the chain head.",
+    POOL_LABELS,
+    multiprocess_mode="livemax",
+)
+EVENTS_EXPORTED = prometheus_client.Counter(
+    "lp_indexer_events_exported_total",
+    "Number of events exported from the database.",
+    POOL_LABELS,
+)
+
+
+def get_pool_labels(dex_provider_client: typing.Any) -> typing.Dict[str, str]:
+    return {
+        "chain": dex_provider_client.chain.name,
+        "dex": dex_provider_client.dex.name,
+        "liquidity_pool": dex_provider_client.liquidity_pool.name if dex_provider_client.liquidity_pool else "ALL",
+    }
+
+
+if MULTIPROCESS_DIR:
+    # Gauges of exited processes are dropped, counters and histograms of exited processes keep being summed.
+    atexit.register(multiprocess.mark_process_dead, os.getpid())
+
+
+def generate_latest() -> bytes:
+    """
+    Returns metrics in the text exposition format, of all processes sharing `PROMETHEUS_MULTIPROC_DIR` when set.
+    """
+    if not MULTIPROCESS_DIR:
+        return prometheus_client.generate_latest(prometheus_client.REGISTRY)
+
+    registry = prometheus_client.CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return prometheus_client.generate_latest(registry)
+
+
+def write_textfile(path: str) -> None:
+    prometheus_client.write_to_textfile(path=path, registry=prometheus_client.REGISTRY)
+
+
+class QueryCounter(object):
+    """
+    Database execute wrapper counting executed queries and their duration, see `connection.execute_wrapper`.
+    """
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(
+        self, execute: typing.Callable, sql: str, params: typing.Any, many: bool, context: typing.Dict
+    ) -> typing.Any:
+        started_at = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - started_at
@@ -1,6 +1,28 @@
+import typing
+
 from django.db import models as django_db_models
 
 
+class PoolBlockRangeQuerySet(django_db_models.QuerySet):
+    def for_pool(
+        self,
+        contract_address: str,
+        from_block: typing.Optional[int] = None,
+        to_block: typing.Optional[int] = None,
+    ) -> "PoolBlockRangeQuerySet":
+        """
+        Filters rows of a liquidity pool in the inclusive block range on the partition keys, so that
+        partitioned tables only scan partitions of the pool and the block range.
+        """
+        queryset = self.filter(contract_address=contract_address)
+        if from_block is not None:
+            queryset = queryset.filter(block_number__gte=from_block)
+        if to_block is not None:
+            queryset = queryset.filter(block_number__lte=to_block)
+
+        return queryset
+
+
 class Transaction(django_db_models.Model):
     transaction_hash = django_db_models.CharField(null=False, max_length=255)
     transaction_index = django_db_models.IntegerField(null=False)
@@ -11,16 +33,20 @@ class Transaction(django_db_models.Model):
     to_address = django_db_models.CharField(null=True, max_length=255)
     gas = django_db_models.CharField(null=False, max_length=255)
     gas_price = django_db_models.CharField(null=False, max_length=255)
+    block_timestamp = django_db_models.BigIntegerField(null=True)
 
     created_at = django_db_models.DateTimeField(auto_now_add=True)
     updated_at = django_db_models.DateTimeField(auto_now=True)
 
+    objects = PoolBlockRangeQuerySet.as_manager()
+
     class Meta:
         app_label = "src"
         db_table = "lp_pool_transaction"
         indexes = [
             django_db_models.Index(fields=["transaction_hash"]),
             django_db_models.Index(fields=["contract_address"]),
+            django_db_models.Index(fields=["contract_address", "block_number"]),
         ]
 
 
@@ -29,18 +55,27 @@ class TransactionEvent(django_db_models.Model):
     topics = django_db_models.TextField(null=False)
     data = django_db_models.TextField(null=False)
     log_index = django_db_models.IntegerField(null=False)
+    # Partition keys denormalized from the transaction.
+    contract_address = django_db_models.CharField(null=False, max_length=255)
+    block_number = django_db_models.IntegerField(null=False)
 
     created_at = django_db_models.DateTimeField(auto_now_add=True)
     updated_at = django_db_models.DateTimeField(auto_now=True)
 
+    # Partitioned transactions can not be referenced by a foreign key constraint.
     transaction = django_db_models.ForeignKey(
-        Transaction, on_delete=django_db_models.CASCADE
+        Transaction, on_delete=django_db_models.CASCADE, db_constraint=False
     )
 
+    objects = PoolBlockRangeQuerySet.as_manager()
+
     class Meta:
         app_label = "src"
         db_table = "lp_pool_transaction_event"
-        indexes = [django_db_models.Index(fields=["log_index", "transaction_id"])]
+        indexes = [
+            django_db_models.Index(fields=["log_index", "transaction_id"]),
+            django_db_models.Index(fields=["contract_address", "block_number"]),
+        ]
 
 
 class LiquidityPoolImporterBlockReference(django_db_models.Model):
@@ -52,6 +87,10 @@ class LiquidityPoolImporterBlockReference(django_db_models.Model):
     liquidity_pool_name = django_db_models.CharField(null=False, max_length=255)
     block_number = django_db_models.IntegerField(null=False)
     block_hash = django_db_models.CharField(null=False, max_length=255)
+    # First block of the import, event types added later are backfilled from it.
+    start_block_number = django_db_models.IntegerField(null=True)
+    # JSON list of event types imported up to `block_number`, all events of the DEX when null.
+    event_names = django_db_models.TextField(null=True)
 
     created_at = django_db_models.DateTimeField(auto_now_add=True)
     updated_at = django_db_models.DateTimeField(auto_now=True)
@@ -59,3 +98,308 @@ class LiquidityPoolImporterBlockReference(django_db_models.Model):
     class Meta:
         app_label = "src"
         db_table = "lp_pool_block_reference"
+
+
+class LiquidityPoolBlockRange(django_db_models.Model):
+    """
+    Inclusive block range of a liquidity pool whose events are committed. Ranges of a pool
+    never overlap or touch, adjacent ranges are merged on write.
+    """
+
+    chain = django_db_models.IntegerField(null=False)
+    dex = django_db_models.IntegerField(null=False)
+    liquidity_pool = django_db_models.IntegerField(null=False)
+    from_block_number = django_db_models.IntegerField(null=False)
+    to_block_number = django_db_models.IntegerField(null=False)
+
+    created_at = django_db_models.DateTimeField(auto_now_add=True)
+    updated_at = django_db_models.DateTimeField(auto_now=True)
+
+    class Meta:
+        app_label = "src"
+        db_table = "lp_pool_block_range"
+        indexes = [
+            django_db_models.Index(
+                fields=["chain", "dex", "liquidity_pool", "from_block_number"]
+            ),
+        ]
+
+
+class LiquidityPoolRollup(django_db_models.Model):
+    chain = django_db_models.IntegerField(null=False)
+    dex = django_db_models.IntegerField(null=False)
+    liquidity_pool = django_db_models.IntegerField(null=False)
+    granularity = django_db_models.IntegerField(null=False)
+    bucket_start = django_db_models.BigIntegerField(null=False)
+    first_block_number = django_db_models.IntegerField(null=False)
+    last_block_number = django_db_models.IntegerField(null=False)
+    open_price = django_db_models.FloatField(null=True)
+    high_price = django_db_models.FloatField(null=True)
+    low_price = django_db_models.FloatField(null=True)
+    close_price = django_db_models.FloatField(null=True)
+    volume_token0 = django_db_models.CharField(null=False, max_length=255)
+    volume_token1 = django_db_models.CharField(null=False, max_length=255)
+    swap_count = django_db_models.IntegerField(null=False, default=0)
+    sync_count = django_db_models.IntegerField(null=False, default=0)
+    mint_count = django_db_models.IntegerField(null=False, default=0)
+    burn_count = django_db_models.IntegerField(null=False, default=0)
+    transfer_count = django_db_models.IntegerField(null=False, default=0)
+    approval_count = django_db_models.IntegerField(null=False, default=0)
+
+    created_at = django_db_models.DateTimeField(auto_now_add=True)
+    updated_at = django_db_models.DateTimeField(auto_now=True)
+
+    class Meta:
+        app_label = "src"
+        db_table = "lp_pool_rollup"
+        constraints = [
+            django_db_models.UniqueConstraint(
+                fields=[
+                    "chain",
+                    "dex",
+                    "liquidity_pool",
+                    "granularity",
+                    "bucket_start",
+                ],
+                name="lp_pool_rollup_bucket_unique",
+            )
+        ]
+
+
+class LiquidityPoolReserve(django_db_models.Model):
+    """
+    Reserves of a liquidity pool after a `Sync` event, derived from stored events by the
+    `reserves` derivation (`lp_derivation`).
+    """
+
+    chain = django_db_models.IntegerField(null=False)
+    dex = django_db_models.IntegerField(null=False)
+    liquidity_pool = django_db_models.IntegerField(null=False)
+    block_number = django_db_models.IntegerField(null=False)
+    log_index = django_db_models.IntegerField(null=False)
+    reserve0 = django_db_models.CharField(null=False, max_length=255)
+    reserve1 = django_db_models.CharField(null=False, max_length=255)
+    # reserve1 / reserve0 in raw token units, null when reserve0 is zero.
+    price = django_db_models.FloatField(null=True)
+
+    created_at = django_db_models.DateTimeField(auto_now_add=True)
+    updated_at = django_db_models.DateTimeField(auto_now=True)
+
+    class Meta:
+        app_label = "src"
+        db_table = "lp_pool_reserve"
+        indexes = [
+            django_db_models.Index(
+                fields=["chain", "dex", "liquidity_pool", "block_number"]
+            ),
+        ]
+
+
+class LiquidityPoolDerivationChunk(django_db_models.Model):
+    """
+    Block range chunk of a liquidity pool whose rows of a derived table are written by a
+    derivation version, rebuilds of the derivation skip completed chunks.
+    """
+
+    derivation = django_db_models.CharField(null=False, max_length=255)
+    version = django_db_models.IntegerField(null=False)
+    chain = django_db_models.IntegerField(null=False)
+    dex = django_db_models.IntegerField(null=False)
+    liquidity_pool = django_db_models.IntegerField(null=False)
+    from_block_number = django_db_models.IntegerField(null=False)
+    to_block_number = django_db_models.IntegerField(null=False)
+    row_count = django_db_models.IntegerField(null=False)
+
+    created_at = django_db_models.DateTimeField(auto_now_add=True)
+    updated_at = django_db_models.DateTimeField(auto_now=True)
+
+    class Meta:
+        app_label = "src"
+        db_table = "lp_derivation_chunk"
+        constraints = [
+            django_db_models.UniqueConstraint(
+                fields=[
+                    "derivation",
+                    "chain",
+                    "dex",
+                    "liquidity_pool",
+                    "from_block_number",
+                ],
+                name="lp_derivation_chunk_unique",
+            )
+        ]
+
+
+class LiquidityPoolTokenPrice(django_db_models.Model):
+    """
+    USD price of a token of a DEX at a block where reserves of a pool it is routed through
+    changed, maintained by the price index (`lp_price_index`).
+    """
+
+    chain = django_db_models.IntegerField(null=False)
+    dex = django_db_models.IntegerField(null=False)
+    token = django_db_models.CharField(null=False, max_length=255)
+    block_number = django_db_models.IntegerField(null=False)
+    price = django_db_models.FloatField(null=False)
+
+    created_at = django_db_models.DateTimeField(auto_now_add=True)
+    updated_at = django_db_models.DateTimeField(auto_now=True)
+
+    class Meta:
+        app_label = "src"
+        db_table = "lp_token_price"
+        constraints = [
+            django_db_models.UniqueConstraint(
+                fields=["chain", "dex", "token", "block_number"],
+                name="lp_token_price_unique",
+            )
+        ]
+
+
+class LiquidityPoolPosition(django_db_models.Model):
+    """
+    Current LP token balance of an address in a liquidity pool, maintained by the position
+    ledger (`lp_positions`) from `Transfer` events.
+    """
+
+    chain = django_db_models.IntegerField(null=False)
+    dex = django_db_models.IntegerField(null=False)
+    liquidity_pool = django_db_models.IntegerField(null=False)
+    address = django_db_models.CharField(null=False, max_length=255)
+    balance = django_db_models.CharField(null=False, max_length=255)
+    # Float approximation of the balance, orders positions by size on an index.
+    balance_value = django_db_models.FloatField(null=False)
+    # Block of the last balance change.
+    block_number = django_db_models.IntegerField(null=False)
+
+    created_at = django_db_models.DateTimeField(auto_now_add=True)
+    updated_at = django_db_models.DateTimeField(auto_now=True)
+
+    class Meta:
+        app_label = "src"
+        db_table = "lp_position"
+        indexes = [
+            django_db_models.Index(
+                fields=["chain", "dex", "liquidity_pool", "-balance_value"],
+                name="lp_position_balance_idx",
+            ),
+        ]
+        constraints = [
+            django_db_models.UniqueConstraint(
+                fields=["chain", "dex", "liquidity_pool", "address"],
+                name="lp_position_unique",
+            )
+        ]
+
+
+class LiquidityPoolPositionHistory(django_db_models.Model):
+    """
+    LP token balance of an address in a liquidity pool after every block changing it.
+    """
+
+    chain = django_db_models.IntegerField(null=False)
+    dex = django_db_models.IntegerField(null=False)
+    liquidity_pool = django_db_models.IntegerField(null=False)
+    address = django_db_models.CharField(null=False, max_length=255)
+    block_number = django_db_models.IntegerField(null=False)
+    balance = django_db_models.CharField(null=False, max_length=255)
+
+    created_at = django_db_models.DateTimeField(auto_now_add=True)
+    updated_at = django_db_models.DateTimeField(auto_now=True)
+
+    class Meta:
+        app_label = "src"
+        db_table = "lp_position_history"
+        indexes = [
+            django_db_models.Index(
+                fields=["chain", "dex", "liquidity_pool", "block_number"]
+            ),
+        ]
+        constraints = [
+            django_db_models.UniqueConstraint(
+                fields=["chain", "dex", "liquidity_pool", "address", "block_number"],
+                name="lp_position_history_unique",
+            )
+        ]
+
+
+class LiquidityPoolTotalSupply(django_db_models.Model):
+    """
+    LP token total supply of a liquidity pool after every block minting or burning LP tokens.
+    """
+
+    chain = django_db_models.IntegerField(null=False)
+    dex = django_db_models.IntegerField(null=False)
+    liquidity_pool = django_db_models.IntegerField(null=False)
+    block_number = django_db_models.IntegerField(null=False)
+    total_supply = django_db_models.CharField(null=False, max_length=255)
+
+    created_at = django_db_models.DateTimeField(auto_now_add=True)
+    updated_at = django_db_models.DateTimeField(auto_now=True)
+
+    class Meta:
+        app_label = "src"
+        db_table = "lp_pool_total_supply"
+        constraints = [
+            django_db_models.UniqueConstraint(
+                fields=["chain", "dex", "liquidity_pool", "block_number"],
+                name="lp_pool_total_supply_unique",
+            )
+        ]
+
+
+class LiquidityPool(django_db_models.Model):
+    """
+    Liquidity pool discovered from `PairCreated` events of a DEX factory contract.
+    """
+
+    chain = django_db_models.IntegerField(null=False)
+    chain_name = django_db_models.CharField(null=False, max_length=255)
+    dex = django_db_models.IntegerField(null=False)
+    dex_name = django_db_models.CharField(null=False, max_length=255)
+    contract_address = django_db_models.CharField(null=False, max_length=255)
+    token0_address = django_db_models.CharField(null=False, max_length=255)
+    token1_address = django_db_models.CharField(null=False, max_length=255)
+    pair_index = django_db_models.BigIntegerField(null=False)
+    created_block_number = django_db_models.IntegerField(null=False)
+    created_transaction_hash = django_db_models.CharField(null=False, max_length=255)
+    # Block up to which events of the pool are imported, null until the first backfill.
+    block_number = django_db_models.IntegerField(null=True)
+    is_active = django_db_models.BooleanField(null=False, default=True)
+
+    created_at = django_db_models.DateTimeField(auto_now_add=True)
+    updated_at = django_db_models.DateTimeField(auto_now=True)
+
+    class Meta:
+        app_label = "src"
+        db_table = "lp_pool"
+        indexes = [
+            django_db_models.Index(fields=["chain", "dex", "block_number"]),
+        ]
+        constraints = [
+            django_db_models.UniqueConstraint(
+                fields=["chain", "contract_address"],
+                name="lp_pool_contract_address_unique",
+            )
+        ]
+
+
+class DexFactoryBlockReference(django_db_models.Model):
+    chain = django_db_models.IntegerField(null=False)
+    chain_name = django_db_models.CharField(null=False, max_length=255)
+    dex = django_db_models.IntegerField(null=False)
+    dex_name = django_db_models.CharField(null=False, max_length=255)
+    block_number = django_db_models.IntegerField(null=False)
+
+    created_at = django_db_models.DateTimeField(auto_now_add=True)
+    updated_at = django_db_models.DateTimeField(auto_now=True)
+
+    class Meta:
+        app_label = "src"
+        db_table = "lp_dex_factory_block_reference"
+        constraints = [
+            django_db_models.UniqueConstraint(
+                fields=["chain", "dex"],
+                name="lp_dex_factory_block_reference_unique",
+            )
+        ]
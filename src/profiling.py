@@ -0,0 +1,187 @@
+import collections
+import contextlib
+import cProfile
+import datetime
+import io
+import logging
+import pstats
+import sys
+import threading
+import time
+import typing
+from pathlib import Path
+
+from django.core.management.base import CommandParser
+from django.db import connection
+
+from src import enums, metrics, signals
+
+logger = logging.getLogger(__name__)
+
+_TOP_FUNCTIONS_COUNT = 40
+
+
+def add_profile_arguments(parser: CommandParser) -> None:
+    parser.add_argument(
+        "--profile",
+        required=False,
+        type=str,
+        nargs="?",
+        const=enums.Profiler.CPROFILE.name,
+        choices=[profiler.name for profiler in enums.Profiler],
+        help="Runs the command under a profiler and writes profile artifacts to --profile-dir.",
+    )
+
+    parser.add_argument(
+        "--profile-dir",
+        required=False,
+        type=str,
+        default="profiles",
+        help="Directory to which profile artifacts are written.",
+    )
+
+
+class SamplingProfiler(object):
+    """
+    Samples the stack of the profiled thread from a background thread in a fixed interval.
+    """
+
+    def __init__(self, interval: float = 0.005) -> None:
+        self.interval = interval
+        self.stack_counts = collections.Counter()
+        self._thread_id = threading.get_ident()
+        self._stopped = threading.Event()
+        self._sampler_thread = threading.Thread(target=self._sample, daemon=True)
+
+    def enable(self) -> None:
+        self._sampler_thread.start()
+
+    def disable(self) -> None:
+        self._stopped.set()
+        self._sampler_thread.join()
+
+    def _sample(self) -> None:
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)
+            stack = []
+            while frame:
+                stack.append(
+                    "{}:{}:{}".format(frame.f_code.co_filename, frame.f_code.co_name, frame.f_code.co_firstlineno)
+                )
+                frame = frame.f_back
+            if stack:
+                self.stack_counts[tuple(reversed(stack))] += 1
+
+    def write_collapsed_stacks(self, path: Path) -> None:
+        with open(path, "w") as collapsed_stacks_file:
+            for stack, count in self.stack_counts.most_common():
+                collapsed_stacks_file.write("{} {}\n".format(";".join(stack), count))
+
+    def get_summary(self, limit: int) -> str:
+        total_samples = sum(self.stack_counts.values()) or 1
+        cumulative_counts = collections.Counter()
+        own_counts = collections.Counter()
+        for stack, count in self.stack_counts.items():
+            for function in set(stack):
+                cumulative_counts[function] += count
+            own_counts[stack[-1]] += count
+
+        lines = ["{} samples every {}s".format(total_samples, self.interval), "", "cumulative%   own%  function"]
+        for function, count in cumulative_counts.most_common(limit):
+            lines.append(
+                "{:>10.1f}  {:>5.1f}  {}".format(
+                    100 * count / total_samples, 100 * own_counts[function] / total_samples, function
+                )
+            )
+
+        return "\n".join(lines)
+
+
+class CommandProfiler(object):
+    def __init__(self, command_name: str, profiler: enums.Profiler, output_dir: str) -> None:
+        self.command_name = command_name
+        self.profiler = profiler
+        self.output_dir = Path(output_dir)
+        self.log_prefix = "[{}-PROFILER]".format(command_name.upper().replace("_", "-"))
+        self.query_counter = metrics.QueryCounter()
+        self.window_stats = []
+
+    def __enter__(self) -> "CommandProfiler":
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.artifact_path_prefix = self.output_dir / "{}-{}".format(
+            self.command_name, datetime.datetime.utcnow().strftime("%Y%m%dT%H%M%S")
+        )
+        signals.block_window_imported.connect(self._on_block_window_imported)
+        self._query_wrapper = connection.execute_wrapper(self.query_counter)
+        self._query_wrapper.__enter__()
+
+        self._profiler = cProfile.Profile() if self.profiler == enums.Profiler.CPROFILE else SamplingProfiler()
+        self._started_at = time.perf_counter()
+        self._profiler.enable()
+
+        return self
+
+    def __exit__(self, *args: typing.Any) -> None:
+        self._profiler.disable()
+        duration = time.perf_counter() - self._started_at
+        self._query_wrapper.__exit__(*args)
+        signals.block_window_imported.disconnect(self._on_block_window_imported)
+
+        if self.profiler == enums.Profiler.CPROFILE:
+            self._profiler.dump_stats(str(self.artifact_path_prefix.with_suffix(".prof")))
+            summary_stream = io.StringIO()
+            pstats.Stats(self._profiler, stream=summary_stream).sort_stats("cumulative").print_stats(
+                _TOP_FUNCTIONS_COUNT
+            )
+            summary = summary_stream.getvalue()
+        else:
+            self._profiler.write_collapsed_stacks(path=self.artifact_path_prefix.with_suffix(".collapsed"))
+            summary = self._profiler.get_summary(limit=_TOP_FUNCTIONS_COUNT)
+
+        with open(self.artifact_path_prefix.with_suffix(".txt"), "w") as summary_file:
+            summary_file.write(summary)
+
+        with open(self.artifact_path_prefix.with_suffix(".sql.txt"), "w") as sql_summary_file:
+            sql_summary_file.write(
+                "total: duration_seconds={:.3f}, db_queries={}, db_seconds={:.3f}\n\n".format(
+                    duration, self.query_counter.count, self.query_counter.duration
+                )
+            )
+            sql_summary_file.write("liquidity_pool from_block to_block duration_seconds db_queries db_seconds\n")
+            for window_stats in self.window_stats:
+                sql_summary_file.write("{} {} {} {:.3f} {} {:.3f}\n".format(*window_stats))
+
+        logger.info(
+            "{} Written profile artifacts '{}.*' (profiler={}, duration_seconds={:.3f}, db_queries={}, db_seconds={:.3f}, windows={}).".format(
+                self.log_prefix,
+                self.artifact_path_prefix,
+                self.profiler.name,
+                duration,
+                self.query_counter.count,
+                self.query_counter.duration,
+                len(self.window_stats),
+            )
+        )
+
+    def _on_block_window_imported(
+        self,
+        dex_provider_client: typing.Any,
+        from_block: int,
+        to_block: int,
+        duration: float,
+        db_queries: int,
+        db_duration: float,
+        **kwargs: typing.Any,
+    ) -> None:
+        self.window_stats.append(
+            (dex_provider_client.liquidity_pool.name, from_block, to_block, duration, db_queries, db_duration)
+        )
+
+
+def profile_command(
+    command_name: str, profiler: typing.Optional[str], output_dir: str
+) -> typing.ContextManager[typing.Optional[CommandProfiler]]:
+    if not profiler:
+        return contextlib.nullcontext()
+
+    return CommandProfiler(command_name=command_name, profiler=enums.Profiler[profiler], output_dir=output_dir)
@@ -0,0 +1,114 @@
+import hashlib
+import logging
+import typing
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection
+
+from common import utils as common_utils
+from src.clients.dex import base as base_dex_provider
+
+logger = logging.getLogger(__name__)
+
+
+class LiquidityPoolImporterCache(object):
+    """
+    Shared cache of imported transaction ids, event keys and block references of a liquidity pool.
+
+    The cache only holds hints, every miss or cache failure has to be resolved against the database. Keys are
+    namespaced by the database, so importers of other databases sharing the cache never read them.
+    """
+
+    CACHE_CONFIG = settings.LP_IMPORTER_CACHE
+
+    def __init__(self, dex_provider_client: base_dex_provider.BaseDexLPProvider) -> None:
+        self._provider_client = dex_provider_client
+        self._cache = caches[self.CACHE_CONFIG["alias"]]
+        self._timeout = self.CACHE_CONFIG["timeout"]
+        self._chain_key_prefix = "lp-importer:{}:{}".format(self._get_database_key(), self._provider_client.chain.name)
+        self._pool_key_prefix = "{}:{}:{}".format(
+            self._chain_key_prefix, self._provider_client.dex.name, self._provider_client.liquidity_pool.name
+        )
+        self.log_prefix = "[{}-{}-{}-LIQUIDITY-POOL-IMPORTER-CACHE]".format(
+            self._provider_client.chain.name,
+            self._provider_client.dex.name,
+            self._provider_client.liquidity_pool.name,
+        )
+
+    def get_transaction_ids(self, transaction_hashes: typing.Iterable[str]) -> typing.Dict[str, int]:
+        keys = {
+            self._get_transaction_key(transaction_hash): transaction_hash for transaction_hash in transaction_hashes
+        }
+        cached_values = self._call("get_many", default={}, keys=list(keys))
+
+        return {keys[key]: transaction_id for key, transaction_id in cached_values.items()}
+
+    def set_transaction_ids(self, transaction_ids: typing.Dict[str, int]) -> None:
+        self._call(
+            "set_many",
+            data={
+                self._get_transaction_key(transaction_hash): transaction_id
+                for transaction_hash, transaction_id in transaction_ids.items()
+            },
+            timeout=self._timeout,
+        )
+
+    def get_known_events(
+        self, event_keys: typing.Iterable[typing.Tuple[str, int]]
+    ) -> typing.Set[typing.Tuple[str, int]]:
+        keys = {self._get_event_key(*event_key): event_key for event_key in event_keys}
+        cached_values = self._call("get_many", default={}, keys=list(keys))
+
+        return {keys[key] for key in cached_values}
+
+    def add_known_events(self, event_keys: typing.Iterable[typing.Tuple[str, int]]) -> None:
+        self._call(
+            "set_many",
+            data={self._get_event_key(*event_key): 1 for event_key in event_keys},
+            timeout=self._timeout,
+        )
+
+    def get_block_number(self) -> typing.Optional[int]:
+        return self._call("get", key="{}:block-number".format(self._pool_key_prefix))
+
+    def set_block_number(self, block_number: int) -> None:
+        self._call(
+            "set", key="{}:block-number".format(self._pool_key_prefix), value=block_number, timeout=self._timeout
+        )
+
+    def delete_block_number(self) -> None:
+        self._call("delete", key="{}:block-number".format(self._pool_key_prefix))
+
+    def delete_transaction_ids(self, transaction_hashes: typing.Iterable[str]) -> None:
+        """
+        Deletes cached ids of the transactions, cached event keys of the transactions are no longer trusted then.
+        """
+        self._call(
+            "delete_many", keys=[self._get_transaction_key(transaction_hash) for transaction_hash in transaction_hashes]
+        )
+
+    @staticmethod
+    def _get_database_key() -> str:
+        settings_dict = connection.settings_dict
+        database = "{}:{}:{}:{}".format(
+            settings_dict["ENGINE"], settings_dict.get("HOST"), settings_dict.get("PORT"), settings_dict["NAME"]
+        )
+        return hashlib.sha1(database.encode()).hexdigest()[:12]
+
+    def _get_transaction_key(self, transaction_hash: str) -> str:
+        return "{}:tx:{}".format(self._chain_key_prefix, transaction_hash)
+
+    def _get_event_key(self, transaction_hash: str, log_index: int) -> str:
+        return "{}:event:{}:{}".format(self._chain_key_prefix, transaction_hash, log_index)
+
+    def _call(self, method: str, default: typing.Any = None, **kwargs: typing.Any) -> typing.Any:
+        try:
+            return getattr(self._cache, method)(**kwargs)
+        except Exception as e:
+            logger.warning(
+                "{} Unable to call cache method '{}', falling back to database. Error: {}.".format(
+                    self.log_prefix, method, common_utils.get_exception_message(exception=e)
+                )
+            )
+            return default
@@ -0,0 +1,105 @@
+import logging
+import typing
+
+from django.db import models as django_db_models
+from django.db import transaction
+
+from src import models
+from src.clients.dex import base as base_dex_provider
+
+logger = logging.getLogger(__name__)
+
+BlockRange = typing.Tuple[int, int]
+
+
+class LiquidityPoolCoverage(object):
+    """
+    Inclusive block ranges of a liquidity pool whose events are committed (`models.LiquidityPoolBlockRange`).
+
+    Ranges are merged on write, so a pool imported without failures is covered by a single range and gaps are
+    computed by one ordered interval query.
+    """
+
+    def __init__(self, dex_provider_client: base_dex_provider.BaseDexLPProvider) -> None:
+        self._provider_client = dex_provider_client
+        self.log_prefix = "[{}-{}-{}-LIQUIDITY-POOL-COVERAGE]".format(
+            self._provider_client.chain.name,
+            self._provider_client.dex.name,
+            self._provider_client.liquidity_pool.name,
+        )
+
+    def add_block_range(self, from_block: int, to_block: int) -> BlockRange:
+        """
+        Records committed block range merged with overlapping and adjacent ranges, returns the merged range.
+        Call it in the database transaction which commits events of the range.
+        """
+        with transaction.atomic():
+            block_ranges = list(
+                self._get_pool_block_ranges()
+                .filter(from_block_number__lte=to_block + 1, to_block_number__gte=from_block - 1)
+                .select_for_update()
+            )
+            merged_block_range = (
+                min([from_block] + [block_range.from_block_number for block_range in block_ranges]),
+                max([to_block] + [block_range.to_block_number for block_range in block_ranges]),
+            )
+            if len(block_ranges) == 1 and merged_block_range == (
+                block_ranges[0].from_block_number,
+                block_ranges[0].to_block_number,
+            ):
+                return merged_block_range
+
+            if block_ranges:
+                self._get_pool_block_ranges().filter(id__in=[block_range.id for block_range in block_ranges]).delete()
+            models.LiquidityPoolBlockRange.objects.create(
+                chain=self._provider_client.chain.value,
+                dex=self._provider_client.dex.value,
+                liquidity_pool=self._provider_client.liquidity_pool.value,
+                from_block_number=merged_block_range[0],
+                to_block_number=merged_block_range[1],
+            )
+
+        logger.debug(
+            "%s Added block range (from_block=%s, to_block=%s, merged_block_range=%s).",
+            self.log_prefix,
+            from_block,
+            to_block,
+            merged_block_range,
+        )
+        return merged_block_range
+
+    def get_block_ranges(
+        self, from_block: typing.Optional[int] = None, to_block: typing.Optional[int] = None
+    ) -> typing.List[BlockRange]:
+        """
+        Returns committed ranges intersecting the inclusive block range ordered by block.
+        """
+        block_ranges = self._get_pool_block_ranges()
+        if from_block is not None:
+            block_ranges = block_ranges.filter(to_block_number__gte=from_block)
+        if to_block is not None:
+            block_ranges = block_ranges.filter(from_block_number__lte=to_block)
+
+        return list(block_ranges.order_by("from_block_number").values_list("from_block_number", "to_block_number"))
+
+    def get_missing_block_ranges(self, from_block: int, to_block: int) -> typing.List[BlockRange]:
+        """
+        Returns block ranges between `from_block` and `to_block` (inclusive) without committed events.
+        """
+        missing_block_ranges = []
+        next_block_number = from_block
+        for range_from_block, range_to_block in self.get_block_ranges(from_block=from_block, to_block=to_block):
+            if range_from_block > next_block_number:
+                missing_block_ranges.append((next_block_number, range_from_block - 1))
+            next_block_number = max(next_block_number, range_to_block + 1)
+        if next_block_number <= to_block:
+            missing_block_ranges.append((next_block_number, to_block))
+
+        return missing_block_ranges
+
+    def _get_pool_block_ranges(self) -> django_db_models.QuerySet:
+        return models.LiquidityPoolBlockRange.objects.filter(
+            chain=self._provider_client.chain.value,
+            dex=self._provider_client.dex.value,
+            liquidity_pool=self._provider_client.liquidity_pool.value,
+        )
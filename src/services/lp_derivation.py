@@ -0,0 +1,482 @@
+import abc
+import concurrent.futures
+import contextlib
+import logging
+import multiprocessing.synchronize
+import time
+import typing
+from dataclasses import dataclass
+
+import django
+import numpy
+from django.apps import apps
+from django.conf import settings
+from django.db import connection, connections
+from django.db import models as django_db_models
+from django.db import transaction
+from django.db.models import Min
+from django.utils import timezone
+
+from common import utils as common_utils
+from src import constants, db, enums, models
+from src.clients.dex import base as base_dex_provider
+from src.clients.dex import factory
+from src.clients.dex import utils as dex_utils
+
+logger = logging.getLogger(__name__)
+
+BlockRange = typing.Tuple[int, int]
+
+_POOL_COLUMNS = ("chain", "dex", "liquidity_pool")
+
+# Set in worker processes of rebuild_derivation when writes of chunks must be serialized.
+_write_lock: typing.Optional[multiprocessing.synchronize.Lock] = None
+
+
+@dataclass
+class EventColumns:
+    """
+    Stored events of a block range ordered by block number and log index, one sequence per column.
+    """
+
+    names: numpy.ndarray
+    data: typing.List[str]
+    block_numbers: numpy.ndarray
+    log_indexes: numpy.ndarray
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+
+def decode_event_data_limbs(data: typing.Sequence[str], words: int) -> numpy.ndarray:
+    """
+    Decodes data of events with `words` 32 byte words at once into big-endian uint32 limbs of shape
+    (events, words, 8). Limbs are uint64, so sums of limbs of up to 2**32 events are exact.
+    """
+    if not len(data):
+        return numpy.zeros((0, words, 8), dtype=numpy.uint64)
+
+    raw_data = bytes.fromhex("".join(value[2:] if value.startswith("0x") else value for value in data))
+
+    return numpy.frombuffer(raw_data, dtype=">u4").reshape(len(data), words, 8).astype(numpy.uint64)
+
+
+def limbs_to_int(limbs: numpy.ndarray) -> int:
+    value = 0
+    for limb in limbs.tolist():
+        value = (value << 32) + limb
+
+    return value
+
+
+class BaseDerivation(abc.ABC):
+    """
+    Table derived from stored events of a liquidity pool, recomputable for any block range.
+
+    Block ranges are derived in one database transaction, which replaces derived rows of the range. Rebuilds split
+    the range into chunks aligned to `BLOCK_ALIGNMENT`, so no derived row depends on events of two chunks, and
+    record completed chunks in `lp_derivation_chunk` (`models.LiquidityPoolDerivationChunk`).
+    """
+
+    NAME: str
+    # Bump when derived rows change, rebuilds then recompute chunks completed by older versions.
+    VERSION = 1
+    MODEL: typing.Type[django_db_models.Model]
+    # Derived columns besides pool columns and timestamps, in order of rows returned by `get_rows`.
+    COLUMNS: typing.Tuple[str, ...]
+    EVENT_NAMES: typing.List[str]
+    BLOCK_ALIGNMENT = 1
+    # Incremental derivations are updated by the importer with every imported block window.
+    IS_INCREMENTAL = False
+
+    def __init__(self, dex_provider_client: base_dex_provider.BaseDexLPProvider) -> None:
+        self._provider_client = dex_provider_client
+        self.log_prefix = "[{}-{}-{}-{}-DERIVATION]".format(
+            self._provider_client.chain.name,
+            self._provider_client.dex.name,
+            self._provider_client.liquidity_pool.name,
+            self.NAME.upper(),
+        )
+
+    @abc.abstractmethod
+    def get_rows(self, events: EventColumns) -> typing.Iterable[typing.Sequence]:
+        pass
+
+    @abc.abstractmethod
+    def get_derived_rows(self, from_block: int, to_block: int) -> django_db_models.QuerySet:
+        """
+        Returns derived rows of the pool in the inclusive block range.
+        """
+        pass
+
+    def derive(self, from_block: int, to_block: int, record_chunk: bool = False) -> int:
+        """
+        Replaces derived rows of the inclusive block range and returns the number of written rows, `record_chunk`
+        marks the range as a completed chunk in the same database transaction.
+        """
+        events = self._get_events(from_block=from_block, to_block=to_block)
+        rows = self.get_rows(events=events)
+        now = connection.ops.adapt_datetimefield_value(timezone.now())
+        pool_values = (
+            self._provider_client.chain.value,
+            self._provider_client.dex.value,
+            self._provider_client.liquidity_pool.value,
+        )
+        with _write_lock or contextlib.nullcontext(), transaction.atomic():
+            self.get_derived_rows(from_block=from_block, to_block=to_block).delete()
+            rows_count = db.bulk_insert(
+                table=self.MODEL._meta.db_table,
+                columns=_POOL_COLUMNS + self.COLUMNS + ("created_at", "updated_at"),
+                rows=((*pool_values, *row, now, now) for row in rows),
+            )
+            if record_chunk:
+                models.LiquidityPoolDerivationChunk.objects.update_or_create(
+                    derivation=self.NAME,
+                    chain=self._provider_client.chain.value,
+                    dex=self._provider_client.dex.value,
+                    liquidity_pool=self._provider_client.liquidity_pool.value,
+                    from_block_number=from_block,
+                    defaults={"version": self.VERSION, "to_block_number": to_block, "row_count": rows_count},
+                )
+
+        logger.debug(
+            "%s Derived rows (from_block=%s, to_block=%s, events=%s, rows=%s).",
+            self.log_prefix,
+            from_block,
+            to_block,
+            len(events),
+            rows_count,
+        )
+        return rows_count
+
+    def get_block_range(
+        self, from_block: typing.Optional[int] = None, to_block: typing.Optional[int] = None
+    ) -> typing.Optional[BlockRange]:
+        """
+        Returns the block range to rebuild, by default from the first stored event to the block reference.
+        """
+        if from_block is None:
+            from_block = (
+                models.TransactionEvent.objects.for_pool(contract_address=self._provider_client.lp_contract_address)
+                .filter(name__in=self.EVENT_NAMES)
+                .aggregate(from_block=Min("block_number"))["from_block"]
+            )
+        if to_block is None:
+            to_block = (
+                models.LiquidityPoolImporterBlockReference.objects.filter(
+                    chain=self._provider_client.chain.value,
+                    dex=self._provider_client.dex.value,
+                    liquidity_pool=self._provider_client.liquidity_pool.value,
+                )
+                .values_list("block_number", flat=True)
+                .first()
+            )
+        if from_block is None or to_block is None or from_block > to_block:
+            return None
+
+        return from_block, to_block
+
+    def get_chunks(self, from_block: int, to_block: int, chunk_size_blocks: int) -> typing.List[BlockRange]:
+        """
+        Splits the block range widened to `BLOCK_ALIGNMENT` into chunks, boundaries of chunks are multiples of the
+        chunk size, so chunks of reruns with other block ranges match completed ones.
+        """
+        chunk_size = max(chunk_size_blocks - chunk_size_blocks % self.BLOCK_ALIGNMENT, self.BLOCK_ALIGNMENT)
+        from_block -= from_block % self.BLOCK_ALIGNMENT
+        to_block += self.BLOCK_ALIGNMENT - 1 - to_block % self.BLOCK_ALIGNMENT
+
+        return [
+            (max(chunk_start, from_block), min(chunk_start + chunk_size - 1, to_block))
+            for chunk_start in range(from_block - from_block % chunk_size, to_block + 1, chunk_size)
+        ]
+
+    def get_completed_chunks(self) -> typing.Set[BlockRange]:
+        return set(
+            self._get_pool_chunks().filter(version=self.VERSION).values_list("from_block_number", "to_block_number")
+        )
+
+    def reset_chunks(self, from_block: int, to_block: int) -> int:
+        deleted_count, _ = (
+            self._get_pool_chunks().filter(from_block_number__lte=to_block, to_block_number__gte=from_block).delete()
+        )
+
+        return deleted_count
+
+    def _get_events(self, from_block: int, to_block: int) -> EventColumns:
+        rows = list(
+            models.TransactionEvent.objects.for_pool(
+                contract_address=self._provider_client.lp_contract_address, from_block=from_block, to_block=to_block
+            )
+            .filter(name__in=self.EVENT_NAMES)
+            .order_by("block_number", "log_index")
+            .values_list("name", "data", "block_number", "log_index")
+        )
+        names, data, block_numbers, log_indexes = zip(*rows) if rows else ((), (), (), ())
+
+        return EventColumns(
+            names=numpy.array(names, dtype=str),
+            data=list(data),
+            block_numbers=numpy.array(block_numbers, dtype=numpy.int64),
+            log_indexes=numpy.array(log_indexes, dtype=numpy.int64),
+        )
+
+    def _get_pool_chunks(self) -> django_db_models.QuerySet:
+        return models.LiquidityPoolDerivationChunk.objects.filter(
+            derivation=self.NAME,
+            chain=self._provider_client.chain.value,
+            dex=self._provider_client.dex.value,
+            liquidity_pool=self._provider_client.liquidity_pool.value,
+        )
+
+    def _get_pool_rows(self) -> django_db_models.QuerySet:
+        return self.MODEL.objects.filter(
+            chain=self._provider_client.chain.value,
+            dex=self._provider_client.dex.value,
+            liquidity_pool=self._provider_client.liquidity_pool.value,
+        )
+
+
+class LiquidityPoolReserveDerivation(BaseDerivation):
+    """
+    Reserves and price of the pool after every `Sync` event.
+    """
+
+    NAME = "reserves"
+    MODEL = models.LiquidityPoolReserve
+    COLUMNS = ("block_number", "log_index", "reserve0", "reserve1", "price")
+    EVENT_NAMES = ["Sync"]
+    IS_INCREMENTAL = True
+
+    def get_rows(self, events: EventColumns) -> typing.Iterable[typing.Sequence]:
+        reserves = decode_event_data_limbs(data=events.data, words=2)
+        for block_number, log_index, (reserve0_limbs, reserve1_limbs) in zip(
+            events.block_numbers.tolist(), events.log_indexes.tolist(), reserves
+        ):
+            reserve0 = limbs_to_int(limbs=reserve0_limbs)
+            reserve1 = limbs_to_int(limbs=reserve1_limbs)
+            yield block_number, log_index, str(reserve0), str(reserve1), reserve1 / reserve0 if reserve0 else None
+
+    def get_derived_rows(self, from_block: int, to_block: int) -> django_db_models.QuerySet:
+        return self._get_pool_rows().filter(block_number__gte=from_block, block_number__lte=to_block)
+
+
+class LiquidityPoolBlockRollupDerivation(BaseDerivation):
+    """
+    OHLCV and event count rollups of block granularities, equal to rollups of `LiquidityPoolRollupBuilder`.
+    Time granularities need block timestamps of the node and are rebuilt by `rebuild_liquidity_pool_rollups`.
+    """
+
+    NAME = "block_rollups"
+    MODEL = models.LiquidityPoolRollup
+    COLUMNS = (
+        "granularity",
+        "bucket_start",
+        "first_block_number",
+        "last_block_number",
+        "open_price",
+        "high_price",
+        "low_price",
+        "close_price",
+        "volume_token0",
+        "volume_token1",
+    ) + tuple(constants.ROLLUP_EVENT_COUNT_FIELD_MAP.values())
+    EVENT_NAMES = list(constants.ROLLUP_EVENT_COUNT_FIELD_MAP)
+    BLOCK_ALIGNMENT = max(constants.BLOCK_ROLLUP_GRANULARITY_SIZE_MAP.values())
+
+    def get_rows(self, events: EventColumns) -> typing.Iterable[typing.Sequence]:
+        if not len(events):
+            return []
+
+        # Swap amounts (amount0In, amount1In, amount0Out, amount1Out) summed per token as uint32 limbs.
+        swaps = events.names == "Swap"
+        volumes = numpy.zeros((len(events), 2, 8), dtype=numpy.uint64)
+        swap_amounts = decode_event_data_limbs(data=[events.data[index] for index in numpy.flatnonzero(swaps)], words=4)
+        volumes[swaps, 0] = swap_amounts[:, 0] + swap_amounts[:, 2]
+        volumes[swaps, 1] = swap_amounts[:, 1] + swap_amounts[:, 3]
+
+        prices = numpy.full(len(events), numpy.nan)
+        for index in numpy.flatnonzero(events.names == "Sync").tolist():
+            reserve0, reserve1 = dex_utils.decode_event_data_words(data=events.data[index])
+            if reserve0:
+                prices[index] = reserve1 / reserve0
+        priced = ~numpy.isnan(prices)
+        event_indexes = numpy.arange(len(events))
+
+        rows = []
+        for granularity, bucket_size in constants.BLOCK_ROLLUP_GRANULARITY_SIZE_MAP.items():
+            bucket_starts = events.block_numbers - events.block_numbers % bucket_size
+            starts = numpy.flatnonzero(numpy.r_[True, bucket_starts[1:] != bucket_starts[:-1]])
+            ends = numpy.r_[starts[1:], len(events)] - 1
+            volume_sums = numpy.add.reduceat(volumes, starts, axis=0)
+            open_indexes = numpy.minimum.reduceat(numpy.where(priced, event_indexes, len(events)), starts)
+            close_indexes = numpy.maximum.reduceat(numpy.where(priced, event_indexes, -1), starts)
+            high_prices = numpy.fmax.reduceat(prices, starts)
+            low_prices = numpy.fmin.reduceat(prices, starts)
+            event_counts = [
+                numpy.add.reduceat((events.names == name).astype(numpy.int64), starts).tolist()
+                for name in constants.ROLLUP_EVENT_COUNT_FIELD_MAP
+            ]
+
+            for bucket, (start, end) in enumerate(zip(starts.tolist(), ends.tolist())):
+                is_priced = close_indexes[bucket] >= 0
+                rows.append(
+                    (
+                        granularity.value,
+                        int(bucket_starts[start]),
+                        int(events.block_numbers[start]),
+                        int(events.block_numbers[end]),
+                        float(prices[open_indexes[bucket]]) if is_priced else None,
+                        float(high_prices[bucket]) if is_priced else None,
+                        float(low_prices[bucket]) if is_priced else None,
+                        float(prices[close_indexes[bucket]]) if is_priced else None,
+                        str(limbs_to_int(limbs=volume_sums[bucket, 0])),
+                        str(limbs_to_int(limbs=volume_sums[bucket, 1])),
+                        *[counts[bucket] for counts in event_counts],
+                    )
+                )
+
+        return rows
+
+    def get_derived_rows(self, from_block: int, to_block: int) -> django_db_models.QuerySet:
+        return self._get_pool_rows().filter(
+            granularity__in=[granularity.value for granularity in constants.BLOCK_ROLLUP_GRANULARITY_SIZE_MAP],
+            bucket_start__gte=from_block,
+            bucket_start__lte=to_block,
+        )
+
+
+DERIVATIONS = {
+    derivation.NAME: derivation for derivation in [LiquidityPoolReserveDerivation, LiquidityPoolBlockRollupDerivation]
+}
+
+
+def get_incremental_derivations(
+    dex_provider_client: base_dex_provider.BaseDexLPProvider,
+) -> typing.List[BaseDerivation]:
+    return [
+        derivation(dex_provider_client=dex_provider_client)
+        for derivation in DERIVATIONS.values()
+        if derivation.IS_INCREMENTAL
+    ]
+
+
+def rebuild_derivation(
+    derivation_name: str,
+    dex_provider_clients: typing.List[base_dex_provider.BaseDexLPProvider],
+    from_block: typing.Optional[int] = None,
+    to_block: typing.Optional[int] = None,
+    workers: typing.Optional[int] = None,
+    chunk_size_blocks: typing.Optional[int] = None,
+    restart: bool = False,
+) -> typing.Dict[str, int]:
+    """
+    Recomputes the derived table of pools chunk by chunk in a pool of `workers` processes, chunks completed by the
+    current derivation version are skipped unless `restart` is set. Returns counts of chunks and written rows.
+    """
+    log_prefix = "[DERIVATION-{}]".format(derivation_name.upper())
+    workers = workers or settings.LP_DERIVATION["workers"]
+    chunk_size_blocks = chunk_size_blocks or settings.LP_DERIVATION["chunk_size_blocks"]
+
+    jobs = []
+    skipped_chunks_count = 0
+    for dex_provider_client in dex_provider_clients:
+        derivation = DERIVATIONS[derivation_name](dex_provider_client=dex_provider_client)
+        block_range = derivation.get_block_range(from_block=from_block, to_block=to_block)
+        if not block_range:
+            logger.info("{} No block range to derive.".format(derivation.log_prefix))
+            continue
+
+        if restart:
+            derivation.reset_chunks(*block_range)
+        completed_chunks = derivation.get_completed_chunks()
+        for chunk in derivation.get_chunks(*block_range, chunk_size_blocks=chunk_size_blocks):
+            if chunk in completed_chunks:
+                skipped_chunks_count += 1
+                continue
+            jobs.append(
+                (
+                    derivation_name,
+                    dex_provider_client.chain.name,
+                    dex_provider_client.dex.name,
+                    dex_provider_client.liquidity_pool.name,
+                    *chunk,
+                )
+            )
+
+    logger.info(
+        "{} Rebuilding derived table (liquidity_pools={}, chunks={}, skipped_chunks={}, workers={}).".format(
+            log_prefix, len(dex_provider_clients), len(jobs), skipped_chunks_count, workers
+        )
+    )
+    started_at = time.perf_counter()
+    result = {"chunks": 0, "skipped_chunks": skipped_chunks_count, "failed_chunks": 0, "rows": 0}
+    if workers == 1:
+        results = (_run_job(job) for job in jobs)
+    else:
+        # Forked workers must not share database connections of the parent. SQLite allows a single writer, so workers
+        # read and derive chunks concurrently but take turns in writing them instead of timing out on the file lock.
+        write_lock = multiprocessing.Lock() if connection.vendor == "sqlite" else None
+        connections.close_all()
+        executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=workers, initializer=_initialize_worker, initargs=(write_lock,)
+        )
+        results = (
+            future.result()
+            for future in concurrent.futures.as_completed(executor.submit(_run_job, job) for job in jobs)
+        )
+
+    try:
+        for job, rows_count in results:
+            if rows_count is None:
+                result["failed_chunks"] += 1
+                continue
+            result["chunks"] += 1
+            result["rows"] += rows_count
+            logger.info(
+                "{} Derived chunk (liquidity_pool={}, from_block={}, to_block={}, rows={}, progress={}/{}).".format(
+                    log_prefix,
+                    job[3],
+                    job[4],
+                    job[5],
+                    rows_count,
+                    result["chunks"] + result["failed_chunks"],
+                    len(jobs),
+                )
+            )
+    finally:
+        if workers != 1:
+            executor.shutdown(cancel_futures=True)
+
+    logger.info(
+        "{} Rebuilt derived table (result={}, duration_seconds={:.3f}).".format(
+            log_prefix, result, time.perf_counter() - started_at
+        )
+    )
+    return result
+
+
+def _initialize_worker(write_lock: typing.Optional[multiprocessing.synchronize.Lock]) -> None:
+    global _write_lock
+    _write_lock = write_lock
+    if not apps.ready:
+        django.setup()
+
+
+def _run_job(job: typing.Tuple) -> typing.Tuple[typing.Tuple, typing.Optional[int]]:
+    """
+    Derives one chunk, returns the job and the number of written rows, `None` when the chunk failed.
+    """
+    derivation_name, chain, dex, liquidity_pool, from_block, to_block = job
+    dex_provider_client = factory.DexProviderFactory().create(
+        chain=enums.Chain[chain], dex=enums.Dex[dex], liquidity_pool=enums.LiquidityPool[liquidity_pool]
+    )
+    derivation = DERIVATIONS[derivation_name](dex_provider_client=dex_provider_client)
+    try:
+        return job, derivation.derive(from_block=from_block, to_block=to_block, record_chunk=True)
+    except Exception as e:
+        logger.exception(
+            "{} Unable to derive chunk (from_block={}, to_block={}). Error: {}. Continue.".format(
+                derivation.log_prefix, from_block, to_block, common_utils.get_exception_message(exception=e)
+            )
+        )
+        return job, None
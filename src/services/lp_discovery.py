@@ -0,0 +1,316 @@
+import json
+import logging
+import time
+import typing
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+
+from common import utils as common_utils
+from src import exceptions, metrics, models
+from src.clients.dex import exceptions as dex_exceptions
+from src.clients.dex import messages as dex_messages
+from src.clients.dex.uniswap_v2 import client as uniswap_v2_client
+from src.services import lp_partitioning as lp_partitioning_services
+
+logger = logging.getLogger(__name__)
+
+_TRANSACTION_HASHES_CHUNK_SIZE = 500
+
+
+class LiquidityPoolDiscoveryService(object):
+    """
+    Registers pools created by the DEX factory contract and backfills their events in bulk.
+
+    Discovered pools live in `models.LiquidityPool` instead of `enums.LiquidityPool`, pools of `CHAIN_DEX_LP_CONFIG`
+    are left to their importers and never registered. Events of up to
+    `backfill_addresses_per_request` pools are fetched by one log filter per block window, and every window is
+    stored together with the progress of its pools in one database transaction, so an interrupted backfill resumes
+    without duplicates.
+    """
+
+    DISCOVERY_CONFIG = settings.LP_DISCOVERY
+
+    def __init__(self, dex_provider_client: uniswap_v2_client.UniswapV2DexProvider) -> None:
+        self._provider_client = dex_provider_client
+        self._partitioner = lp_partitioning_services.LiquidityPoolPartitioner(dex_provider_client=dex_provider_client)
+        self.log_prefix = "[{}-{}-LIQUIDITY-POOL-DISCOVERY]".format(
+            self._provider_client.chain.name, self._provider_client.dex.name
+        )
+
+    def discover_liquidity_pools(self) -> int:
+        """
+        Registers pools created since the last run and returns the number of new pools.
+        """
+        factory_config = self._provider_client.factory_config
+        if not factory_config:
+            msg = "Factory of dex {} is not configured".format(self._provider_client.dex.name)
+            logger.error("{} {}.".format(self.log_prefix, msg))
+            raise exceptions.LiquidityPoolDiscoveryException(msg)
+
+        block_reference, _ = models.DexFactoryBlockReference.objects.get_or_create(
+            chain=self._provider_client.chain.value,
+            dex=self._provider_client.dex.value,
+            defaults={
+                "chain_name": self._provider_client.chain.name,
+                "dex_name": self._provider_client.dex.name,
+                "block_number": factory_config["start_block"] - 1,
+            },
+        )
+        from_block_number = block_reference.block_number + 1
+        to_block_number = self._provider_client.get_confirmed_block_number()
+
+        discovered_pools_count = 0
+        while from_block_number <= to_block_number:
+            window_to_block_number = min(
+                from_block_number + self._provider_client.max_events_block_diff, to_block_number
+            )
+            try:
+                pair_created_events = self._provider_client.get_pair_created_events(
+                    from_block=from_block_number, to_block=window_to_block_number
+                )
+            except dex_exceptions.DexProviderException as e:
+                msg = "Unable to discover liquidity pools (from_block={}, to_block={}). Error: {}".format(
+                    from_block_number, window_to_block_number, common_utils.get_exception_message(exception=e)
+                )
+                logger.exception("{} {}.".format(self.log_prefix, msg))
+                raise exceptions.LiquidityPoolDiscoveryException(msg)
+
+            with transaction.atomic():
+                discovered_pools_count += len(self._register_liquidity_pools(pair_created_events=pair_created_events))
+                block_reference.block_number = window_to_block_number
+                block_reference.save(update_fields=["block_number", "updated_at"])
+
+            from_block_number = window_to_block_number + 1
+
+        logger.info(
+            "{} Discovered liquidity pools (block_number={}, discovered_pools={}).".format(
+                self.log_prefix, block_reference.block_number, discovered_pools_count
+            )
+        )
+
+        return discovered_pools_count
+
+    def backfill_liquidity_pools(self) -> int:
+        """
+        Imports events of active discovered pools up to the confirmed block and returns the number of imported events.
+        """
+        to_block_number = self._provider_client.get_confirmed_block_number()
+        liquidity_pools = list(
+            models.LiquidityPool.objects.filter(
+                chain=self._provider_client.chain.value,
+                dex=self._provider_client.dex.value,
+                is_active=True,
+            )
+            .filter(Q(block_number__isnull=True) | Q(block_number__lt=to_block_number))
+            .only("id", "contract_address", "created_block_number", "block_number")
+        )
+        # Pools registered before they were configured are imported by their importers.
+        configured_contract_addresses = self._get_configured_contract_addresses()
+        liquidity_pools = [
+            liquidity_pool
+            for liquidity_pool in liquidity_pools
+            if liquidity_pool.contract_address.lower() not in configured_contract_addresses
+        ]
+        # Pools with close progress share log filters of the same block windows.
+        liquidity_pools.sort(key=self._get_start_block_number)
+
+        addresses_per_request = self.DISCOVERY_CONFIG["backfill_addresses_per_request"]
+        imported_events_count = 0
+        for index in range(0, len(liquidity_pools), addresses_per_request):
+            imported_events_count += self._backfill_liquidity_pools_chunk(
+                liquidity_pools=liquidity_pools[index : index + addresses_per_request],
+                to_block=to_block_number,
+            )
+
+        logger.info(
+            "{} Backfilled liquidity pools (to_block={}, liquidity_pools={}, imported_events={}).".format(
+                self.log_prefix, to_block_number, len(liquidity_pools), imported_events_count
+            )
+        )
+
+        return imported_events_count
+
+    def _register_liquidity_pools(
+        self, pair_created_events: typing.List[dex_messages.PairCreatedEvent]
+    ) -> typing.List[models.LiquidityPool]:
+        registered_contract_addresses = set(
+            models.LiquidityPool.objects.filter(
+                chain=self._provider_client.chain.value,
+                contract_address__in=[event.pair_address for event in pair_created_events],
+            ).values_list("contract_address", flat=True)
+        )
+        configured_contract_addresses = self._get_configured_contract_addresses()
+
+        return models.LiquidityPool.objects.bulk_create(
+            [
+                models.LiquidityPool(
+                    chain=self._provider_client.chain.value,
+                    chain_name=self._provider_client.chain.name,
+                    dex=self._provider_client.dex.value,
+                    dex_name=self._provider_client.dex.name,
+                    contract_address=event.pair_address,
+                    token0_address=event.token0_address,
+                    token1_address=event.token1_address,
+                    pair_index=event.pair_index,
+                    created_block_number=event.block_number,
+                    created_transaction_hash=event.transaction_hash,
+                )
+                for event in pair_created_events
+                if event.pair_address not in registered_contract_addresses
+                and event.pair_address.lower() not in configured_contract_addresses
+            ],
+            ignore_conflicts=True,
+        )
+
+    def _backfill_liquidity_pools_chunk(self, liquidity_pools: typing.List[models.LiquidityPool], to_block: int) -> int:
+        start_block_numbers = {
+            liquidity_pool.contract_address: self._get_start_block_number(liquidity_pool=liquidity_pool)
+            for liquidity_pool in liquidity_pools
+        }
+        contract_addresses = list(start_block_numbers)
+        from_block_number = min(start_block_numbers.values())
+
+        imported_events_count = 0
+        while from_block_number <= to_block:
+            window_to_block_number = min(from_block_number + self._provider_client.max_events_block_diff, to_block)
+            started_at = time.perf_counter()
+            try:
+                transaction_events = self._provider_client.get_contracts_transaction_events(
+                    contract_addresses=contract_addresses,
+                    from_block=from_block_number,
+                    to_block=window_to_block_number,
+                )
+                # Events of blocks already imported for a pool are skipped.
+                transaction_events = [
+                    transaction_event
+                    for transaction_event in transaction_events
+                    if transaction_event.block_number >= start_block_numbers[transaction_event.contract_address]
+                ]
+                with transaction.atomic():
+                    for contract_address in {event.contract_address for event in transaction_events}:
+                        self._partitioner.ensure_partitions(
+                            from_block=from_block_number,
+                            to_block=window_to_block_number,
+                            contract_address=contract_address,
+                        )
+                    window_imported_events_count = self._store_transaction_events(transaction_events=transaction_events)
+                    models.LiquidityPool.objects.filter(
+                        id__in=[liquidity_pool.id for liquidity_pool in liquidity_pools]
+                    ).filter(Q(block_number__isnull=True) | Q(block_number__lt=window_to_block_number)).update(
+                        block_number=window_to_block_number
+                    )
+            except dex_exceptions.DexProviderException as e:
+                msg = "Unable to backfill liquidity pools (from_block={}, to_block={}, contract_addresses_count={}). Error: {}".format(
+                    from_block_number,
+                    window_to_block_number,
+                    len(contract_addresses),
+                    common_utils.get_exception_message(exception=e),
+                )
+                logger.exception("{} {}.".format(self.log_prefix, msg))
+                raise exceptions.LiquidityPoolDiscoveryException(msg)
+
+            logger.info(
+                "{} Backfilled block window (from_block={}, to_block={}, contract_addresses_count={}, imported_events={}, duration_seconds={:.3f}).".format(
+                    self.log_prefix,
+                    from_block_number,
+                    window_to_block_number,
+                    len(contract_addresses),
+                    window_imported_events_count,
+                    time.perf_counter() - started_at,
+                )
+            )
+            imported_events_count += window_imported_events_count
+            for contract_address, start_block_number in start_block_numbers.items():
+                start_block_numbers[contract_address] = max(start_block_number, window_to_block_number + 1)
+            from_block_number = window_to_block_number + 1
+
+        return imported_events_count
+
+    def _store_transaction_events(self, transaction_events: typing.List[dex_messages.TransactionEvent]) -> int:
+        """
+        Inserts not yet stored events and their not yet stored transactions with bulk inserts.
+        """
+        transaction_hashes = list({event.transaction_hash for event in transaction_events})
+        transaction_ids = {}
+        for index in range(0, len(transaction_hashes), _TRANSACTION_HASHES_CHUNK_SIZE):
+            transaction_ids.update(
+                models.Transaction.objects.filter(
+                    transaction_hash__in=transaction_hashes[index : index + _TRANSACTION_HASHES_CHUNK_SIZE]
+                ).values_list("transaction_hash", "id")
+            )
+
+        # Only events of already stored transactions can be stored, ex. by an importer of a pool configured later.
+        stored_transaction_ids = list(transaction_ids.values())
+        stored_event_keys = set()
+        for index in range(0, len(stored_transaction_ids), _TRANSACTION_HASHES_CHUNK_SIZE):
+            stored_event_keys.update(
+                models.TransactionEvent.objects.filter(
+                    transaction_id__in=stored_transaction_ids[index : index + _TRANSACTION_HASHES_CHUNK_SIZE]
+                ).values_list("transaction_id", "log_index")
+            )
+        transaction_events = [
+            event
+            for event in transaction_events
+            if (transaction_ids.get(event.transaction_hash), event.log_index) not in stored_event_keys
+        ]
+
+        contract_addresses = {event.transaction_hash: event.contract_address for event in reversed(transaction_events)}
+        fetched_transactions = self._provider_client.get_transactions(
+            transaction_hashes=[
+                transaction_hash for transaction_hash in transaction_hashes if transaction_hash not in transaction_ids
+            ]
+        )
+        created_transactions = models.Transaction.objects.bulk_create(
+            [
+                models.Transaction(
+                    transaction_hash=transaction_data.transaction_hash,
+                    transaction_index=transaction_data.transaction_index,
+                    contract_address=contract_addresses[transaction_hash],
+                    block_number=transaction_data.block_number,
+                    block_hash=transaction_data.block_hash,
+                    from_address=transaction_data.from_address,
+                    to_address=transaction_data.to_address,
+                    gas=transaction_data.gas,
+                    gas_price=transaction_data.gas_price,
+                )
+                for transaction_hash, transaction_data in fetched_transactions.items()
+            ],
+            batch_size=_TRANSACTION_HASHES_CHUNK_SIZE,
+        )
+        transaction_ids.update((tx.transaction_hash, tx.id) for tx in created_transactions)
+
+        models.TransactionEvent.objects.bulk_create(
+            [
+                models.TransactionEvent(
+                    name=event.name,
+                    topics=json.dumps(event.topics),
+                    data=event.data,
+                    log_index=event.log_index,
+                    contract_address=event.contract_address,
+                    block_number=event.block_number,
+                    transaction_id=transaction_ids[event.transaction_hash],
+                )
+                for event in transaction_events
+            ],
+            batch_size=_TRANSACTION_HASHES_CHUNK_SIZE,
+        )
+
+        metrics.TRANSACTIONS_INSERTED.labels(**self._provider_client.metric_labels).inc(len(created_transactions))
+        metrics.EVENTS_INSERTED.labels(**self._provider_client.metric_labels).inc(len(transaction_events))
+        return len(transaction_events)
+
+    def _get_configured_contract_addresses(self) -> typing.Set[str]:
+        return {
+            pool_config["contract_address"].lower()
+            for dex_config in settings.CHAIN_DEX_LP_CONFIG[self._provider_client.chain.name]["dexes"].values()
+            for pool_config in dex_config["pools"].values()
+        }
+
+    @staticmethod
+    def _get_start_block_number(liquidity_pool: models.LiquidityPool) -> int:
+        if liquidity_pool.block_number is None:
+            return liquidity_pool.created_block_number
+
+        return liquidity_pool.block_number + 1
@@ -0,0 +1,283 @@
+import json
+import logging
+import os
+import typing
+from pathlib import Path
+
+import numpy
+
+from src import exceptions
+
+logger = logging.getLogger(__name__)
+
+EVENT_STORE_VERSION = 1
+
+FIXED_COLUMN_DTYPES = {
+    "block_number": numpy.dtype("<i8"),
+    "log_index": numpy.dtype("<u4"),
+    "transaction_index": numpy.dtype("<u4"),
+    "event_type": numpy.dtype("u1"),
+    "variable_end": numpy.dtype("<u8"),
+}
+
+VARIABLE_COLUMNS = [
+    "contract_address",
+    "topics",
+    "data",
+    "transaction_hash",
+    "block_hash",
+    "transaction_from_address",
+    "transaction_to_address",
+    "transaction_gas",
+    "transaction_gas_price",
+]
+
+_META_FILE_NAME = "meta.json"
+_VARIABLE_FILE_NAME = "variable.jsonl"
+
+
+class LiquidityPoolEventStore(object):
+    """
+    Append-only columnar event store of one liquidity pool.
+
+    Fixed width columns are kept in raw little-endian array files and read through `numpy.memmap`, variable
+    data of every event is one JSON line of the side file. `meta.json` holds the number of committed rows,
+    rows written after it (e.g. by an interrupted append) are ignored by readers and truncated by the next append.
+    Events are appended in (block_number, log_index) order, so block ranges are sliced by binary search.
+    """
+
+    def __init__(self, path: typing.Union[str, Path]) -> None:
+        self.path = Path(path)
+        self.log_prefix = "[LIQUIDITY-POOL-EVENT-STORE]"
+        self._meta = self._read_meta()
+
+    @property
+    def row_count(self) -> int:
+        return self._meta["row_count"]
+
+    @property
+    def last_block_number(self) -> typing.Optional[int]:
+        return self._meta["last_block_number"]
+
+    @property
+    def event_names(self) -> typing.List[str]:
+        return self._meta["event_names"]
+
+    def append(self, rows: typing.Iterable[typing.Dict]) -> int:
+        """
+        Appends exported event rows (see `LiquidityPoolExporter.get_liquidity_provider_data`) of blocks after
+        the last stored block and returns the number of appended rows. Rows have to contain whole blocks.
+        """
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._truncate_uncommitted_rows()
+
+        columns = {column: [] for column in FIXED_COLUMN_DTYPES}
+        variable_lines = []
+        variable_size = self._meta["variable_size"]
+        committed_block_number = self.last_block_number
+        last_event_key = None
+        for row in rows:
+            if committed_block_number is not None and row["block_number"] <= committed_block_number:
+                continue
+
+            event_key = (row["block_number"], row["log_index"])
+            if last_event_key is not None and event_key <= last_event_key:
+                msg = "Rows are not ordered by block number and log index (block_number={}, log_index={})".format(
+                    *event_key
+                )
+                logger.error("{} {}.".format(self.log_prefix, msg))
+                raise exceptions.LiquidityPoolEventStoreException(msg)
+            last_event_key = event_key
+
+            if row["event_name"] not in self.event_names:
+                self.event_names.append(row["event_name"])
+            variable_line = (json.dumps([row[column] for column in VARIABLE_COLUMNS]) + "\n").encode("utf-8")
+            variable_size += len(variable_line)
+            variable_lines.append(variable_line)
+
+            columns["block_number"].append(row["block_number"])
+            columns["log_index"].append(row["log_index"])
+            columns["transaction_index"].append(row["transaction_index"])
+            columns["event_type"].append(self.event_names.index(row["event_name"]))
+            columns["variable_end"].append(variable_size)
+
+        appended_rows_count = len(variable_lines)
+        if not appended_rows_count:
+            return 0
+
+        for column, dtype in FIXED_COLUMN_DTYPES.items():
+            with open(self._get_column_path(column=column), "ab") as column_file:
+                column_file.write(numpy.asarray(columns[column], dtype=dtype).tobytes())
+        with open(self.path / _VARIABLE_FILE_NAME, "ab") as variable_file:
+            variable_file.writelines(variable_lines)
+
+        self._meta.update(
+            row_count=self.row_count + appended_rows_count,
+            last_block_number=last_event_key[0],
+            variable_size=variable_size,
+        )
+        self._write_meta()
+        logger.info(
+            "{} Appended events (path={}, appended_rows={}, row_count={}, last_block_number={}).".format(
+                self.log_prefix, self.path, appended_rows_count, self.row_count, self.last_block_number
+            )
+        )
+
+        return appended_rows_count
+
+    def truncate(self, from_block: int) -> int:
+        """
+        Removes rows of blocks from `from_block` on, so they are appended again, and returns the number of removed rows.
+        Rows are committed as removed by `meta.json`, files of an interrupted truncate are truncated by the next append.
+        """
+        row_count, _ = self.get_row_range(from_block=from_block)
+        removed_rows_count = self.row_count - row_count
+        if not removed_rows_count:
+            return 0
+
+        self._meta.update(
+            row_count=row_count,
+            last_block_number=int(self._get_column(column="block_number")[row_count - 1]) if row_count else None,
+            variable_size=int(self._get_column(column="variable_end")[row_count - 1]) if row_count else 0,
+        )
+        self._write_meta()
+        for column, dtype in FIXED_COLUMN_DTYPES.items():
+            os.truncate(self._get_column_path(column=column), row_count * dtype.itemsize)
+        os.truncate(self.path / _VARIABLE_FILE_NAME, self._meta["variable_size"])
+        logger.info(
+            "{} Truncated events (path={}, from_block={}, removed_rows={}, row_count={}).".format(
+                self.log_prefix, self.path, from_block, removed_rows_count, self.row_count
+            )
+        )
+
+        return removed_rows_count
+
+    def get_columns(
+        self, from_block: typing.Optional[int] = None, to_block: typing.Optional[int] = None
+    ) -> typing.Dict[str, numpy.ndarray]:
+        """
+        Returns read-only memory-mapped views of fixed width columns of events in the inclusive block range.
+        """
+        start, stop = self.get_row_range(from_block=from_block, to_block=to_block)
+
+        return {column: self._get_column(column=column)[start:stop] for column in FIXED_COLUMN_DTYPES}
+
+    def get_row_range(
+        self, from_block: typing.Optional[int] = None, to_block: typing.Optional[int] = None
+    ) -> typing.Tuple[int, int]:
+        block_numbers = self._get_column(column="block_number")
+        start = 0 if from_block is None else int(numpy.searchsorted(block_numbers, from_block, side="left"))
+        stop = self.row_count if to_block is None else int(numpy.searchsorted(block_numbers, to_block, side="right"))
+
+        return start, max(start, stop)
+
+    def get_variable_data(self, start: int, stop: int) -> typing.List[typing.Dict]:
+        """
+        Decodes variable data of rows `start` to `stop`, only the requested slice of the side file is parsed.
+        """
+        if start >= stop:
+            return []
+
+        variable_ends = self._get_column(column="variable_end")
+        offset = int(variable_ends[start - 1]) if start else 0
+        variable_data = numpy.memmap(self.path / _VARIABLE_FILE_NAME, dtype="u1", mode="r")[
+            offset : int(variable_ends[stop - 1])
+        ]
+
+        return [
+            dict(zip(VARIABLE_COLUMNS, json.loads(line)))
+            for line in variable_data.tobytes().decode("utf-8").splitlines()
+        ]
+
+    def to_dataframe(
+        self,
+        from_block: typing.Optional[int] = None,
+        to_block: typing.Optional[int] = None,
+        include_variable_data: bool = False,
+    ) -> "pandas.DataFrame":
+        import pandas
+
+        start, stop = self.get_row_range(from_block=from_block, to_block=to_block)
+        columns = {column: self._get_column(column=column)[start:stop] for column in FIXED_COLUMN_DTYPES}
+        dataframe = pandas.DataFrame(
+            {
+                "block_number": columns["block_number"],
+                "log_index": columns["log_index"],
+                "transaction_index": columns["transaction_index"],
+                "event_name": pandas.Categorical.from_codes(
+                    columns["event_type"].astype("i1"), categories=self.event_names
+                ),
+            },
+            copy=False,
+        )
+        if include_variable_data:
+            variable_dataframe = pandas.DataFrame(
+                self.get_variable_data(start=start, stop=stop), columns=VARIABLE_COLUMNS
+            )
+            dataframe = pandas.concat([dataframe, variable_dataframe], axis=1)
+
+        return dataframe
+
+    def _get_column(self, column: str) -> numpy.ndarray:
+        if not self.row_count:
+            return numpy.empty(0, dtype=FIXED_COLUMN_DTYPES[column])
+
+        return numpy.memmap(
+            self._get_column_path(column=column),
+            dtype=FIXED_COLUMN_DTYPES[column],
+            mode="r",
+            shape=(self.row_count,),
+        )
+
+    def _get_column_path(self, column: str) -> Path:
+        return self.path / "{}.{}".format(column, FIXED_COLUMN_DTYPES[column].str.lstrip("<|"))
+
+    def _truncate_uncommitted_rows(self) -> None:
+        for column, dtype in FIXED_COLUMN_DTYPES.items():
+            self._truncate_file(path=self._get_column_path(column=column), size=self.row_count * dtype.itemsize)
+        self._truncate_file(path=self.path / _VARIABLE_FILE_NAME, size=self._meta["variable_size"])
+
+    def _truncate_file(self, path: Path, size: int) -> None:
+        if not path.exists():
+            path.touch()
+        elif path.stat().st_size > size:
+            logger.warning(
+                "{} Truncating uncommitted rows (path={}, size={}, committed_size={}).".format(
+                    self.log_prefix, path, path.stat().st_size, size
+                )
+            )
+            os.truncate(path, size)
+
+    def _read_meta(self) -> typing.Dict:
+        meta_path = self.path / _META_FILE_NAME
+        if not meta_path.exists():
+            return {
+                "version": EVENT_STORE_VERSION,
+                "row_count": 0,
+                "last_block_number": None,
+                "variable_size": 0,
+                "event_names": [],
+            }
+
+        with open(meta_path) as meta_file:
+            meta = json.load(meta_file)
+
+        if meta["version"] != EVENT_STORE_VERSION:
+            msg = "Unsupported event store version (path={}, version={})".format(self.path, meta["version"])
+            logger.error("{} {}.".format(self.log_prefix, msg))
+            raise exceptions.LiquidityPoolEventStoreException(msg)
+
+        return meta
+
+    def _write_meta(self) -> None:
+        for column in list(FIXED_COLUMN_DTYPES) + [None]:
+            path = self._get_column_path(column=column) if column else self.path / _VARIABLE_FILE_NAME
+            with open(path, "rb+") as data_file:
+                os.fsync(data_file.fileno())
+
+        temporary_meta_path = self.path / "{}.tmp".format(_META_FILE_NAME)
+        with open(temporary_meta_path, "w") as meta_file:
+            json.dump(self._meta, meta_file)
+            meta_file.flush()
+            os.fsync(meta_file.fileno())
+        os.replace(temporary_meta_path, self.path / _META_FILE_NAME)
@@ -4,11 +4,16 @@ import pickle
 import typing
 from pathlib import Path
 
-from src import exceptions, models
+from django.conf import settings
+
+from src import exceptions, metrics, models
 from src.clients.dex import base as base_dex_provider
+from src.services import lp_event_store as lp_event_store_services
 
 logger = logging.getLogger(__name__)
 
+_CHUNK_SIZE = 2000
+
 
 class LiquidityPoolExporter(object):
     def __init__(
@@ -22,28 +27,96 @@ class LiquidityPoolExporter(object):
         )
 
     def get_liquidity_provider_data(self) -> typing.List[typing.Dict]:
-        transaction_events = models.TransactionEvent.objects.filter(
-            transaction__contract_address=self._provider_client.lp_contract_address
-        ).select_related("transaction")
-
-        return [
-            {
-                "contract_address": event.transaction.contract_address,
-                "event_name": event.name,
-                "topics": json.loads(event.topics),
-                "data": event.data,
-                "block_number": event.transaction.block_number,
-                "transaction_hash": event.transaction.transaction_hash,
-                "transaction_index": event.transaction.transaction_index,
-                "block_hash": event.transaction.block_hash,
-                "log_index": event.log_index,
-                "transaction_from_address": event.transaction.from_address,
-                "transaction_to_address": event.transaction.to_address,
-                "transaction_gas": event.transaction.gas,
-                "transaction_gas_price": event.transaction.gas_price,
-            }
-            for event in transaction_events
+        transaction_events = (
+            models.TransactionEvent.objects.for_pool(
+                contract_address=self._provider_client.lp_contract_address
+            )
+            .select_related("transaction")
+            .order_by("block_number", "log_index")
+        )
+
+        liquidity_provider_data = [
+            self.get_event_data(event=event) for event in transaction_events
         ]
+        metrics.EVENTS_EXPORTED.labels(**self._provider_client.metric_labels).inc(
+            len(liquidity_provider_data)
+        )
+
+        return liquidity_provider_data
+
+    def persist_event_store(self, path: typing.Optional[str] = None) -> int:
+        """
+        Appends events of fully imported blocks, which are not yet in the pool event store, to the store.
+        """
+        event_store = lp_event_store_services.LiquidityPoolEventStore(
+            path=path or self.get_event_store_path()
+        )
+        block_reference = models.LiquidityPoolImporterBlockReference.objects.filter(
+            chain=self._provider_client.chain.value,
+            dex=self._provider_client.dex.value,
+            liquidity_pool=self._provider_client.liquidity_pool.value,
+        ).first()
+        if not block_reference:
+            logger.info(
+                "{} No block reference found, nothing is imported yet.".format(
+                    self.log_prefix
+                )
+            )
+            return 0
+
+        drifted_block_number = self._get_drifted_block_number(event_store=event_store)
+        if drifted_block_number is not None:
+            logger.warning(
+                "{} Events were stored into blocks of the event store, rebuilding it from the block (block_number={}).".format(
+                    self.log_prefix, drifted_block_number
+                )
+            )
+            event_store.truncate(from_block=drifted_block_number)
+
+        transaction_events = (
+            models.TransactionEvent.objects.for_pool(
+                contract_address=self._provider_client.lp_contract_address,
+                from_block=(event_store.last_block_number or -1) + 1,
+                to_block=block_reference.block_number,
+            )
+            .select_related("transaction")
+            .order_by("block_number", "log_index")
+        )
+        appended_rows_count = event_store.append(
+            rows=(
+                self.get_event_data(event=event)
+                for event in transaction_events.iterator(chunk_size=_CHUNK_SIZE)
+            )
+        )
+        metrics.EVENTS_EXPORTED.labels(**self._provider_client.metric_labels).inc(
+            appended_rows_count
+        )
+
+        return appended_rows_count
+
+    def get_event_store_path(self) -> Path:
+        return Path(settings.LP_EVENT_STORE_DIR) / "{}.events".format(
+            self._provider_client.liquidity_pool.name
+        )
+
+    @staticmethod
+    def get_event_data(event: models.TransactionEvent) -> typing.Dict:
+        return {
+            # Transactions are shared by pools of multi-hop swaps, they keep the pool which stored them first.
+            "contract_address": event.contract_address,
+            "event_name": event.name,
+            "topics": json.loads(event.topics),
+            "data": event.data,
+            "block_number": event.block_number,
+            "transaction_hash": event.transaction.transaction_hash,
+            "transaction_index": event.transaction.transaction_index,
+            "block_hash": event.transaction.block_hash,
+            "log_index": event.log_index,
+            "transaction_from_address": event.transaction.from_address,
+            "transaction_to_address": event.transaction.to_address,
+            "transaction_gas": event.transaction.gas,
+            "transaction_gas_price": event.transaction.gas_price,
+        }
 
     def persist_pickle(
         self, data: typing.List[typing.Dict], path: str, overwrite_file: bool = False
@@ -67,3 +140,36 @@ class LiquidityPoolExporter(object):
             pickle.dump(data, pickle_file)
 
         logger.info("Saved data to pickle file: '{}'.".format(file_path))
+
+    def _get_drifted_block_number(
+        self, event_store: lp_event_store_services.LiquidityPoolEventStore
+    ) -> typing.Optional[int]:
+        """
+        Returns the first block of the event store with stored events missing in the store (repaired gaps,
+        backfilled event types), found by binary search over event counts up to a block.
+        """
+        if event_store.last_block_number is None:
+            return None
+
+        def is_drifted(block_number: int) -> bool:
+            return (
+                models.TransactionEvent.objects.for_pool(
+                    contract_address=self._provider_client.lp_contract_address,
+                    to_block=block_number,
+                ).count()
+                != event_store.get_row_range(to_block=block_number)[1]
+            )
+
+        from_block_number = 0
+        to_block_number = event_store.last_block_number
+        if not is_drifted(block_number=to_block_number):
+            return None
+
+        while from_block_number < to_block_number:
+            block_number = (from_block_number + to_block_number) // 2
+            if is_drifted(block_number=block_number):
+                to_block_number = block_number
+            else:
+                from_block_number = block_number + 1
+
+        return from_block_number
@@ -1,21 +1,75 @@
+import concurrent.futures
 import json
 import logging
+import time
+import typing
+from dataclasses import dataclass
 
-from django.db import transaction
+from django.db import connection, transaction
+from django.db.models import Min
 
 from common import utils as common_utils
-from src import exceptions, models
+from src import exceptions, metrics, models, signals
 from src.clients.dex import base as base_dex_provider
 from src.clients.dex import exceptions as dex_exceptions
+from src.clients.dex import messages as dex_messages
+from src.services import lp_cache as lp_cache_services
+from src.services import lp_coverage as lp_coverage_services
+from src.services import lp_derivation as lp_derivation_services
+from src.services import lp_partitioning as lp_partitioning_services
+from src.services import lp_positions as lp_positions_services
+from src.services import lp_price_index as lp_price_index_services
+from src.services import lp_rollups as lp_rollups_services
 
 logger = logging.getLogger(__name__)
 
+_TRANSACTION_HASHES_CHUNK_SIZE = 500
+
+
+@dataclass
+class _BatchData:
+    """
+    Events of a block window and their transactions fetched from the node, not yet stored.
+    """
+
+    from_block: int
+    to_block: int
+    transaction_events: dex_messages.TransactionEventBatch
+    known_transaction_ids: typing.Dict[str, int]
+    known_event_keys: typing.Set[typing.Tuple[str, int]]
+    fetched_transactions: typing.Dict[str, dex_messages.Transaction]
+    started_at: float
+    fetch_duration: float
+    # Timestamps of blocks of fetched transactions, if prefetched rollups skip fetching them.
+    block_timestamps: typing.Optional[typing.Dict[int, int]] = None
+
 
 class LiquidityPoolImporter(object):
     def __init__(
         self, dex_provider_client: base_dex_provider.BaseDexLPProvider
     ) -> None:
         self._provider_client = dex_provider_client
+        self._cache = lp_cache_services.LiquidityPoolImporterCache(
+            dex_provider_client=dex_provider_client
+        )
+        self._rollup_builder = lp_rollups_services.LiquidityPoolRollupBuilder(
+            dex_provider_client=dex_provider_client
+        )
+        self._partitioner = lp_partitioning_services.LiquidityPoolPartitioner(
+            dex_provider_client=dex_provider_client
+        )
+        self._coverage = lp_coverage_services.LiquidityPoolCoverage(
+            dex_provider_client=dex_provider_client
+        )
+        self._derivations = lp_derivation_services.get_incremental_derivations(
+            dex_provider_client=dex_provider_client
+        )
+        self._position_ledger = lp_positions_services.LiquidityPoolPositionLedger(
+            dex_provider_client=dex_provider_client
+        )
+        self._price_indexer = lp_price_index_services.get_price_indexer(
+            chain=dex_provider_client.chain, dex=dex_provider_client.dex
+        )
         self.log_prefix = "[{}-{}-{}-LIQUIDITY-POOL-IMPORTER]".format(
             self._provider_client.chain.name,
             self._provider_client.dex.name,
@@ -37,8 +91,19 @@ class LiquidityPoolImporter(object):
             )
             return
 
-        from_block_number = block_reference.block_number
-        to_block_number = self._provider_client.get_latest_block_number()
+        from_block_number = self._get_from_block_number(block_reference=block_reference)
+        self._import_added_event_names(
+            block_reference=block_reference, to_block=from_block_number - 1
+        )
+        to_block_number = self._provider_client.get_confirmed_block_number()
+        if from_block_number > to_block_number:
+            logger.info(
+                "{} No confirmed blocks to import (from_block={}, to_block={}).".format(
+                    self.log_prefix, from_block_number, to_block_number
+                )
+            )
+            return
+
         logger.info(
             "{} Importing all liquidity provider data (from_block={}, to_block={}, block_diff={}).".format(
                 self.log_prefix,
@@ -49,22 +114,63 @@ class LiquidityPoolImporter(object):
         )
 
         while True:
+            window_to_block_number = min(
+                from_block_number + self._provider_client.max_events_block_diff,
+                to_block_number,
+            )
+            query_counter = metrics.QueryCounter()
+            started_at = time.perf_counter()
             try:
-                self._import_liquidity_provider_batch_data(
-                    from_block=from_block_number,
-                    to_block=from_block_number
-                    + self._provider_client.max_events_block_diff,
-                )
+                with connection.execute_wrapper(query_counter):
+                    self._partitioner.ensure_partitions(
+                        from_block=from_block_number,
+                        to_block=window_to_block_number,
+                    )
+                    self._import_liquidity_provider_batch_data(
+                        from_block=from_block_number,
+                        to_block=window_to_block_number,
+                        add_block_range=True,
+                    )
+                    self._update_derived_tables(
+                        from_block=from_block_number,
+                        to_block=window_to_block_number,
+                    )
             except dex_exceptions.DexProviderException as e:
                 msg = "Unable to import liquidity provider data for block range (from_block={}, to_block={}). Error: {}".format(
                     from_block_number,
-                    from_block_number + self._provider_client.max_events_block_diff,
+                    window_to_block_number,
                     common_utils.get_exception_message(exception=e),
                 )
                 logger.exception("{} {}.".format(self.log_prefix, msg))
                 raise exceptions.LiquidityPoolImporterException(msg)
 
+            window_duration = time.perf_counter() - started_at
+            metrics.WINDOW_DURATION.labels(
+                **self._provider_client.metric_labels
+            ).observe(window_duration)
+            metrics.WINDOW_DB_DURATION.labels(
+                **self._provider_client.metric_labels
+            ).observe(query_counter.duration)
+            metrics.WINDOW_SIZE_BLOCKS.labels(
+                **self._provider_client.metric_labels
+            ).set(self._provider_client.max_events_block_diff)
+            metrics.BLOCKS_BEHIND_HEAD.labels(
+                **self._provider_client.metric_labels
+            ).set(max(to_block_number - window_to_block_number, 0))
+            signals.block_window_imported.send(
+                sender=self.__class__,
+                dex_provider_client=self._provider_client,
+                from_block=from_block_number,
+                to_block=window_to_block_number,
+                duration=window_duration,
+                db_queries=query_counter.count,
+                db_duration=query_counter.duration,
+            )
+
             from_block_number += self._provider_client.max_events_block_diff
+            self._cache.set_block_number(
+                block_number=min(from_block_number, to_block_number)
+            )
             if from_block_number > to_block_number:
                 break
 
@@ -81,69 +187,559 @@ class LiquidityPoolImporter(object):
             )
         )
 
-    def _import_liquidity_provider_batch_data(
-        self, from_block: int, to_block: int
-    ) -> None:
-        logger.info(
-            "{} Batch importing liquidity provider data (from_block={}, to_block={}).".format(
-                self.log_prefix, from_block, to_block
+    def repair_missing_block_ranges(
+        self,
+        from_block: typing.Optional[int] = None,
+        to_block: typing.Optional[int] = None,
+        workers: int = 4,
+        dry_run: bool = False,
+    ) -> typing.List[lp_coverage_services.BlockRange]:
+        """
+        Imports block ranges without committed events between `from_block` and `to_block`, by default
+        from the first imported block up to the block reference, and returns the missing ranges.
+
+        Block windows of missing ranges are fetched from the node by `workers` threads, fetched windows
+        are stored one by one, so database writes are never concurrent.
+        """
+        block_reference = models.LiquidityPoolImporterBlockReference.objects.filter(
+            chain=self._provider_client.chain.value,
+            dex=self._provider_client.dex.value,
+            liquidity_pool=self._provider_client.liquidity_pool.value,
+        ).first()
+        if from_block is None:
+            from_block = block_reference.start_block_number if block_reference else None
+        if to_block is None:
+            to_block = block_reference.block_number if block_reference else None
+        if from_block is None or to_block is None:
+            msg = "Unknown block range to repair, first block of the import or block reference is missing (from_block={}, to_block={})".format(
+                from_block, to_block
             )
-        )
-        transaction_events = self._provider_client.get_transaction_events(
-            from_block=from_block,
-            to_block=to_block,
+            logger.error("{} {}.".format(self.log_prefix, msg))
+            raise exceptions.LiquidityPoolImporterException(msg)
+
+        missing_block_ranges = self._coverage.get_missing_block_ranges(
+            from_block=from_block, to_block=to_block
         )
         logger.info(
-            "{} Fetched {} transaction events to import.".format(
-                self.log_prefix, len(transaction_events)
+            "{} Found missing block ranges (from_block={}, to_block={}, missing_block_ranges={}, missing_blocks={}).".format(
+                self.log_prefix,
+                from_block,
+                to_block,
+                missing_block_ranges,
+                sum(
+                    range_to_block - range_from_block + 1
+                    for range_from_block, range_to_block in missing_block_ranges
+                ),
             )
         )
-        for transaction_event in transaction_events:
-            with transaction.atomic():
-                tx = models.Transaction.objects.filter(
-                    transaction_hash=transaction_event.transaction_hash
-                ).first()
-                if not tx:
-                    transaction_data = self._provider_client.get_transaction(
-                        transaction_hash=transaction_event.transaction_hash
+        if dry_run or not missing_block_ranges:
+            return missing_block_ranges
+
+        windows = [
+            (
+                window_from_block,
+                min(
+                    window_from_block + self._provider_client.max_events_block_diff,
+                    range_to_block,
+                ),
+            )
+            for range_from_block, range_to_block in missing_block_ranges
+            for window_from_block in range(
+                range_from_block,
+                range_to_block + 1,
+                self._provider_client.max_events_block_diff + 1,
+            )
+        ]
+        # Repaired windows precede ledgered blocks, the ledger is replayed once from the first repaired transfer.
+        positions_from_block = None
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(
+                    self._fetch_liquidity_provider_batch_data_in_thread,
+                    from_block=window_from_block,
+                    to_block=window_to_block,
+                )
+                for window_from_block, window_to_block in windows
+            ]
+            try:
+                for future in concurrent.futures.as_completed(futures):
+                    batch_data = future.result()
+                    self._partitioner.ensure_partitions(
+                        from_block=batch_data.from_block, to_block=batch_data.to_block
                     )
-                    tx = models.Transaction.objects.create(
-                        transaction_hash=transaction_data.transaction_hash,
-                        transaction_index=transaction_data.transaction_index,
-                        contract_address=transaction_event.contract_address,
-                        block_number=transaction_data.block_number,
-                        block_hash=transaction_data.block_hash,
-                        from_address=transaction_data.from_address,
-                        to_address=transaction_data.to_address,
-                        gas=transaction_data.gas,
-                        gas_price=transaction_data.gas_price,
+                    transfers_from_block = self._store_liquidity_provider_batch_data(
+                        batch_data=batch_data,
+                        add_block_range=True,
+                        update_positions=False,
                     )
-                    logger.info(
-                        "{} Imported new transaction (id={}, transaction_hash={}).".format(
-                            self.log_prefix, tx.id, tx.transaction_hash
+                    if transfers_from_block is not None:
+                        positions_from_block = min(
+                            positions_from_block or transfers_from_block,
+                            transfers_from_block,
                         )
+                    self._update_derived_tables(
+                        from_block=batch_data.from_block, to_block=batch_data.to_block
                     )
+            except dex_exceptions.DexProviderException as e:
+                for pending_future in futures:
+                    pending_future.cancel()
+                msg = "Unable to repair missing block ranges (missing_block_ranges={}). Error: {}".format(
+                    missing_block_ranges,
+                    common_utils.get_exception_message(exception=e),
+                )
+                logger.exception("{} {}.".format(self.log_prefix, msg))
+                raise exceptions.LiquidityPoolImporterException(msg)
+            finally:
+                # Transfers of windows stored before a failure are ledgered as well.
+                if positions_from_block is not None:
+                    with transaction.atomic():
+                        self._position_ledger.update_positions(
+                            from_block=positions_from_block
+                        )
+
+        logger.info(
+            "{} Repaired missing block ranges (missing_block_ranges={}, windows={}).".format(
+                self.log_prefix, missing_block_ranges, len(windows)
+            )
+        )
+        return missing_block_ranges
+
+    def _get_from_block_number(
+        self, block_reference: models.LiquidityPoolImporterBlockReference
+    ) -> int:
+        """
+        Returns the block to continue the import from, the cached block of an interrupted import
+        is only continued from when blocks since the block reference before it are committed.
+        """
+        cached_block_number = self._cache.get_block_number()
+        if (
+            cached_block_number is None
+            or cached_block_number <= block_reference.block_number
+        ):
+            return block_reference.block_number
+
+        missing_block_ranges = self._coverage.get_missing_block_ranges(
+            from_block=block_reference.block_number, to_block=cached_block_number - 1
+        )
+        if missing_block_ranges:
+            logger.warning(
+                "{} Cached block number is not committed, continuing from block reference (block_number={}, cached_block_number={}, missing_block_ranges={}).".format(
+                    self.log_prefix,
+                    block_reference.block_number,
+                    cached_block_number,
+                    missing_block_ranges,
+                )
+            )
+            return block_reference.block_number
+
+        return cached_block_number
+
+    def _import_added_event_names(
+        self,
+        block_reference: models.LiquidityPoolImporterBlockReference,
+        to_block: int,
+    ) -> None:
+        """
+        Backfills event types added to the pool config (`events`) since the last import
+        from the first imported block, only the added event types are requested from the node.
+        """
+        event_names = self._provider_client.event_names
+        imported_event_names = (
+            json.loads(block_reference.event_names)
+            if block_reference.event_names
+            else list(self._provider_client.EVENT_NAMES_SIGNATURE_MAP)
+        )
+        added_event_names = [
+            event_name
+            for event_name in event_names
+            if event_name not in imported_event_names
+        ]
+
+        event_names_value = json.dumps(sorted(event_names))
+        if (
+            block_reference.start_block_number is not None
+            and block_reference.event_names == event_names_value
+        ):
+            return
+
+        if block_reference.start_block_number is None:
+            # Transactions shared by pools keep the pool which stored them first.
+            first_block_number = models.TransactionEvent.objects.for_pool(
+                contract_address=self._provider_client.lp_contract_address
+            ).aggregate(block_number=Min("block_number"))["block_number"]
+            block_reference.start_block_number = min(
+                block_reference.block_number,
+                first_block_number or block_reference.block_number,
+            )
+
+        from_block_number = block_reference.start_block_number
+        if added_event_names:
+            logger.info(
+                "{} Backfilling added event types (event_names={}, from_block={}, to_block={}).".format(
+                    self.log_prefix, added_event_names, from_block_number, to_block
+                )
+            )
+        while added_event_names and from_block_number <= to_block:
+            window_to_block_number = min(
+                from_block_number + self._provider_client.max_events_block_diff,
+                to_block,
+            )
+            try:
+                self._partitioner.ensure_partitions(
+                    from_block=from_block_number, to_block=window_to_block_number
+                )
+                self._import_liquidity_provider_batch_data(
+                    from_block=from_block_number,
+                    to_block=window_to_block_number,
+                    event_names=added_event_names,
+                    update_positions=False,
+                )
+                self._update_derived_tables(
+                    from_block=from_block_number, to_block=window_to_block_number
+                )
+            except dex_exceptions.DexProviderException as e:
+                msg = "Unable to backfill added event types (event_names={}, from_block={}, to_block={}). Error: {}".format(
+                    added_event_names,
+                    from_block_number,
+                    window_to_block_number,
+                    common_utils.get_exception_message(exception=e),
+                )
+                logger.exception("{} {}.".format(self.log_prefix, msg))
+                raise exceptions.LiquidityPoolImporterException(msg)
+
+            from_block_number = window_to_block_number + 1
+
+        # Backfilled transfers precede ledgered blocks, the ledger is replayed once over the backfilled range.
+        # An interrupted backfill is repeated by the next import, which replays it then.
+        if "Transfer" in added_event_names:
+            with transaction.atomic():
+                self._position_ledger.update_positions(
+                    from_block=block_reference.start_block_number
+                )
+
+        block_reference.event_names = event_names_value
+        block_reference.save(
+            update_fields=["start_block_number", "event_names", "updated_at"]
+        )
 
-                event = models.TransactionEvent.objects.filter(
-                    transaction_id=tx.id,
-                    log_index=transaction_event.log_index,
-                ).first()
-                if not event:
-                    event = models.TransactionEvent.objects.create(
+    def _update_derived_tables(self, from_block: int, to_block: int) -> None:
+        self._rollup_builder.update_rollups(from_block=from_block, to_block=to_block)
+        for derivation in self._derivations:
+            derivation.derive(from_block=from_block, to_block=to_block)
+        # Prices are derived from the reserves derived table updated above.
+        if self._price_indexer:
+            self._price_indexer.update_prices(
+                from_block=from_block,
+                to_block=to_block,
+                liquidity_pools=[self._provider_client.liquidity_pool],
+            )
+
+    def _import_liquidity_provider_batch_data(
+        self,
+        from_block: int,
+        to_block: int,
+        event_names: typing.Optional[typing.List[str]] = None,
+        add_block_range: bool = False,
+        update_positions: bool = True,
+    ) -> typing.Optional[int]:
+        return self._store_liquidity_provider_batch_data(
+            batch_data=self._fetch_liquidity_provider_batch_data(
+                from_block=from_block, to_block=to_block, event_names=event_names
+            ),
+            add_block_range=add_block_range,
+            update_positions=update_positions,
+        )
+
+    def _fetch_liquidity_provider_batch_data(
+        self,
+        from_block: int,
+        to_block: int,
+        event_names: typing.Optional[typing.List[str]] = None,
+    ) -> _BatchData:
+        logger.debug(
+            "%s Batch importing liquidity provider data (from_block=%s, to_block=%s).",
+            self.log_prefix,
+            from_block,
+            to_block,
+        )
+        started_at = time.perf_counter()
+        transaction_events = self._provider_client.get_transaction_events(
+            from_block=from_block,
+            to_block=to_block,
+            event_names=event_names,
+        )
+        fetch_duration = time.perf_counter() - started_at
+
+        known_transaction_ids = self._get_stored_transaction_ids(
+            transaction_ids=self._cache.get_transaction_ids(
+                transaction_hashes={
+                    event.transaction_hash for event in transaction_events
+                }
+            )
+        )
+        # Cached events are only trusted with their transaction stored under the cached id.
+        known_event_keys = {
+            event_key
+            for event_key in self._cache.get_known_events(
+                event_keys=[
+                    (event.transaction_hash, event.log_index)
+                    for event in transaction_events
+                ]
+            )
+            if event_key[0] in known_transaction_ids
+        }
+        fetched_transactions = self._get_missing_transactions(
+            transaction_hashes={
+                event.transaction_hash
+                for event in transaction_events
+                if (event.transaction_hash, event.log_index) not in known_event_keys
+            },
+            known_transaction_ids=known_transaction_ids,
+        )
+
+        return _BatchData(
+            from_block=from_block,
+            to_block=to_block,
+            transaction_events=transaction_events,
+            known_transaction_ids=known_transaction_ids,
+            known_event_keys=known_event_keys,
+            fetched_transactions=fetched_transactions,
+            started_at=started_at,
+            fetch_duration=fetch_duration,
+        )
+
+    def _fetch_liquidity_provider_batch_data_in_thread(
+        self, from_block: int, to_block: int
+    ) -> _BatchData:
+        try:
+            batch_data = self._fetch_liquidity_provider_batch_data(
+                from_block=from_block, to_block=to_block
+            )
+            batch_data.block_timestamps = self._provider_client.get_block_timestamps(
+                block_numbers=sorted(
+                    {
+                        transaction_data.block_number
+                        for transaction_data in batch_data.fetched_transactions.values()
+                    }
+                )
+            )
+            return batch_data
+        finally:
+            # Worker threads open their own database connections.
+            connection.close()
+
+    def _store_liquidity_provider_batch_data(
+        self,
+        batch_data: _BatchData,
+        add_block_range: bool,
+        update_positions: bool = True,
+    ) -> typing.Optional[int]:
+        """
+        Stores fetched events not stored yet, `add_block_range` records the window as covered
+        in the same database transaction. Returns the first block of stored `Transfer` events,
+        windows of past blocks pass `update_positions=False` and replay the position ledger once.
+        """
+        known_transaction_ids = batch_data.known_transaction_ids
+        fetched_transactions = batch_data.fetched_transactions
+        block_timestamps = batch_data.block_timestamps or {}
+        transaction_events = [
+            transaction_event
+            for transaction_event in batch_data.transaction_events
+            if (transaction_event.transaction_hash, transaction_event.log_index)
+            not in batch_data.known_event_keys
+        ]
+
+        # Events of the window are committed at once with bulk inserts, so the database
+        # syncs once per window instead of once per event.
+        with transaction.atomic():
+            stored_event_keys = self._get_stored_event_keys(
+                transaction_events=transaction_events,
+                known_transaction_ids=known_transaction_ids,
+                from_block=batch_data.from_block,
+                to_block=batch_data.to_block,
+            )
+
+            new_transactions = {}
+            for transaction_event in transaction_events:
+                transaction_hash = transaction_event.transaction_hash
+                if (
+                    transaction_hash in known_transaction_ids
+                    or transaction_hash in new_transactions
+                ):
+                    continue
+
+                transaction_data = fetched_transactions[transaction_hash]
+                new_transactions[transaction_hash] = models.Transaction(
+                    transaction_hash=transaction_data.transaction_hash,
+                    transaction_index=transaction_data.transaction_index,
+                    contract_address=transaction_event.contract_address,
+                    block_number=transaction_data.block_number,
+                    block_hash=transaction_data.block_hash,
+                    from_address=transaction_data.from_address,
+                    to_address=transaction_data.to_address,
+                    gas=transaction_data.gas,
+                    gas_price=transaction_data.gas_price,
+                    block_timestamp=block_timestamps.get(transaction_data.block_number),
+                )
+            created_transactions = models.Transaction.objects.bulk_create(
+                list(new_transactions.values()),
+                batch_size=_TRANSACTION_HASHES_CHUNK_SIZE,
+            )
+            known_transaction_ids.update(
+                (tx.transaction_hash, tx.id) for tx in created_transactions
+            )
+
+            created_events = models.TransactionEvent.objects.bulk_create(
+                [
+                    models.TransactionEvent(
                         name=transaction_event.name,
                         topics=json.dumps(transaction_event.topics),
                         data=transaction_event.data,
                         log_index=transaction_event.log_index,
-                        transaction=tx,
+                        contract_address=transaction_event.contract_address,
+                        block_number=transaction_event.block_number,
+                        transaction_id=known_transaction_ids[
+                            transaction_event.transaction_hash
+                        ],
                     )
-
-                logger.info(
-                    "{} Imported new event (event_id={}, transaction_id={}).".format(
-                        self.log_prefix, event.id, tx.id
+                    for transaction_event in transaction_events
+                    if (
+                        known_transaction_ids[transaction_event.transaction_hash],
+                        transaction_event.log_index,
                     )
+                    not in stored_event_keys
+                ],
+                batch_size=_TRANSACTION_HASHES_CHUNK_SIZE,
+            )
+            transfers_from_block = min(
+                (
+                    event.block_number
+                    for event in created_events
+                    if event.name == "Transfer"
+                ),
+                default=None,
+            )
+
+            # LP token balances are committed with the transfers they are built from.
+            if update_positions and transfers_from_block is not None:
+                self._position_ledger.update_positions(from_block=transfers_from_block)
+
+            if add_block_range:
+                self._coverage.add_block_range(
+                    from_block=batch_data.from_block, to_block=batch_data.to_block
                 )
+
+        self._cache.set_transaction_ids(
+            transaction_ids={
+                transaction_event.transaction_hash: known_transaction_ids[
+                    transaction_event.transaction_hash
+                ]
+                for transaction_event in transaction_events
+            }
+        )
+        self._cache.add_known_events(
+            event_keys=[
+                (transaction_event.transaction_hash, transaction_event.log_index)
+                for transaction_event in transaction_events
+            ]
+        )
+
+        imported_transactions_count = len(created_transactions)
+        imported_events_count = len(created_events)
+        metrics.TRANSACTIONS_INSERTED.labels(**self._provider_client.metric_labels).inc(
+            imported_transactions_count
+        )
+        metrics.EVENTS_INSERTED.labels(**self._provider_client.metric_labels).inc(
+            imported_events_count
+        )
         logger.info(
-            "{} Batch imported liquidity provider data (from_block={}, to_block={}).".format(
-                self.log_prefix, from_block, to_block
+            "{} Batch imported liquidity provider data (from_block={}, to_block={}, fetched_events={}, imported_transactions={}, imported_events={}, fetch_seconds={:.3f}, duration_seconds={:.3f}).".format(
+                self.log_prefix,
+                batch_data.from_block,
+                batch_data.to_block,
+                len(batch_data.transaction_events),
+                imported_transactions_count,
+                imported_events_count,
+                batch_data.fetch_duration,
+                time.perf_counter() - batch_data.started_at,
             )
         )
+
+        return transfers_from_block
+
+    @staticmethod
+    def _get_stored_event_keys(
+        transaction_events: typing.List[dex_messages.TransactionEvent],
+        known_transaction_ids: typing.Dict[str, int],
+        from_block: int,
+        to_block: int,
+    ) -> typing.Set[typing.Tuple[int, int]]:
+        """
+        Returns (transaction_id, log_index) keys of events of the window already stored, only events
+        of stored transactions may be stored (ex. not cached events of a repaired window).
+        """
+        contract_addresses = {
+            transaction_event.contract_address
+            for transaction_event in transaction_events
+            if transaction_event.transaction_hash in known_transaction_ids
+        }
+        stored_event_keys = set()
+        for contract_address in contract_addresses:
+            stored_event_keys.update(
+                models.TransactionEvent.objects.for_pool(
+                    contract_address=contract_address,
+                    from_block=from_block,
+                    to_block=to_block,
+                ).values_list("transaction_id", "log_index")
+            )
+
+        return stored_event_keys
+
+    def _get_stored_transaction_ids(
+        self, transaction_ids: typing.Dict[str, int]
+    ) -> typing.Dict[str, int]:
+        """
+        Returns cached transaction ids stored in the database, looked up by primary key, so ids cached
+        before the database was reset or loaded from a snapshot are dropped.
+        """
+        ids = list(transaction_ids.values())
+        stored_transaction_ids = {}
+        for index in range(0, len(ids), _TRANSACTION_HASHES_CHUNK_SIZE):
+            stored_transaction_ids.update(
+                models.Transaction.objects.filter(
+                    id__in=ids[index : index + _TRANSACTION_HASHES_CHUNK_SIZE]
+                ).values_list("transaction_hash", "id")
+            )
+
+        return {
+            transaction_hash: transaction_id
+            for transaction_hash, transaction_id in transaction_ids.items()
+            if stored_transaction_ids.get(transaction_hash) == transaction_id
+        }
+
+    def _get_missing_transactions(
+        self,
+        transaction_hashes: typing.Set[str],
+        known_transaction_ids: typing.Dict[str, int],
+    ) -> typing.Dict[str, dex_messages.Transaction]:
+        """
+        Resolves transaction ids of not cached transactions from the database into `known_transaction_ids`
+        and fetches the remaining transactions from the node in one batch.
+        """
+        transaction_hashes = list(transaction_hashes - set(known_transaction_ids))
+        for index in range(0, len(transaction_hashes), _TRANSACTION_HASHES_CHUNK_SIZE):
+            known_transaction_ids.update(
+                models.Transaction.objects.filter(
+                    transaction_hash__in=transaction_hashes[
+                        index : index + _TRANSACTION_HASHES_CHUNK_SIZE
+                    ]
+                ).values_list("transaction_hash", "id")
+            )
+
+        return self._provider_client.get_transactions(
+            transaction_hashes=[
+                transaction_hash
+                for transaction_hash in transaction_hashes
+                if transaction_hash not in known_transaction_ids
+            ]
+        )
@@ -0,0 +1,185 @@
+import logging
+import typing
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from src import models
+from src.clients.dex import base as base_dex_provider
+
+logger = logging.getLogger(__name__)
+
+PARTITIONED_TABLES = [models.Transaction._meta.db_table, models.TransactionEvent._meta.db_table]
+
+
+def is_partitioning_enabled() -> bool:
+    return settings.LP_PARTITIONING["enabled"] and connection.vendor == "postgresql"
+
+
+def get_pool_partition_name(table: str, contract_address: str) -> str:
+    return "{}_{}".format(table, contract_address[2:14].lower())
+
+
+def get_block_range_partition_name(table: str, contract_address: str, range_start: int) -> str:
+    return "{}_{}".format(get_pool_partition_name(table=table, contract_address=contract_address), range_start)
+
+
+def create_partitions(
+    cursor: typing.Any, table: str, contract_address: str, from_block: int, to_block: int, partition_size: int
+) -> typing.List[str]:
+    """
+    Creates the list partition of the pool and its block range partitions covering the inclusive block range.
+    """
+    pool_partition = get_pool_partition_name(table=table, contract_address=contract_address)
+    statements = [
+        (
+            "CREATE TABLE IF NOT EXISTS {} PARTITION OF {} FOR VALUES IN (%s) PARTITION BY RANGE (block_number)".format(
+                pool_partition, table
+            ),
+            [contract_address],
+        )
+    ]
+    partitions = []
+    for range_start in range(from_block - from_block % partition_size, to_block + 1, partition_size):
+        range_partition = get_block_range_partition_name(
+            table=table, contract_address=contract_address, range_start=range_start
+        )
+        statements.append(
+            (
+                "CREATE TABLE IF NOT EXISTS {} PARTITION OF {} FOR VALUES FROM (%s) TO (%s)".format(
+                    range_partition, pool_partition
+                ),
+                [range_start, range_start + partition_size],
+            )
+        )
+        partitions.append(range_partition)
+
+    # Serializes concurrent importers creating the same partitions.
+    cursor.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", [pool_partition])
+    for statement, params in statements:
+        cursor.execute(statement, params)
+
+    return partitions
+
+
+class LiquidityPoolPartitioner(object):
+    """
+    Creates block range partitions of liquidity pool transactions and events on demand.
+
+    Does nothing unless `LP_PARTITIONING["enabled"]` is set and the tables were converted by `partition_tables` command.
+    """
+
+    PARTITIONING_CONFIG = settings.LP_PARTITIONING
+
+    _created_partitions = set()
+    _tables_partitioned = None
+
+    def __init__(self, dex_provider_client: base_dex_provider.BaseDexLPProvider) -> None:
+        self._provider_client = dex_provider_client
+        self.log_prefix = "[{}-{}-LIQUIDITY-POOL-PARTITIONER]".format(
+            self._provider_client.chain.name, self._provider_client.dex.name
+        )
+
+    def ensure_partitions(self, from_block: int, to_block: int, contract_address: typing.Optional[str] = None) -> None:
+        """
+        Ensures partitions of the block range of the provider pool, or of `contract_address` for DEX wide providers.
+        """
+        if not is_partitioning_enabled() or not self._are_tables_partitioned():
+            return
+
+        partition_size = self.PARTITIONING_CONFIG["partition_size_blocks"]
+        contract_address = contract_address or self._provider_client.lp_contract_address
+        range_starts = range(from_block - from_block % partition_size, to_block + 1, partition_size)
+        if all((contract_address, range_start) in self._created_partitions for range_start in range_starts):
+            return
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            for table in PARTITIONED_TABLES:
+                partitions = create_partitions(
+                    cursor=cursor,
+                    table=table,
+                    contract_address=contract_address,
+                    from_block=from_block,
+                    to_block=to_block,
+                    partition_size=partition_size,
+                )
+                logger.debug("%s Ensured partitions (table=%s, partitions=%s).", self.log_prefix, table, partitions)
+
+        self._created_partitions.update((contract_address, range_start) for range_start in range_starts)
+
+    @classmethod
+    def _are_tables_partitioned(cls) -> bool:
+        if cls._tables_partitioned is None:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT COUNT(*) FROM pg_partitioned_table WHERE partrelid::regclass::text = ANY(%s)",
+                    [PARTITIONED_TABLES],
+                )
+                cls._tables_partitioned = cursor.fetchone()[0] == len(PARTITIONED_TABLES)
+
+        return cls._tables_partitioned
+
+
+def partition_tables(partition_size: int) -> typing.List[str]:
+    """
+    Converts transaction and event tables into tables partitioned by pool contract address and block range,
+    copies existing rows into partitions and returns the converted tables. Already partitioned tables are skipped.
+    """
+    converted_tables = []
+    with transaction.atomic(), connection.cursor() as cursor:
+        for table in PARTITIONED_TABLES:
+            cursor.execute("SELECT 1 FROM pg_partitioned_table WHERE partrelid = %s::regclass", [table])
+            if cursor.fetchone():
+                continue
+
+            unpartitioned_table = "{}_unpartitioned".format(table)
+            cursor.execute(
+                "SELECT indexname, indexdef FROM pg_indexes WHERE tablename = %s AND indexname NOT IN "
+                "(SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass)",
+                [table, table],
+            )
+            indexes = cursor.fetchall()
+            cursor.execute("ALTER TABLE {} RENAME TO {}".format(table, unpartitioned_table))
+            for index_name, _ in indexes:
+                cursor.execute("DROP INDEX {}".format(index_name))
+
+            # Identity columns are not supported on partitioned tables of older Postgres versions, ids use a sequence.
+            cursor.execute(
+                "CREATE TABLE {} (LIKE {} INCLUDING DEFAULTS) PARTITION BY LIST (contract_address)".format(
+                    table, unpartitioned_table
+                )
+            )
+            cursor.execute("ALTER TABLE {} ADD PRIMARY KEY (id, contract_address, block_number)".format(table))
+            cursor.execute("CREATE SEQUENCE {0}_id_partitioned_seq OWNED BY {0}.id".format(table))
+            cursor.execute(
+                "ALTER TABLE {0} ALTER COLUMN id SET DEFAULT nextval('{0}_id_partitioned_seq')".format(table)
+            )
+            cursor.execute("CREATE TABLE {0}_default PARTITION OF {0} DEFAULT".format(table))
+
+            cursor.execute(
+                "SELECT contract_address, MIN(block_number), MAX(block_number) FROM {} GROUP BY contract_address".format(
+                    unpartitioned_table
+                )
+            )
+            for contract_address, from_block, to_block in cursor.fetchall():
+                create_partitions(
+                    cursor=cursor,
+                    table=table,
+                    contract_address=contract_address,
+                    from_block=from_block,
+                    to_block=to_block,
+                    partition_size=partition_size,
+                )
+
+            cursor.execute("INSERT INTO {} SELECT * FROM {}".format(table, unpartitioned_table))
+            for _, index_definition in indexes:
+                cursor.execute(index_definition)
+            cursor.execute(
+                "SELECT setval('{0}_id_partitioned_seq', COALESCE((SELECT MAX(id) FROM {0}), 0) + 1, false)".format(
+                    table
+                )
+            )
+            cursor.execute("DROP TABLE {}".format(unpartitioned_table))
+            converted_tables.append(table)
+
+    return converted_tables
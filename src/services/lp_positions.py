@@ -0,0 +1,256 @@
+import json
+import logging
+import time
+import typing
+
+from django.db import connection
+from django.db import models as django_db_models
+from django.db.models import Max, Q
+from django.utils import timezone
+
+from src import db, models
+from src.clients.dex import base as base_dex_provider
+
+logger = logging.getLogger(__name__)
+
+ZERO_ADDRESS = "0x" + "0" * 40
+
+_ADDRESSES_CHUNK_SIZE = 500
+
+
+class LiquidityPoolPositionLedger(object):
+    """
+    Ledger of LP token balances of addresses of a liquidity pool, built from stored `Transfer` events of the pool.
+
+    Mints are transfers from the zero address, burns are transfers of the pool to the zero address, as emitted by
+    Uniswap V2 pairs. Every block changing a balance or the total supply adds a row to `lp_position_history` or
+    `lp_pool_total_supply`, current balances are kept in `lp_position`. Events are replayed from a block to the
+    latest stored event, so events stored before already ledgered blocks (repaired gaps, backfilled event types) are
+    ledgered by replaying the blocks after them.
+    """
+
+    def __init__(self, dex_provider_client: base_dex_provider.BaseDexLPProvider) -> None:
+        self._provider_client = dex_provider_client
+        self.log_prefix = "[{}-{}-{}-LIQUIDITY-POOL-POSITION-LEDGER]".format(
+            self._provider_client.chain.name,
+            self._provider_client.dex.name,
+            self._provider_client.liquidity_pool.name,
+        )
+
+    def update_positions(self, from_block: int) -> int:
+        """
+        Replays stored `Transfer` events of the pool from `from_block` on and returns the number of replayed events.
+        Has to run in the database transaction storing the events, so the ledger never lags behind them.
+        """
+        started_at = time.perf_counter()
+        transfers = self._get_transfers(from_block=from_block)
+        replayed_addresses = set(
+            self._get_pool_rows(model=models.LiquidityPoolPositionHistory)
+            .filter(block_number__gte=from_block)
+            .values_list("address", flat=True)
+            .distinct()
+        )
+        addresses = replayed_addresses | {
+            address for _, from_address, to_address, _ in transfers for address in (from_address, to_address)
+        }
+        if not addresses:
+            return 0
+
+        # Balances before `from_block`, current balances are up to date for addresses without later history.
+        balances, balance_block_numbers = self._get_current_balances(addresses=addresses - replayed_addresses)
+        previous_balances, previous_block_numbers = self._get_previous_balances(
+            addresses=replayed_addresses, from_block=from_block
+        )
+        balances.update(previous_balances)
+        balance_block_numbers.update(previous_block_numbers)
+        total_supply = int(
+            self._get_pool_rows(model=models.LiquidityPoolTotalSupply)
+            .filter(block_number__lt=from_block)
+            .order_by("-block_number")
+            .values_list("total_supply", flat=True)
+            .first()
+            or 0
+        )
+
+        lp_contract_address = self._provider_client.lp_contract_address.lower()
+        history_rows = []
+        total_supply_rows = []
+        changed_addresses = set()
+        is_total_supply_changed = False
+        for index, (block_number, from_address, to_address, value) in enumerate(transfers):
+            if from_address == ZERO_ADDRESS:
+                total_supply += value
+                is_total_supply_changed = True
+            else:
+                balances[from_address] = balances.get(from_address, 0) - value
+                changed_addresses.add(from_address)
+            if to_address == ZERO_ADDRESS and from_address == lp_contract_address:
+                total_supply -= value
+                is_total_supply_changed = True
+            else:
+                balances[to_address] = balances.get(to_address, 0) + value
+                changed_addresses.add(to_address)
+
+            # Balances after the last transfer of a block are recorded.
+            if index + 1 == len(transfers) or transfers[index + 1][0] != block_number:
+                for address in changed_addresses:
+                    history_rows.append((address, block_number, str(balances[address])))
+                    balance_block_numbers[address] = block_number
+                if is_total_supply_changed:
+                    total_supply_rows.append((block_number, str(total_supply)))
+                changed_addresses = set()
+                is_total_supply_changed = False
+
+        self._replace_rows(
+            from_block=from_block,
+            addresses=addresses,
+            balances=balances,
+            balance_block_numbers=balance_block_numbers,
+            history_rows=history_rows,
+            total_supply_rows=total_supply_rows,
+        )
+
+        logger.debug(
+            "%s Updated positions (from_block=%s, transfers=%s, addresses=%s, duration_seconds=%.3f).",
+            self.log_prefix,
+            from_block,
+            len(transfers),
+            len(addresses),
+            time.perf_counter() - started_at,
+        )
+        return len(transfers)
+
+    def _replace_rows(
+        self,
+        from_block: int,
+        addresses: typing.Set[str],
+        balances: typing.Dict[str, int],
+        balance_block_numbers: typing.Dict[str, int],
+        history_rows: typing.List[typing.Tuple],
+        total_supply_rows: typing.List[typing.Tuple],
+    ) -> None:
+        now = connection.ops.adapt_datetimefield_value(timezone.now())
+        pool_values = (
+            self._provider_client.chain.value,
+            self._provider_client.dex.value,
+            self._provider_client.liquidity_pool.value,
+        )
+
+        self._get_pool_rows(model=models.LiquidityPoolPositionHistory).filter(block_number__gte=from_block).delete()
+        db.bulk_insert(
+            table=models.LiquidityPoolPositionHistory._meta.db_table,
+            columns=(
+                "chain",
+                "dex",
+                "liquidity_pool",
+                "address",
+                "block_number",
+                "balance",
+                "created_at",
+                "updated_at",
+            ),
+            rows=((*pool_values, *row, now, now) for row in history_rows),
+        )
+
+        self._get_pool_rows(model=models.LiquidityPoolTotalSupply).filter(block_number__gte=from_block).delete()
+        db.bulk_insert(
+            table=models.LiquidityPoolTotalSupply._meta.db_table,
+            columns=("chain", "dex", "liquidity_pool", "block_number", "total_supply", "created_at", "updated_at"),
+            rows=((*pool_values, *row, now, now) for row in total_supply_rows),
+        )
+
+        addresses = sorted(addresses)
+        for index in range(0, len(addresses), _ADDRESSES_CHUNK_SIZE):
+            self._get_pool_rows(model=models.LiquidityPoolPosition).filter(
+                address__in=addresses[index : index + _ADDRESSES_CHUNK_SIZE]
+            ).delete()
+        db.bulk_insert(
+            table=models.LiquidityPoolPosition._meta.db_table,
+            columns=(
+                "chain",
+                "dex",
+                "liquidity_pool",
+                "address",
+                "balance",
+                "balance_value",
+                "block_number",
+                "created_at",
+                "updated_at",
+            ),
+            rows=(
+                (*pool_values, address, str(balances[address]), float(balances[address]), block_number, now, now)
+                for address, block_number in balance_block_numbers.items()
+            ),
+        )
+
+    def _get_transfers(self, from_block: int) -> typing.List[typing.Tuple[int, str, str, int]]:
+        transfers = []
+        for topics, data, block_number in (
+            models.TransactionEvent.objects.for_pool(
+                contract_address=self._provider_client.lp_contract_address, from_block=from_block
+            )
+            .filter(name="Transfer")
+            .order_by("block_number", "log_index")
+            .values_list("topics", "data", "block_number")
+        ):
+            # Transfer(address indexed from, address indexed to, uint256 value)
+            topics = json.loads(topics)
+            transfers.append(
+                (block_number, "0x" + topics[1][-40:].lower(), "0x" + topics[2][-40:].lower(), int(data, 16))
+            )
+
+        return transfers
+
+    def _get_current_balances(
+        self, addresses: typing.Set[str]
+    ) -> typing.Tuple[typing.Dict[str, int], typing.Dict[str, int]]:
+        balances = {}
+        balance_block_numbers = {}
+        addresses = sorted(addresses)
+        for index in range(0, len(addresses), _ADDRESSES_CHUNK_SIZE):
+            for address, balance, block_number in (
+                self._get_pool_rows(model=models.LiquidityPoolPosition)
+                .filter(address__in=addresses[index : index + _ADDRESSES_CHUNK_SIZE])
+                .values_list("address", "balance", "block_number")
+            ):
+                balances[address] = int(balance)
+                balance_block_numbers[address] = block_number
+
+        return balances, balance_block_numbers
+
+    def _get_previous_balances(
+        self, addresses: typing.Set[str], from_block: int
+    ) -> typing.Tuple[typing.Dict[str, int], typing.Dict[str, int]]:
+        balances = {}
+        balance_block_numbers = {}
+        addresses = sorted(addresses)
+        history = self._get_pool_rows(model=models.LiquidityPoolPositionHistory)
+        for index in range(0, len(addresses), _ADDRESSES_CHUNK_SIZE):
+            last_block_numbers = (
+                history.filter(
+                    address__in=addresses[index : index + _ADDRESSES_CHUNK_SIZE], block_number__lt=from_block
+                )
+                .values("address")
+                .annotate(block_number=Max("block_number"))
+                .values_list("address", "block_number")
+            )
+            last_rows_filter = Q()
+            for address, block_number in last_block_numbers:
+                last_rows_filter |= Q(address=address, block_number=block_number)
+            if not last_rows_filter:
+                continue
+
+            for address, balance, block_number in history.filter(last_rows_filter).values_list(
+                "address", "balance", "block_number"
+            ):
+                balances[address] = int(balance)
+                balance_block_numbers[address] = block_number
+
+        return balances, balance_block_numbers
+
+    def _get_pool_rows(self, model: typing.Type[django_db_models.Model]) -> django_db_models.QuerySet:
+        return model.objects.filter(
+            chain=self._provider_client.chain.value,
+            dex=self._provider_client.dex.value,
+            liquidity_pool=self._provider_client.liquidity_pool.value,
+        )
@@ -0,0 +1,318 @@
+import logging
+import time
+import typing
+from dataclasses import dataclass
+
+import numpy
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Max, Min
+from django.utils import timezone
+
+from src import db, enums, exceptions, models
+
+logger = logging.getLogger(__name__)
+
+BlockRange = typing.Tuple[int, int]
+
+
+@dataclass
+class PoolReserves:
+    """
+    Reserves of a pool scaled by token decimals after the last `Sync` event of every block, ordered by block number.
+    The first element holds reserves before the loaded block range, NaN when the pool had no reserves yet.
+    """
+
+    block_numbers: numpy.ndarray
+    reserves0: numpy.ndarray
+    reserves1: numpy.ndarray
+
+    def get_reserves_at(self, block_numbers: numpy.ndarray) -> typing.Tuple[numpy.ndarray, numpy.ndarray]:
+        indexes = numpy.searchsorted(self.block_numbers, block_numbers, side="right") - 1
+        return self.reserves0[indexes], self.reserves1[indexes]
+
+
+def get_pool_tokens(liquidity_pool: enums.LiquidityPool) -> typing.Tuple[str, str]:
+    token0, token1 = liquidity_pool.name.split("_")
+    return token0, token1
+
+
+def get_price_indexer(chain: enums.Chain, dex: enums.Dex) -> typing.Optional["TokenPriceIndexer"]:
+    """
+    Returns the price indexer of the DEX, `None` when the DEX has no price index configured.
+    """
+    if dex.name not in settings.LP_PRICE_INDEX["chains"].get(chain.name, {}):
+        return None
+
+    return TokenPriceIndexer(chain=chain, dex=dex)
+
+
+class TokenPriceIndexer(object):
+    """
+    Derives USD prices of tokens of a DEX at every block where reserves of a pool the token is routed through change.
+
+    Prices are computed from the `reserves` derived table (`models.LiquidityPoolReserve`) in batches of blocks, where
+    reserves of pools are forward filled to the blocks of the batch with numpy. The price of a token through a routed
+    pool is its reserve ratio times the price of the other token, prices through several pools are averaged weighted by
+    the USD value of the other token reserves, so thin pools barely move the index.
+    """
+
+    PRICE_INDEX_CONFIG = settings.LP_PRICE_INDEX
+
+    def __init__(self, chain: enums.Chain, dex: enums.Dex) -> None:
+        self.chain = chain
+        self.dex = dex
+        self.log_prefix = "[{}-{}-TOKEN-PRICE-INDEXER]".format(chain.name, dex.name)
+
+        try:
+            dex_config = self.PRICE_INDEX_CONFIG["chains"][chain.name][dex.name]
+            self._token_decimals = dex_config["token_decimals"]
+            self._usd_tokens = set(dex_config["usd_tokens"])
+            self._routes = {
+                token: [enums.LiquidityPool[liquidity_pool] for liquidity_pool in liquidity_pools]
+                for token, liquidity_pools in dex_config["routes"].items()
+            }
+        except KeyError as e:
+            msg = "Price index of dex {} is not configured. Error: missing key {}".format(dex.name, e)
+            logger.error("{} {}.".format(self.log_prefix, msg))
+            raise exceptions.LiquidityPoolPriceIndexException(msg)
+
+        self._tokens = self._get_priced_tokens()
+
+    @property
+    def tokens(self) -> typing.List[str]:
+        """
+        Routed tokens in pricing order, every token is priced after the other tokens of its routed pools.
+        """
+        return list(self._tokens)
+
+    def get_token_liquidity_pools(self, token: str) -> typing.Set[enums.LiquidityPool]:
+        """
+        Returns all pools the price of the token depends on, including routes of the other tokens.
+        """
+        liquidity_pools = set()
+        for liquidity_pool in self._routes.get(token, []):
+            liquidity_pools.add(liquidity_pool)
+            liquidity_pools |= self.get_token_liquidity_pools(token=self._get_other_token(liquidity_pool, token))
+
+        return liquidity_pools
+
+    def get_block_range(
+        self,
+        tokens: typing.Optional[typing.List[str]] = None,
+        from_block: typing.Optional[int] = None,
+        to_block: typing.Optional[int] = None,
+    ) -> typing.Optional[BlockRange]:
+        """
+        Returns the block range of stored reserves of pools of the tokens narrowed to the given bounds.
+        """
+        liquidity_pools = set()
+        for token in tokens or self._tokens:
+            liquidity_pools |= self.get_token_liquidity_pools(token=token)
+
+        stored_range = models.LiquidityPoolReserve.objects.filter(
+            chain=self.chain.value,
+            dex=self.dex.value,
+            liquidity_pool__in=[liquidity_pool.value for liquidity_pool in liquidity_pools],
+        ).aggregate(from_block=Min("block_number"), to_block=Max("block_number"))
+        if stored_range["from_block"] is None:
+            return None
+
+        from_block = (
+            max(from_block, stored_range["from_block"]) if from_block is not None else stored_range["from_block"]
+        )
+        to_block = min(to_block, stored_range["to_block"]) if to_block is not None else stored_range["to_block"]
+
+        return (from_block, to_block) if from_block <= to_block else None
+
+    def update_prices(
+        self,
+        from_block: int,
+        to_block: int,
+        liquidity_pools: typing.Optional[typing.List[enums.LiquidityPool]] = None,
+        tokens: typing.Optional[typing.List[str]] = None,
+    ) -> int:
+        """
+        Replaces prices of the inclusive block range batch by batch and returns the number of written prices. Only
+        tokens depending on `liquidity_pools` are updated when given, importers pass the pool of the imported window.
+        """
+        tokens = [
+            token
+            for token in self._tokens
+            if (not tokens or token in tokens)
+            and (not liquidity_pools or self.get_token_liquidity_pools(token=token) & set(liquidity_pools))
+        ]
+        if not tokens:
+            return 0
+
+        started_at = time.perf_counter()
+        prices_count = 0
+        batch_size_blocks = self.PRICE_INDEX_CONFIG["batch_size_blocks"]
+        for batch_from_block in range(from_block, to_block + 1, batch_size_blocks):
+            prices_count += self._update_batch(
+                tokens=tokens,
+                from_block=batch_from_block,
+                to_block=min(batch_from_block + batch_size_blocks - 1, to_block),
+            )
+
+        logger.debug(
+            "%s Updated prices (tokens=%s, from_block=%s, to_block=%s, prices=%s, duration_seconds=%.3f).",
+            self.log_prefix,
+            tokens,
+            from_block,
+            to_block,
+            prices_count,
+            time.perf_counter() - started_at,
+        )
+        return prices_count
+
+    def _update_batch(self, tokens: typing.List[str], from_block: int, to_block: int) -> int:
+        pool_reserves = {}
+        for token in tokens:
+            for liquidity_pool in self.get_token_liquidity_pools(token=token):
+                if liquidity_pool not in pool_reserves:
+                    pool_reserves[liquidity_pool] = self._get_pool_reserves(
+                        liquidity_pool=liquidity_pool, from_block=from_block, to_block=to_block
+                    )
+
+        now = connection.ops.adapt_datetimefield_value(timezone.now())
+        rows = []
+        for token in tokens:
+            # Blocks of the first element of pool reserves precede the batch.
+            block_numbers = numpy.unique(
+                numpy.concatenate(
+                    [
+                        pool_reserves[liquidity_pool].block_numbers[1:]
+                        for liquidity_pool in self.get_token_liquidity_pools(token=token)
+                    ]
+                )
+            )
+            prices = self._get_prices(token=token, block_numbers=block_numbers, pool_reserves=pool_reserves)
+            is_priced = numpy.isfinite(prices)
+            rows.extend(
+                (self.chain.value, self.dex.value, token, block_number, price, now, now)
+                for block_number, price in zip(block_numbers[is_priced].tolist(), prices[is_priced].tolist())
+            )
+
+        with transaction.atomic():
+            models.LiquidityPoolTokenPrice.objects.filter(
+                chain=self.chain.value,
+                dex=self.dex.value,
+                token__in=tokens,
+                block_number__gte=from_block,
+                block_number__lte=to_block,
+            ).delete()
+            return db.bulk_insert(
+                table=models.LiquidityPoolTokenPrice._meta.db_table,
+                columns=("chain", "dex", "token", "block_number", "price", "created_at", "updated_at"),
+                rows=rows,
+            )
+
+    def _get_prices(
+        self,
+        token: str,
+        block_numbers: numpy.ndarray,
+        pool_reserves: typing.Dict[enums.LiquidityPool, PoolReserves],
+    ) -> numpy.ndarray:
+        """
+        Returns USD prices of the token at the blocks, NaN where none of its routed pools has a price.
+        """
+        if token in self._usd_tokens:
+            return numpy.ones(len(block_numbers))
+
+        weighted_prices = numpy.zeros(len(block_numbers))
+        weights = numpy.zeros(len(block_numbers))
+        for liquidity_pool in self._routes[token]:
+            reserves0, reserves1 = pool_reserves[liquidity_pool].get_reserves_at(block_numbers=block_numbers)
+            token_reserves, other_reserves = (
+                (reserves0, reserves1) if get_pool_tokens(liquidity_pool)[0] == token else (reserves1, reserves0)
+            )
+            other_prices = self._get_prices(
+                token=self._get_other_token(liquidity_pool, token),
+                block_numbers=block_numbers,
+                pool_reserves=pool_reserves,
+            )
+            with numpy.errstate(divide="ignore", invalid="ignore"):
+                liquidity = other_reserves * other_prices
+                prices = liquidity / token_reserves
+            is_priced = numpy.isfinite(prices) & (liquidity > 0)
+            weighted_prices[is_priced] += prices[is_priced] * liquidity[is_priced]
+            weights[is_priced] += liquidity[is_priced]
+
+        with numpy.errstate(divide="ignore", invalid="ignore"):
+            return numpy.where(weights > 0, weighted_prices / weights, numpy.nan)
+
+    def _get_pool_reserves(self, liquidity_pool: enums.LiquidityPool, from_block: int, to_block: int) -> PoolReserves:
+        pool_reserves = models.LiquidityPoolReserve.objects.filter(
+            chain=self.chain.value, dex=self.dex.value, liquidity_pool=liquidity_pool.value
+        )
+        previous_reserves = (
+            pool_reserves.filter(block_number__lt=from_block)
+            .order_by("-block_number", "-log_index")
+            .values_list("block_number", "reserve0", "reserve1")
+            .first()
+        )
+        rows = list(
+            pool_reserves.filter(block_number__gte=from_block, block_number__lte=to_block)
+            .order_by("block_number", "log_index")
+            .values_list("block_number", "reserve0", "reserve1")
+        )
+        rows.insert(0, previous_reserves or (-1, "nan", "nan"))
+
+        block_numbers, reserves0, reserves1 = zip(*rows)
+        block_numbers = numpy.array(block_numbers, dtype=numpy.int64)
+        # Only reserves after the last Sync event of a block are visible to later blocks.
+        is_last = numpy.append(block_numbers[1:] != block_numbers[:-1], True)
+        is_last[0] = True
+        token0, token1 = get_pool_tokens(liquidity_pool=liquidity_pool)
+
+        return PoolReserves(
+            block_numbers=block_numbers[is_last],
+            reserves0=numpy.array(reserves0, dtype=numpy.float64)[is_last] / 10.0 ** self._token_decimals[token0],
+            reserves1=numpy.array(reserves1, dtype=numpy.float64)[is_last] / 10.0 ** self._token_decimals[token1],
+        )
+
+    def _get_priced_tokens(self) -> typing.List[str]:
+        """
+        Orders routed tokens so that other tokens of routed pools come first, fails on unpriceable routes.
+        """
+        priced_tokens = []
+        pending_tokens = list(self._routes)
+        while pending_tokens:
+            resolved_tokens = [
+                token
+                for token in pending_tokens
+                if all(
+                    self._get_other_token(liquidity_pool, token) in self._usd_tokens
+                    or self._get_other_token(liquidity_pool, token) in priced_tokens
+                    for liquidity_pool in self._routes[token]
+                )
+            ]
+            if not resolved_tokens:
+                msg = "Routes of tokens {} do not lead to USD tokens {}".format(
+                    pending_tokens, sorted(self._usd_tokens)
+                )
+                logger.error("{} {}.".format(self.log_prefix, msg))
+                raise exceptions.LiquidityPoolPriceIndexException(msg)
+
+            priced_tokens.extend(resolved_tokens)
+            pending_tokens = [token for token in pending_tokens if token not in resolved_tokens]
+
+        for token in priced_tokens:
+            for liquidity_pool in self._routes[token]:
+                for pool_token in get_pool_tokens(liquidity_pool=liquidity_pool):
+                    if pool_token not in self._token_decimals:
+                        msg = "Decimals of token {} are not configured".format(pool_token)
+                        logger.error("{} {}.".format(self.log_prefix, msg))
+                        raise exceptions.LiquidityPoolPriceIndexException(msg)
+
+        return priced_tokens
+
+    def _get_other_token(self, liquidity_pool: enums.LiquidityPool, token: str) -> str:
+        token0, token1 = get_pool_tokens(liquidity_pool=liquidity_pool)
+        if token not in (token0, token1):
+            msg = "Token {} is not traded by routed pool {}".format(token, liquidity_pool.name)
+            logger.error("{} {}.".format(self.log_prefix, msg))
+            raise exceptions.LiquidityPoolPriceIndexException(msg)
+
+        return token1 if token == token0 else token0
@@ -0,0 +1,285 @@
+import heapq
+import logging
+import typing
+
+from django.conf import settings
+from django.db.models import Min, OuterRef, Q, Subquery
+
+from src import models
+from src.clients.dex import base as base_dex_provider
+from src.clients.dex import utils as dex_utils
+from src.services import lp_exporter as lp_exporter_services
+from src.services import lp_price_index as lp_price_index_services
+
+logger = logging.getLogger(__name__)
+
+EventCursor = typing.Tuple[int, int]
+
+
+def encode_cursor(cursor: EventCursor) -> str:
+    return "{}:{}".format(*cursor)
+
+
+def decode_cursor(cursor: str) -> EventCursor:
+    block_number, log_index = cursor.split(":")
+    return int(block_number), int(log_index)
+
+
+def get_transaction_data(transaction_hash: str) -> typing.Optional[typing.Dict]:
+    transaction = models.Transaction.objects.filter(transaction_hash=transaction_hash).first()
+    if not transaction:
+        return None
+
+    return {
+        "transaction_hash": transaction.transaction_hash,
+        "transaction_index": transaction.transaction_index,
+        "contract_address": transaction.contract_address,
+        "block_number": transaction.block_number,
+        "block_hash": transaction.block_hash,
+        "block_timestamp": transaction.block_timestamp,
+        "from_address": transaction.from_address,
+        "to_address": transaction.to_address,
+        "gas": transaction.gas,
+        "gas_price": transaction.gas_price,
+        "events": [
+            lp_exporter_services.LiquidityPoolExporter.get_event_data(event=event)
+            for event in models.TransactionEvent.objects.filter(transaction_id=transaction.id)
+            .select_related("transaction")
+            .order_by("log_index")
+        ],
+    }
+
+
+class LiquidityPoolQueryService(object):
+    """
+    Read queries of imported liquidity pool data served by the HTTP API.
+    """
+
+    API_CONFIG = settings.LP_API
+
+    def __init__(self, dex_provider_client: base_dex_provider.BaseDexLPProvider) -> None:
+        self._provider_client = dex_provider_client
+        self.log_prefix = "[{}-{}-{}-LIQUIDITY-POOL-QUERY-SERVICE]".format(
+            self._provider_client.chain.name,
+            self._provider_client.dex.name,
+            self._provider_client.liquidity_pool.name,
+        )
+
+    def get_imported_block_number(self) -> typing.Optional[int]:
+        """
+        Returns the block up to which pool data is fully imported, data of older blocks does not change anymore.
+        """
+        return (
+            models.LiquidityPoolImporterBlockReference.objects.filter(
+                chain=self._provider_client.chain.value,
+                dex=self._provider_client.dex.value,
+                liquidity_pool=self._provider_client.liquidity_pool.value,
+            )
+            .values_list("block_number", flat=True)
+            .first()
+        )
+
+    def get_events(
+        self,
+        from_block: typing.Optional[int],
+        to_block: typing.Optional[int],
+        cursor: typing.Optional[EventCursor],
+        limit: int,
+    ) -> typing.List[typing.Dict]:
+        """
+        Returns up to `limit` events of the block range ordered by (block_number, log_index) after `cursor`.
+        """
+        transaction_events = models.TransactionEvent.objects.for_pool(
+            contract_address=self._provider_client.lp_contract_address, from_block=from_block, to_block=to_block
+        )
+        if cursor:
+            block_number, log_index = cursor
+            transaction_events = transaction_events.filter(
+                Q(block_number__gt=block_number) | Q(block_number=block_number, log_index__gt=log_index)
+            )
+
+        return [
+            lp_exporter_services.LiquidityPoolExporter.get_event_data(event=event)
+            for event in transaction_events.select_related("transaction").order_by("block_number", "log_index")[:limit]
+        ]
+
+    def get_state(self) -> typing.Dict:
+        sync_event = (
+            models.TransactionEvent.objects.for_pool(contract_address=self._provider_client.lp_contract_address)
+            .filter(name="Sync")
+            .order_by("-block_number", "-log_index")
+            .values_list("block_number", "log_index", "data")
+            .first()
+        )
+        state = {
+            "chain": self._provider_client.chain.name,
+            "dex": self._provider_client.dex.name,
+            "liquidity_pool": self._provider_client.liquidity_pool.name,
+            "contract_address": self._provider_client.lp_contract_address,
+            "imported_block_number": self.get_imported_block_number(),
+            "block_number": None,
+            "log_index": None,
+            "reserve0": None,
+            "reserve1": None,
+            "price": None,
+        }
+        if sync_event:
+            block_number, log_index, data = sync_event
+            reserve0, reserve1 = dex_utils.decode_event_data_words(data=data)
+            state.update(
+                block_number=block_number,
+                log_index=log_index,
+                # Reserves exceed the JSON safe integer range.
+                reserve0=str(reserve0),
+                reserve1=str(reserve1),
+                price=reserve1 / reserve0 if reserve0 else None,
+            )
+
+        return state
+
+    def get_position(self, address: str, block_number: typing.Optional[int] = None) -> typing.Dict:
+        """
+        Returns the LP token balance and pool share of the address at the block, the latest by default.
+        """
+        position_history = models.LiquidityPoolPositionHistory.objects.filter(
+            chain=self._provider_client.chain.value,
+            dex=self._provider_client.dex.value,
+            liquidity_pool=self._provider_client.liquidity_pool.value,
+            address=address,
+        )
+        if block_number is not None:
+            position_history = position_history.filter(block_number__lte=block_number)
+        position = position_history.order_by("-block_number").values_list("block_number", "balance").first()
+        total_supply = self._get_total_supply(block_number=block_number)
+        balance = int(position[1]) if position else 0
+
+        return {
+            "address": address,
+            "block_number": block_number,
+            "changed_block_number": position[0] if position else None,
+            # Balances exceed the JSON safe integer range.
+            "balance": str(balance),
+            "total_supply": str(total_supply),
+            "share": balance / total_supply if total_supply else None,
+        }
+
+    def get_top_positions(self, limit: int, block_number: typing.Optional[int] = None) -> typing.List[typing.Dict]:
+        """
+        Returns up to `limit` positions of the pool with the largest balances at the block, the current ones by default.
+        """
+        total_supply = self._get_total_supply(block_number=block_number)
+        if block_number is None:
+            positions = (
+                models.LiquidityPoolPosition.objects.filter(
+                    chain=self._provider_client.chain.value,
+                    dex=self._provider_client.dex.value,
+                    liquidity_pool=self._provider_client.liquidity_pool.value,
+                    balance_value__gt=0,
+                )
+                .order_by("-balance_value")
+                .values_list("address", "balance", "block_number")[:limit]
+            )
+        else:
+            positions = self._get_top_positions_at(limit=limit, block_number=block_number)
+
+        return [
+            {
+                "address": address,
+                "changed_block_number": changed_block_number,
+                "balance": balance,
+                "share": int(balance) / total_supply if total_supply else None,
+            }
+            for address, balance, changed_block_number in positions
+        ]
+
+    def _get_top_positions_at(self, limit: int, block_number: int) -> typing.List[typing.Tuple[str, str, int]]:
+        """
+        Returns the largest last balances of addresses up to the block, historical balances are not indexed by size,
+        so the last balance of every address is read and the largest ones are selected in memory.
+        """
+        position_history = models.LiquidityPoolPositionHistory.objects.filter(
+            chain=self._provider_client.chain.value,
+            dex=self._provider_client.dex.value,
+            liquidity_pool=self._provider_client.liquidity_pool.value,
+            block_number__lte=block_number,
+        )
+        last_positions = (
+            position_history.filter(
+                block_number=Subquery(
+                    position_history.filter(address=OuterRef("address"))
+                    .order_by("-block_number")
+                    .values("block_number")[:1]
+                )
+            )
+            .exclude(balance="0")
+            .values_list("address", "balance", "block_number")
+        )
+
+        return heapq.nlargest(limit, last_positions.iterator(), key=lambda position: int(position[1]))
+
+    def _get_total_supply(self, block_number: typing.Optional[int] = None) -> int:
+        total_supplies = models.LiquidityPoolTotalSupply.objects.filter(
+            chain=self._provider_client.chain.value,
+            dex=self._provider_client.dex.value,
+            liquidity_pool=self._provider_client.liquidity_pool.value,
+        )
+        if block_number is not None:
+            total_supplies = total_supplies.filter(block_number__lte=block_number)
+        total_supply = total_supplies.order_by("-block_number").values_list("total_supply", flat=True).first()
+
+        return int(total_supply) if total_supply else 0
+
+
+class TokenPriceQueryService(object):
+    """
+    Read queries of the USD price index of a token served by the HTTP API.
+    """
+
+    def __init__(self, price_indexer: lp_price_index_services.TokenPriceIndexer, token: str) -> None:
+        self._price_indexer = price_indexer
+        self._token = token
+        self.log_prefix = "[{}-{}-{}-TOKEN-PRICE-QUERY-SERVICE]".format(
+            self._price_indexer.chain.name, self._price_indexer.dex.name, self._token
+        )
+
+    def get_imported_block_number(self) -> typing.Optional[int]:
+        """
+        Returns the block up to which all pools the token price depends on are fully imported.
+        """
+        liquidity_pools = self._price_indexer.get_token_liquidity_pools(token=self._token)
+        block_references = models.LiquidityPoolImporterBlockReference.objects.filter(
+            chain=self._price_indexer.chain.value,
+            dex=self._price_indexer.dex.value,
+            liquidity_pool__in=[liquidity_pool.value for liquidity_pool in liquidity_pools],
+        )
+        if block_references.count() < len(liquidity_pools):
+            return None
+
+        return block_references.aggregate(block_number=Min("block_number"))["block_number"]
+
+    def get_prices(
+        self,
+        from_block: typing.Optional[int],
+        to_block: typing.Optional[int],
+        cursor: typing.Optional[int],
+        limit: int,
+    ) -> typing.List[typing.Dict]:
+        """
+        Returns up to `limit` prices of the block range ordered by block number after the `cursor` block.
+        """
+        token_prices = models.LiquidityPoolTokenPrice.objects.filter(
+            chain=self._price_indexer.chain.value, dex=self._price_indexer.dex.value, token=self._token
+        )
+        if from_block is not None:
+            token_prices = token_prices.filter(block_number__gte=from_block)
+        if to_block is not None:
+            token_prices = token_prices.filter(block_number__lte=to_block)
+        if cursor is not None:
+            token_prices = token_prices.filter(block_number__gt=cursor)
+
+        return [
+            {"block_number": block_number, "price": price}
+            for block_number, price in token_prices.order_by("block_number").values_list("block_number", "price")[
+                :limit
+            ]
+        ]
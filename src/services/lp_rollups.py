@@ -0,0 +1,205 @@
+import logging
+import typing
+
+from django.db import models as django_db_models
+from django.db import transaction
+
+from src import constants, enums, models
+from src.clients.dex import base as base_dex_provider
+from src.clients.dex import utils as dex_utils
+
+logger = logging.getLogger(__name__)
+
+
+class LiquidityPoolRollupBuilder(object):
+    def __init__(self, dex_provider_client: base_dex_provider.BaseDexLPProvider) -> None:
+        self._provider_client = dex_provider_client
+        self.log_prefix = "[{}-{}-{}-LIQUIDITY-POOL-ROLLUP-BUILDER]".format(
+            self._provider_client.chain.name,
+            self._provider_client.dex.name,
+            self._provider_client.liquidity_pool.name,
+        )
+
+    def update_rollups(
+        self,
+        from_block: int,
+        to_block: int,
+        granularities: typing.Optional[typing.Iterable[enums.RollupGranularity]] = None,
+    ) -> None:
+        granularities = list(granularities or enums.RollupGranularity)
+        if any(granularity in constants.TIME_ROLLUP_GRANULARITY_SECONDS_MAP for granularity in granularities):
+            self._set_missing_block_timestamps(from_block=from_block, to_block=to_block)
+
+        for granularity in granularities:
+            if granularity in constants.BLOCK_ROLLUP_GRANULARITY_SIZE_MAP:
+                self._rebuild_block_rollups(granularity=granularity, from_block=from_block, to_block=to_block)
+            else:
+                self._rebuild_time_rollups(granularity=granularity, from_block=from_block, to_block=to_block)
+
+    def _rebuild_block_rollups(self, granularity: enums.RollupGranularity, from_block: int, to_block: int) -> None:
+        bucket_size = constants.BLOCK_ROLLUP_GRANULARITY_SIZE_MAP[granularity]
+        bucket_from = from_block - from_block % bucket_size
+        bucket_to = to_block - to_block % bucket_size
+
+        events = self._get_pool_events(from_block=bucket_from, to_block=bucket_to + bucket_size - 1)
+        self._persist_rollups(
+            granularity=granularity,
+            bucket_from=bucket_from,
+            bucket_to=bucket_to,
+            events=events,
+            get_bucket_start=lambda event: event[2] - event[2] % bucket_size,
+        )
+
+    def _rebuild_time_rollups(self, granularity: enums.RollupGranularity, from_block: int, to_block: int) -> None:
+        bucket_seconds = constants.TIME_ROLLUP_GRANULARITY_SECONDS_MAP[granularity]
+        block_timestamps = (
+            self._get_pool_events(from_block=from_block, to_block=to_block)
+            .order_by()
+            .aggregate(
+                min_timestamp=django_db_models.Min("transaction__block_timestamp"),
+                max_timestamp=django_db_models.Max("transaction__block_timestamp"),
+            )
+        )
+        if block_timestamps["min_timestamp"] is None:
+            return
+
+        min_timestamp = block_timestamps["min_timestamp"]
+        max_timestamp = block_timestamps["max_timestamp"]
+        bucket_from = min_timestamp - min_timestamp % bucket_seconds
+        bucket_to = max_timestamp - max_timestamp % bucket_seconds
+
+        events = self._get_pool_events().filter(
+            transaction__block_timestamp__gte=bucket_from,
+            transaction__block_timestamp__lt=bucket_to + bucket_seconds,
+        )
+        self._persist_rollups(
+            granularity=granularity,
+            bucket_from=bucket_from,
+            bucket_to=bucket_to,
+            events=events,
+            get_bucket_start=lambda event: event[3] - event[3] % bucket_seconds,
+        )
+
+    def _persist_rollups(
+        self,
+        granularity: enums.RollupGranularity,
+        bucket_from: int,
+        bucket_to: int,
+        events: typing.Iterable[typing.Tuple],
+        get_bucket_start: typing.Callable[[typing.Tuple], int],
+    ) -> None:
+        rollups = {}
+        for event in events:
+            bucket_start = get_bucket_start(event)
+            if bucket_start not in rollups:
+                rollups[bucket_start] = {
+                    "first_block_number": event[2],
+                    "volume_token0": 0,
+                    "volume_token1": 0,
+                    "open_price": None,
+                    "high_price": None,
+                    "low_price": None,
+                    "close_price": None,
+                    **{count_field: 0 for count_field in constants.ROLLUP_EVENT_COUNT_FIELD_MAP.values()},
+                }
+            self._apply_event(rollup=rollups[bucket_start], event=event)
+
+        with transaction.atomic():
+            models.LiquidityPoolRollup.objects.filter(
+                chain=self._provider_client.chain.value,
+                dex=self._provider_client.dex.value,
+                liquidity_pool=self._provider_client.liquidity_pool.value,
+                granularity=granularity.value,
+                bucket_start__gte=bucket_from,
+                bucket_start__lte=bucket_to,
+            ).delete()
+            models.LiquidityPoolRollup.objects.bulk_create(
+                [
+                    models.LiquidityPoolRollup(
+                        chain=self._provider_client.chain.value,
+                        dex=self._provider_client.dex.value,
+                        liquidity_pool=self._provider_client.liquidity_pool.value,
+                        granularity=granularity.value,
+                        bucket_start=bucket_start,
+                        **{
+                            **rollup,
+                            "volume_token0": str(rollup["volume_token0"]),
+                            "volume_token1": str(rollup["volume_token1"]),
+                        },
+                    )
+                    for bucket_start, rollup in rollups.items()
+                ]
+            )
+
+        logger.debug(
+            "%s Rebuilt %s %s rollups (bucket_from=%s, bucket_to=%s).",
+            self.log_prefix,
+            len(rollups),
+            granularity.name,
+            bucket_from,
+            bucket_to,
+        )
+
+    @staticmethod
+    def _apply_event(rollup: typing.Dict, event: typing.Tuple) -> None:
+        name, data, block_number = event[0], event[1], event[2]
+        rollup["last_block_number"] = block_number
+
+        count_field = constants.ROLLUP_EVENT_COUNT_FIELD_MAP.get(name)
+        if count_field:
+            rollup[count_field] += 1
+
+        if name == "Swap":
+            amount0_in, amount1_in, amount0_out, amount1_out = dex_utils.decode_event_data_words(data=data)
+            rollup["volume_token0"] += amount0_in + amount0_out
+            rollup["volume_token1"] += amount1_in + amount1_out
+        elif name == "Sync":
+            reserve0, reserve1 = dex_utils.decode_event_data_words(data=data)
+            if not reserve0:
+                return
+
+            price = reserve1 / reserve0
+            if rollup["open_price"] is None:
+                rollup["open_price"] = rollup["high_price"] = rollup["low_price"] = price
+            rollup["high_price"] = max(rollup["high_price"], price)
+            rollup["low_price"] = min(rollup["low_price"], price)
+            rollup["close_price"] = price
+
+    def _set_missing_block_timestamps(self, from_block: int, to_block: int) -> None:
+        # Transactions are shared by pools of multi-hop swaps and keep the contract address of the pool which stored
+        # them first, so transactions of the pool are selected by its events.
+        block_transaction_ids = {}
+        for block_number, transaction_id in (
+            self._get_pool_events(from_block=from_block, to_block=to_block)
+            .filter(transaction__block_timestamp__isnull=True)
+            .order_by()
+            .values_list("block_number", "transaction_id")
+            .distinct()
+        ):
+            block_transaction_ids.setdefault(block_number, []).append(transaction_id)
+
+        block_timestamps = self._provider_client.get_block_timestamps(block_numbers=list(block_transaction_ids))
+        for block_number, block_timestamp in block_timestamps.items():
+            models.Transaction.objects.filter(id__in=block_transaction_ids[block_number]).update(
+                block_timestamp=block_timestamp
+            )
+
+    def _get_pool_events(
+        self, from_block: typing.Optional[int] = None, to_block: typing.Optional[int] = None
+    ) -> django_db_models.QuerySet:
+        return (
+            models.TransactionEvent.objects.for_pool(
+                contract_address=self._provider_client.lp_contract_address, from_block=from_block, to_block=to_block
+            )
+            .order_by(
+                "block_number",
+                "transaction__transaction_index",
+                "log_index",
+            )
+            .values_list(
+                "name",
+                "data",
+                "block_number",
+                "transaction__block_timestamp",
+            )
+        )
@@ -0,0 +1,566 @@
+import itertools
+import json
+import logging
+import os
+import typing
+import zipfile
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.color import no_style
+from django.db import connection
+from django.db import models as django_db_models
+from django.db import transaction
+from django.db.models import Max, Min
+from django.utils import timezone
+
+from src import db, enums, exceptions, models
+from src.clients.dex import base as base_dex_provider
+from src.services import lp_cache as lp_cache_services
+from src.services import lp_derivation as lp_derivation_services
+from src.services import lp_partitioning as lp_partitioning_services
+from src.services import lp_positions as lp_positions_services
+from src.services import lp_price_index as lp_price_index_services
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+
+_MANIFEST_NAME = "manifest.json"
+_CHUNK_SIZE = 50_000
+_TRANSACTION_HASHES_CHUNK_SIZE = 500
+
+
+@dataclass(frozen=True)
+class SnapshotTable:
+    model: typing.Type[django_db_models.Model]
+    # Exported columns, pool columns (chain, dex, liquidity pool) and timestamps are set on import.
+    columns: typing.Tuple[str, ...]
+
+
+# Tables of a liquidity pool in import order, the block reference is loaded last as the checkpoint of the import.
+SNAPSHOT_TABLES = {
+    "transactions": SnapshotTable(
+        model=models.Transaction,
+        columns=(
+            "id",
+            "transaction_hash",
+            "transaction_index",
+            "contract_address",
+            "block_number",
+            "block_hash",
+            "from_address",
+            "to_address",
+            "gas",
+            "gas_price",
+            "block_timestamp",
+        ),
+    ),
+    "events": SnapshotTable(
+        model=models.TransactionEvent,
+        columns=("transaction_id", "name", "topics", "data", "log_index", "contract_address", "block_number"),
+    ),
+    "rollups": SnapshotTable(
+        model=models.LiquidityPoolRollup,
+        columns=(
+            "granularity",
+            "bucket_start",
+            "first_block_number",
+            "last_block_number",
+            "open_price",
+            "high_price",
+            "low_price",
+            "close_price",
+            "volume_token0",
+            "volume_token1",
+            "swap_count",
+            "sync_count",
+            "mint_count",
+            "burn_count",
+            "transfer_count",
+            "approval_count",
+        ),
+    ),
+    "block_ranges": SnapshotTable(
+        model=models.LiquidityPoolBlockRange,
+        columns=("from_block_number", "to_block_number"),
+    ),
+    "block_references": SnapshotTable(
+        model=models.LiquidityPoolImporterBlockReference,
+        columns=("block_number", "block_hash", "start_block_number", "event_names"),
+    ),
+}
+
+
+def _dumps(data: typing.Any) -> bytes:
+    if orjson:
+        return orjson.dumps(data)
+
+    return json.dumps(data, separators=(",", ":")).encode("utf-8")
+
+
+def _loads(data: bytes) -> typing.Any:
+    if orjson:
+        return orjson.loads(data)
+
+    return json.loads(data)
+
+
+class LiquidityPoolSnapshotWriter(object):
+    """
+    Writes a snapshot file, a zip archive of compressed column chunks of liquidity pool tables.
+
+    Every chunk of at most `_CHUNK_SIZE` rows is stored as one JSON array per column in
+    `<POOL>/<table>/<chunk>/<column>` entries, compressed by zstd (zlib if `zstandard` is not installed).
+    `manifest.json` describes pools, tables and chunks. The file is written under a temporary name and
+    renamed on `close`, so an interrupted export leaves no snapshot behind.
+    """
+
+    def __init__(
+        self,
+        path: typing.Union[str, Path],
+        chain: enums.Chain,
+        dex: enums.Dex,
+        compression_level: int = 3,
+        overwrite_file: bool = False,
+    ) -> None:
+        self.path = Path(path)
+        self.log_prefix = "[LIQUIDITY-POOL-SNAPSHOT-WRITER]"
+        if not self.path.parent.exists():
+            msg = "Directory for snapshot file does not exist (path={})".format(self.path)
+            logger.error("{} {}.".format(self.log_prefix, msg))
+            raise exceptions.LiquidityPoolSnapshotException(msg)
+
+        if self.path.exists() and not overwrite_file:
+            msg = "Snapshot file already exists, use --overwrite to override it (path={})".format(self.path)
+            logger.error("{} {}.".format(self.log_prefix, msg))
+            raise exceptions.LiquidityPoolSnapshotException(msg)
+
+        self._compression_level = compression_level
+        self._compressor = zstandard.ZstdCompressor(level=compression_level) if zstandard else None
+        self._temporary_path = self.path.with_name("{}.tmp".format(self.path.name))
+        self._archive = zipfile.ZipFile(self._temporary_path, "w", compression=zipfile.ZIP_STORED, allowZip64=True)
+        self._manifest = {
+            "version": SNAPSHOT_VERSION,
+            "created_at": timezone.now().isoformat(),
+            "chain": chain.name,
+            "dex": dex.name,
+            "compression": "zstd" if zstandard else "zlib",
+            "tables": {table: list(snapshot_table.columns) for table, snapshot_table in SNAPSHOT_TABLES.items()},
+            "liquidity_pools": {},
+        }
+
+    def __enter__(self) -> "LiquidityPoolSnapshotWriter":
+        return self
+
+    def __exit__(self, exc_type: typing.Any, exc_value: typing.Any, traceback: typing.Any) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self._archive.close()
+            self._temporary_path.unlink(missing_ok=True)
+
+    def add_liquidity_pool(self, liquidity_pool: enums.LiquidityPool, metadata: typing.Dict) -> None:
+        self._manifest["liquidity_pools"].setdefault(liquidity_pool.name, {"tables": {}}).update(metadata)
+
+    def write_table(
+        self, liquidity_pool: enums.LiquidityPool, table: str, rows: typing.Iterable[typing.Sequence]
+    ) -> int:
+        """
+        Writes rows of the table columns in chunks and returns the number of written rows.
+        """
+        rows = iter(rows)
+        rows_count = 0
+        chunks_count = 0
+        while True:
+            chunk = list(itertools.islice(rows, _CHUNK_SIZE))
+            if not chunk:
+                break
+
+            for column, values in zip(SNAPSHOT_TABLES[table].columns, zip(*chunk)):
+                self._archive.writestr(
+                    "{}/{}/{:06d}/{}".format(liquidity_pool.name, table, chunks_count, column),
+                    self._compress(data=_dumps(values)),
+                )
+            rows_count += len(chunk)
+            chunks_count += 1
+
+        self._manifest["liquidity_pools"].setdefault(liquidity_pool.name, {"tables": {}})["tables"][table] = {
+            "row_count": rows_count,
+            "chunk_count": chunks_count,
+        }
+
+        return rows_count
+
+    def close(self) -> None:
+        self._archive.writestr(_MANIFEST_NAME, json.dumps(self._manifest, indent=2))
+        self._archive.close()
+        os.replace(self._temporary_path, self.path)
+        logger.info(
+            "{} Saved snapshot file '{}' (liquidity_pools={}, size_bytes={}).".format(
+                self.log_prefix, self.path, list(self._manifest["liquidity_pools"]), self.path.stat().st_size
+            )
+        )
+
+    def _compress(self, data: bytes) -> bytes:
+        if self._compressor:
+            return self._compressor.compress(data)
+
+        return zlib.compress(data, self._compression_level)
+
+
+class LiquidityPoolSnapshotReader(object):
+    """
+    Reads snapshot files written by `LiquidityPoolSnapshotWriter`.
+    """
+
+    def __init__(self, path: typing.Union[str, Path]) -> None:
+        self.path = Path(path)
+        self.log_prefix = "[LIQUIDITY-POOL-SNAPSHOT-READER]"
+        if not self.path.exists():
+            msg = "Snapshot file does not exist (path={})".format(self.path)
+            logger.error("{} {}.".format(self.log_prefix, msg))
+            raise exceptions.LiquidityPoolSnapshotException(msg)
+
+        self._archive = zipfile.ZipFile(self.path, "r")
+        self.manifest = json.loads(self._archive.read(_MANIFEST_NAME))
+        if self.manifest["version"] != SNAPSHOT_VERSION:
+            msg = "Unsupported snapshot version (path={}, version={})".format(self.path, self.manifest["version"])
+            logger.error("{} {}.".format(self.log_prefix, msg))
+            raise exceptions.LiquidityPoolSnapshotException(msg)
+
+        if self.manifest["compression"] == "zstd" and not zstandard:
+            msg = "Snapshot is compressed by zstd, install `zstandard` package (path={})".format(self.path)
+            logger.error("{} {}.".format(self.log_prefix, msg))
+            raise exceptions.LiquidityPoolSnapshotException(msg)
+
+        self._decompressor = zstandard.ZstdDecompressor() if self.manifest["compression"] == "zstd" else None
+
+    def __enter__(self) -> "LiquidityPoolSnapshotReader":
+        return self
+
+    def __exit__(self, exc_type: typing.Any, exc_value: typing.Any, traceback: typing.Any) -> None:
+        self._archive.close()
+
+    @property
+    def chain(self) -> enums.Chain:
+        return enums.Chain[self.manifest["chain"]]
+
+    @property
+    def dex(self) -> enums.Dex:
+        return enums.Dex[self.manifest["dex"]]
+
+    @property
+    def liquidity_pools(self) -> typing.List[enums.LiquidityPool]:
+        return [enums.LiquidityPool[liquidity_pool] for liquidity_pool in self.manifest["liquidity_pools"]]
+
+    def get_liquidity_pool_metadata(self, liquidity_pool: enums.LiquidityPool) -> typing.Dict:
+        if liquidity_pool.name not in self.manifest["liquidity_pools"]:
+            msg = "Liquidity pool is not in the snapshot (path={}, liquidity_pool={})".format(
+                self.path, liquidity_pool.name
+            )
+            logger.error("{} {}.".format(self.log_prefix, msg))
+            raise exceptions.LiquidityPoolSnapshotException(msg)
+
+        return self.manifest["liquidity_pools"][liquidity_pool.name]
+
+    def read_table(self, liquidity_pool: enums.LiquidityPool, table: str) -> typing.Iterator[typing.List[typing.Tuple]]:
+        """
+        Yields rows of the table columns chunk by chunk.
+        """
+        columns = self.manifest["tables"][table]
+        table_metadata = self.get_liquidity_pool_metadata(liquidity_pool=liquidity_pool)["tables"][table]
+        for chunk_index in range(table_metadata["chunk_count"]):
+            yield list(
+                zip(
+                    *[
+                        _loads(
+                            self._decompress(
+                                data=self._archive.read(
+                                    "{}/{}/{:06d}/{}".format(liquidity_pool.name, table, chunk_index, column)
+                                )
+                            )
+                        )
+                        for column in columns
+                    ]
+                )
+            )
+
+    def _decompress(self, data: bytes) -> bytes:
+        if self._decompressor:
+            return self._decompressor.decompress(data)
+
+        return zlib.decompress(data)
+
+
+class LiquidityPoolSnapshotter(object):
+    """
+    Exports committed data of a liquidity pool to a snapshot and bulk loads it into a database without the pool,
+    so a new deployment continues by incremental import from the snapshot block reference.
+    """
+
+    def __init__(self, dex_provider_client: base_dex_provider.BaseDexLPProvider) -> None:
+        self._provider_client = dex_provider_client
+        self._partitioner = lp_partitioning_services.LiquidityPoolPartitioner(dex_provider_client=dex_provider_client)
+        self._cache = lp_cache_services.LiquidityPoolImporterCache(dex_provider_client=dex_provider_client)
+        self._position_ledger = lp_positions_services.LiquidityPoolPositionLedger(
+            dex_provider_client=dex_provider_client
+        )
+        self._derivations = lp_derivation_services.get_incremental_derivations(dex_provider_client=dex_provider_client)
+        self._price_indexer = lp_price_index_services.get_price_indexer(
+            chain=dex_provider_client.chain, dex=dex_provider_client.dex
+        )
+        self.log_prefix = "[{}-{}-{}-LIQUIDITY-POOL-SNAPSHOTTER]".format(
+            self._provider_client.chain.name,
+            self._provider_client.dex.name,
+            self._provider_client.liquidity_pool.name,
+        )
+
+    def export_snapshot(self, writer: LiquidityPoolSnapshotWriter) -> typing.Dict[str, int]:
+        """
+        Writes pool data up to the block reference and returns row counts of tables. Rows of blocks after the
+        block reference (ex. of a running import) are skipped, the new deployment imports them again.
+        """
+        block_reference = self._get_block_reference()
+        if not block_reference:
+            msg = "No block reference found, nothing is imported yet"
+            logger.error("{} {}.".format(self.log_prefix, msg))
+            raise exceptions.LiquidityPoolSnapshotException(msg)
+
+        block_number = block_reference.block_number
+        events = models.TransactionEvent.objects.for_pool(
+            contract_address=self._provider_client.lp_contract_address, to_block=block_number
+        )
+        event_blocks = events.aggregate(from_block=Min("block_number"), to_block=Max("block_number"))
+        writer.add_liquidity_pool(
+            liquidity_pool=self._provider_client.liquidity_pool,
+            metadata={
+                "contract_address": self._provider_client.lp_contract_address,
+                "block_number": block_number,
+                "from_block": event_blocks["from_block"],
+                "to_block": event_blocks["to_block"],
+            },
+        )
+
+        rows_counts = {
+            # Events may reference transactions stored by another pool of the same transaction.
+            "transactions": writer.write_table(
+                liquidity_pool=self._provider_client.liquidity_pool,
+                table="transactions",
+                rows=self._iterate_rows(
+                    queryset=models.Transaction.objects.filter(id__in=events.values("transaction_id")).order_by("id"),
+                    table="transactions",
+                ),
+            ),
+            "events": writer.write_table(
+                liquidity_pool=self._provider_client.liquidity_pool,
+                table="events",
+                rows=self._iterate_rows(queryset=events.order_by("block_number", "log_index"), table="events"),
+            ),
+            "rollups": writer.write_table(
+                liquidity_pool=self._provider_client.liquidity_pool,
+                table="rollups",
+                rows=self._iterate_rows(
+                    queryset=self._get_pool_rows(model=models.LiquidityPoolRollup)
+                    .filter(first_block_number__lte=block_number)
+                    .order_by("granularity", "bucket_start"),
+                    table="rollups",
+                ),
+            ),
+            "block_ranges": writer.write_table(
+                liquidity_pool=self._provider_client.liquidity_pool,
+                table="block_ranges",
+                rows=[
+                    (from_block_number, min(to_block_number, block_number))
+                    for from_block_number, to_block_number in self._iterate_rows(
+                        queryset=self._get_pool_rows(model=models.LiquidityPoolBlockRange)
+                        .filter(from_block_number__lte=block_number)
+                        .order_by("from_block_number"),
+                        table="block_ranges",
+                    )
+                ],
+            ),
+            "block_references": writer.write_table(
+                liquidity_pool=self._provider_client.liquidity_pool,
+                table="block_references",
+                rows=[
+                    tuple(getattr(block_reference, column) for column in SNAPSHOT_TABLES["block_references"].columns)
+                ],
+            ),
+        }
+
+        logger.info(
+            "{} Exported snapshot (block_number={}, rows={}).".format(self.log_prefix, block_number, rows_counts)
+        )
+        return rows_counts
+
+    def import_snapshot(self, reader: LiquidityPoolSnapshotReader) -> typing.Dict[str, int]:
+        """
+        Bulk loads pool data of the snapshot in one database transaction and returns row counts of tables.
+        Transaction ids are shifted after ids of the database, transactions already stored by other pools are reused.
+        The importer of the database should be stopped, as explicit transaction ids are not taken from its sequence.
+        """
+        metadata = reader.get_liquidity_pool_metadata(liquidity_pool=self._provider_client.liquidity_pool)
+        if metadata["contract_address"] != self._provider_client.lp_contract_address:
+            msg = "Snapshot contract address does not match the configured one (snapshot_contract_address={}, contract_address={})".format(
+                metadata["contract_address"], self._provider_client.lp_contract_address
+            )
+            logger.error("{} {}.".format(self.log_prefix, msg))
+            raise exceptions.LiquidityPoolSnapshotException(msg)
+
+        if (
+            self._get_block_reference()
+            or models.TransactionEvent.objects.for_pool(
+                contract_address=self._provider_client.lp_contract_address
+            ).exists()
+        ):
+            msg = "Liquidity pool data is already imported, snapshot is only imported into a database without the pool"
+            logger.error("{} {}.".format(self.log_prefix, msg))
+            raise exceptions.LiquidityPoolSnapshotException(msg)
+
+        if metadata["from_block"] is not None:
+            self._partitioner.ensure_partitions(from_block=metadata["from_block"], to_block=metadata["to_block"])
+
+        now = connection.ops.adapt_datetimefield_value(timezone.now())
+        pool_values = {
+            "chain": self._provider_client.chain.value,
+            "chain_name": self._provider_client.chain.name,
+            "dex": self._provider_client.dex.value,
+            "dex_name": self._provider_client.dex.name,
+            "liquidity_pool": self._provider_client.liquidity_pool.value,
+            "liquidity_pool_name": self._provider_client.liquidity_pool.name,
+        }
+        rows_counts = {}
+        with transaction.atomic():
+            transaction_id_offset = models.Transaction.objects.aggregate(max_id=Max("id"))["max_id"] or 0
+            stored_transaction_ids = {}
+            rows_counts["transactions"] = 0
+            for rows in reader.read_table(liquidity_pool=self._provider_client.liquidity_pool, table="transactions"):
+                # Ids cached for the hashes by an earlier import of the database are replaced by the loaded ones.
+                self._cache.delete_transaction_ids(transaction_hashes=[row[1] for row in rows])
+                rows_counts["transactions"] += self._load_transactions(
+                    rows=rows,
+                    transaction_id_offset=transaction_id_offset,
+                    stored_transaction_ids=stored_transaction_ids,
+                    now=now,
+                )
+
+            rows_counts["events"] = 0
+            for rows in reader.read_table(liquidity_pool=self._provider_client.liquidity_pool, table="events"):
+                rows_counts["events"] += db.bulk_insert(
+                    table=models.TransactionEvent._meta.db_table,
+                    columns=SNAPSHOT_TABLES["events"].columns + ("created_at", "updated_at"),
+                    rows=(
+                        (
+                            stored_transaction_ids.get(row[0], row[0] + transaction_id_offset),
+                            *row[1:],
+                            now,
+                            now,
+                        )
+                        for row in rows
+                    ),
+                )
+
+            for table in ["rollups", "block_ranges", "block_references"]:
+                snapshot_table = SNAPSHOT_TABLES[table]
+                pool_columns = tuple(
+                    field.column for field in snapshot_table.model._meta.fields if field.column in pool_values
+                )
+                rows_counts[table] = 0
+                for rows in reader.read_table(liquidity_pool=self._provider_client.liquidity_pool, table=table):
+                    rows_counts[table] += db.bulk_insert(
+                        table=snapshot_table.model._meta.db_table,
+                        columns=pool_columns + snapshot_table.columns + ("created_at", "updated_at"),
+                        rows=((*[pool_values[column] for column in pool_columns], *row, now, now) for row in rows),
+                    )
+
+            with connection.cursor() as cursor:
+                for statement in connection.ops.sequence_reset_sql(no_style(), [models.Transaction]):
+                    cursor.execute(statement)
+
+            # The position ledger is not part of snapshots, it is replayed from the loaded transfers.
+            self._position_ledger.update_positions(from_block=0)
+            # Neither are tables importers derive incrementally, they are derived from the loaded events the same way.
+            if metadata["from_block"] is not None:
+                self._update_derived_tables(from_block=metadata["from_block"], to_block=metadata["block_number"])
+
+        # The import continues from the loaded block reference, not from a block cached for the pool before.
+        self._cache.delete_block_number()
+
+        logger.info(
+            "{} Imported snapshot (block_number={}, rows={}).".format(
+                self.log_prefix, metadata["block_number"], rows_counts
+            )
+        )
+        return rows_counts
+
+    def _update_derived_tables(self, from_block: int, to_block: int) -> None:
+        for derivation in self._derivations:
+            for chunk_from_block, chunk_to_block in derivation.get_chunks(
+                from_block=from_block, to_block=to_block, chunk_size_blocks=settings.LP_DERIVATION["chunk_size_blocks"]
+            ):
+                derivation.derive(from_block=chunk_from_block, to_block=chunk_to_block)
+        # Prices are derived from the reserves derived table updated above.
+        if self._price_indexer:
+            self._price_indexer.update_prices(
+                from_block=from_block, to_block=to_block, liquidity_pools=[self._provider_client.liquidity_pool]
+            )
+
+    def _load_transactions(
+        self,
+        rows: typing.List[typing.Tuple],
+        transaction_id_offset: int,
+        stored_transaction_ids: typing.Dict[int, int],
+        now: typing.Any,
+    ) -> int:
+        """
+        Inserts transactions not stored yet with shifted ids, ids of stored ones are added to `stored_transaction_ids`.
+        """
+        snapshot_ids = {row[1]: row[0] for row in rows}
+        transaction_hashes = list(snapshot_ids)
+        for index in range(0, len(transaction_hashes), _TRANSACTION_HASHES_CHUNK_SIZE):
+            for transaction_hash, transaction_id in models.Transaction.objects.filter(
+                transaction_hash__in=transaction_hashes[index : index + _TRANSACTION_HASHES_CHUNK_SIZE]
+            ).values_list("transaction_hash", "id"):
+                stored_transaction_ids[snapshot_ids[transaction_hash]] = transaction_id
+
+        rows = [row for row in rows if row[0] not in stored_transaction_ids]
+        contract_block_ranges = {}
+        for row in rows:
+            from_block, to_block = contract_block_ranges.get(row[3], (row[4], row[4]))
+            contract_block_ranges[row[3]] = (min(from_block, row[4]), max(to_block, row[4]))
+        for contract_address, (from_block, to_block) in contract_block_ranges.items():
+            self._partitioner.ensure_partitions(
+                from_block=from_block, to_block=to_block, contract_address=contract_address
+            )
+
+        return db.bulk_insert(
+            table=models.Transaction._meta.db_table,
+            columns=SNAPSHOT_TABLES["transactions"].columns + ("created_at", "updated_at"),
+            rows=((row[0] + transaction_id_offset, *row[1:], now, now) for row in rows),
+        )
+
+    def _iterate_rows(self, queryset: django_db_models.QuerySet, table: str) -> typing.Iterator[typing.Tuple]:
+        return queryset.values_list(*SNAPSHOT_TABLES[table].columns).iterator(chunk_size=_CHUNK_SIZE)
+
+    def _get_pool_rows(self, model: typing.Type[django_db_models.Model]) -> django_db_models.QuerySet:
+        return model.objects.filter(
+            chain=self._provider_client.chain.value,
+            dex=self._provider_client.dex.value,
+            liquidity_pool=self._provider_client.liquidity_pool.value,
+        )
+
+    def _get_block_reference(self) -> typing.Optional[models.LiquidityPoolImporterBlockReference]:
+        return self._get_pool_rows(model=models.LiquidityPoolImporterBlockReference).first()
@@ -0,0 +1,5 @@
+import django.dispatch
+
+# Sent by LiquidityPoolImporter after each imported block window with arguments:
+# dex_provider_client, from_block, to_block, duration, db_queries, db_duration.
+block_window_imported = django.dispatch.Signal()
@@ -0,0 +1,53 @@
+import json
+import tempfile
+import types
+
+from django.test import SimpleTestCase
+
+from src.clients.dex import json_rpc as dex_json_rpc
+from src.clients.dex import response_cache as dex_response_cache
+
+HEAD_BLOCK_NUMBER = 1000
+
+
+class JsonRpcClientCacheTestCase(SimpleTestCase):
+    def setUp(self) -> None:
+        temporary_directory = tempfile.TemporaryDirectory()
+        self.addCleanup(temporary_directory.cleanup)
+        self.response_cache = dex_response_cache.RpcResponseCache(directory=temporary_directory.name, chain="PULSE")
+        self.requested_methods = []
+
+    def test_results_of_finalized_blocks_are_cached(self) -> None:
+        json_rpc_client = self._create_json_rpc_client(finality_blocks=64)
+
+        for _ in range(2):
+            json_rpc_client.call(method="eth_getBlockByNumber", params=[hex(HEAD_BLOCK_NUMBER - 64), False])
+            json_rpc_client.call(method="eth_getBlockByNumber", params=[hex(HEAD_BLOCK_NUMBER - 63), False])
+
+        self.assertEqual(self.requested_methods.count("eth_getBlockByNumber"), 3)
+
+    def test_nothing_is_cached_without_finality_blocks(self) -> None:
+        json_rpc_client = self._create_json_rpc_client(finality_blocks=0)
+
+        for _ in range(2):
+            json_rpc_client.call(method="eth_getBlockByNumber", params=[hex(1), False])
+
+        self.assertEqual(self.requested_methods, ["eth_getBlockByNumber", "eth_getBlockByNumber"])
+
+    def _create_json_rpc_client(self, finality_blocks: int) -> dex_json_rpc.JsonRpcClient:
+        return dex_json_rpc.JsonRpcClient(
+            provider=types.SimpleNamespace(send_request=self._send_request),
+            metric_labels={"chain": "PULSE", "dex": "PULSEX", "liquidity_pool": "WPLS_DAI"},
+            response_cache=self.response_cache,
+            finality_blocks=finality_blocks,
+        )
+
+    def _send_request(self, request_data: bytes, method: str, block_number: int = None) -> tuple:
+        self.requested_methods.append(method)
+        request = json.loads(request_data)
+        if method == "eth_blockNumber":
+            result = hex(HEAD_BLOCK_NUMBER)
+        else:
+            result = {"number": request["params"][0], "transactions": []}
+
+        return None, json.dumps({"jsonrpc": "2.0", "id": request["id"], "result": result}).encode("utf-8")
@@ -0,0 +1,75 @@
+import types
+from unittest import mock
+
+from django.core.cache import caches
+from django.db import connection
+from django.test import SimpleTestCase, override_settings
+
+from src import enums
+from src.services import lp_cache as lp_cache_services
+
+LOCMEM_CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "lp-cache-tests"}}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class LiquidityPoolImporterCacheTestCase(SimpleTestCase):
+    def setUp(self) -> None:
+        caches["default"].clear()
+        self.cache = self._create_cache(liquidity_pool=enums.LiquidityPool.WPLS_DAI)
+
+    def test_transaction_ids(self) -> None:
+        self.cache.set_transaction_ids(transaction_ids={"0xa": 1, "0xb": 2})
+
+        self.assertEqual(self.cache.get_transaction_ids(transaction_hashes=["0xa", "0xc"]), {"0xa": 1})
+
+    def test_known_events(self) -> None:
+        self.cache.add_known_events(event_keys=[("0xa", 0), ("0xa", 1)])
+
+        self.assertEqual(self.cache.get_known_events(event_keys=[("0xa", 1), ("0xb", 0)]), {("0xa", 1)})
+
+    def test_transaction_ids_are_shared_by_pools_of_chain(self) -> None:
+        self.cache.set_transaction_ids(transaction_ids={"0xa": 1})
+
+        other_cache = self._create_cache(liquidity_pool=enums.LiquidityPool.USDC_WPLS)
+        self.assertEqual(other_cache.get_transaction_ids(transaction_hashes=["0xa"]), {"0xa": 1})
+
+    def test_block_number_is_kept_per_pool(self) -> None:
+        self.cache.set_block_number(block_number=100)
+
+        other_cache = self._create_cache(liquidity_pool=enums.LiquidityPool.USDC_WPLS)
+        self.assertEqual(self.cache.get_block_number(), 100)
+        self.assertIsNone(other_cache.get_block_number())
+
+    def test_keys_are_namespaced_by_database(self) -> None:
+        self.cache.set_transaction_ids(transaction_ids={"0xa": 1})
+        self.cache.set_block_number(block_number=100)
+
+        with mock.patch.dict(connection.settings_dict, {"NAME": "other_database"}):
+            other_cache = self._create_cache(liquidity_pool=enums.LiquidityPool.WPLS_DAI)
+        self.assertEqual(other_cache.get_transaction_ids(transaction_hashes=["0xa"]), {})
+        self.assertIsNone(other_cache.get_block_number())
+
+    def test_delete_block_number(self) -> None:
+        self.cache.set_block_number(block_number=100)
+
+        self.cache.delete_block_number()
+
+        self.assertIsNone(self.cache.get_block_number())
+
+    def test_delete_transaction_ids(self) -> None:
+        self.cache.set_transaction_ids(transaction_ids={"0xa": 1, "0xb": 2})
+
+        self.cache.delete_transaction_ids(transaction_hashes=["0xa"])
+
+        self.assertEqual(self.cache.get_transaction_ids(transaction_hashes=["0xa", "0xb"]), {"0xb": 2})
+
+    def test_cache_failure_falls_back_to_misses(self) -> None:
+        with mock.patch.object(self.cache._cache, "get_many", side_effect=ConnectionError("cache is down")):
+            self.assertEqual(self.cache.get_transaction_ids(transaction_hashes=["0xa"]), {})
+            self.assertEqual(self.cache.get_known_events(event_keys=[("0xa", 0)]), set())
+
+    def _create_cache(self, liquidity_pool: enums.LiquidityPool) -> lp_cache_services.LiquidityPoolImporterCache:
+        dex_provider_client = types.SimpleNamespace(
+            chain=enums.Chain.PULSE, dex=enums.Dex.PULSEX, liquidity_pool=liquidity_pool
+        )
+        return lp_cache_services.LiquidityPoolImporterCache(dex_provider_client=dex_provider_client)
@@ -0,0 +1,61 @@
+from django.test import TestCase
+
+from src import enums
+from src.services import lp_coverage as lp_coverage_services
+from src.tests import utils as test_utils
+
+
+class LiquidityPoolCoverageTestCase(TestCase):
+    def setUp(self) -> None:
+        self.coverage = lp_coverage_services.LiquidityPoolCoverage(
+            dex_provider_client=test_utils.create_dex_provider_client()
+        )
+
+    def test_add_disjoint_block_ranges(self) -> None:
+        self.coverage.add_block_range(from_block=10, to_block=19)
+        self.coverage.add_block_range(from_block=30, to_block=39)
+
+        self.assertEqual(self.coverage.get_block_ranges(), [(10, 19), (30, 39)])
+
+    def test_add_adjacent_block_range(self) -> None:
+        self.coverage.add_block_range(from_block=10, to_block=19)
+
+        self.assertEqual(self.coverage.add_block_range(from_block=20, to_block=29), (10, 29))
+        self.assertEqual(self.coverage.add_block_range(from_block=5, to_block=9), (5, 29))
+        self.assertEqual(self.coverage.get_block_ranges(), [(5, 29)])
+
+    def test_add_overlapping_block_range(self) -> None:
+        self.coverage.add_block_range(from_block=10, to_block=19)
+        self.coverage.add_block_range(from_block=30, to_block=39)
+
+        self.assertEqual(self.coverage.add_block_range(from_block=15, to_block=35), (10, 39))
+        self.assertEqual(self.coverage.get_block_ranges(), [(10, 39)])
+
+    def test_add_contained_block_range(self) -> None:
+        self.coverage.add_block_range(from_block=10, to_block=39)
+
+        self.assertEqual(self.coverage.add_block_range(from_block=15, to_block=20), (10, 39))
+        self.assertEqual(self.coverage.add_block_range(from_block=0, to_block=50), (0, 50))
+        self.assertEqual(self.coverage.get_block_ranges(), [(0, 50)])
+
+    def test_block_ranges_are_kept_per_pool(self) -> None:
+        self.coverage.add_block_range(from_block=10, to_block=19)
+        other_coverage = lp_coverage_services.LiquidityPoolCoverage(
+            dex_provider_client=test_utils.create_dex_provider_client(liquidity_pool=enums.LiquidityPool.USDC_WPLS)
+        )
+
+        self.assertEqual(other_coverage.get_block_ranges(), [])
+
+    def test_get_missing_block_ranges(self) -> None:
+        self.coverage.add_block_range(from_block=10, to_block=19)
+        self.coverage.add_block_range(from_block=30, to_block=39)
+
+        self.assertEqual(
+            self.coverage.get_missing_block_ranges(from_block=0, to_block=50), [(0, 9), (20, 29), (40, 50)]
+        )
+        self.assertEqual(self.coverage.get_missing_block_ranges(from_block=15, to_block=35), [(20, 29)])
+        self.assertEqual(self.coverage.get_missing_block_ranges(from_block=10, to_block=19), [])
+        self.assertEqual(self.coverage.get_missing_block_ranges(from_block=20, to_block=20), [(20, 20)])
+
+    def test_get_missing_block_ranges_without_coverage(self) -> None:
+        self.assertEqual(self.coverage.get_missing_block_ranges(from_block=0, to_block=50), [(0, 50)])
@@ -0,0 +1,122 @@
+import tempfile
+from pathlib import Path
+
+from django.test import SimpleTestCase, TestCase
+
+from src import exceptions
+from src.services import lp_event_store as lp_event_store_services
+from src.services import lp_exporter as lp_exporter_services
+from src.tests import utils as test_utils
+
+
+def create_row(block_number: int, log_index: int, event_name: str = "Sync") -> dict:
+    row = {column: "0x{}{}".format(block_number, log_index) for column in lp_event_store_services.VARIABLE_COLUMNS}
+    row.update(block_number=block_number, log_index=log_index, transaction_index=0, event_name=event_name)
+    return row
+
+
+class LiquidityPoolEventStoreTestCase(SimpleTestCase):
+    def setUp(self) -> None:
+        temporary_directory = tempfile.TemporaryDirectory()
+        self.addCleanup(temporary_directory.cleanup)
+        self.path = Path(temporary_directory.name) / "WPLS_DAI.events"
+        self.event_store = lp_event_store_services.LiquidityPoolEventStore(path=self.path)
+
+    def test_append(self) -> None:
+        self.assertEqual(self.event_store.append(rows=[create_row(10, 0), create_row(10, 1, "Swap")]), 2)
+        # Rows of stored blocks are skipped.
+        self.assertEqual(self.event_store.append(rows=[create_row(10, 1), create_row(11, 0)]), 1)
+
+        event_store = lp_event_store_services.LiquidityPoolEventStore(path=self.path)
+        self.assertEqual((event_store.row_count, event_store.last_block_number), (3, 11))
+        self.assertEqual(event_store.event_names, ["Sync", "Swap"])
+        self.assertEqual(event_store.get_columns()["event_type"].tolist(), [0, 1, 0])
+
+    def test_append_rejects_unordered_rows(self) -> None:
+        with self.assertRaises(exceptions.LiquidityPoolEventStoreException), self.assertLogs(level="ERROR"):
+            self.event_store.append(rows=[create_row(11, 0), create_row(10, 0)])
+
+        self.assertEqual(self.event_store.row_count, 0)
+
+    def test_append_after_interrupted_write(self) -> None:
+        self.event_store.append(rows=[create_row(10, 0)])
+        # Files of an interrupted append are longer than committed by meta.json.
+        for path in self.path.iterdir():
+            if path.name != "meta.json":
+                with open(path, "ab") as file:
+                    file.write(b"\xff" * 7)
+
+        event_store = lp_event_store_services.LiquidityPoolEventStore(path=self.path)
+        self.assertEqual(event_store.get_row_range(), (0, 1))
+        with self.assertLogs(level="WARNING"):
+            event_store.append(rows=[create_row(11, 0)])
+
+        self.assertEqual(event_store.get_columns()["block_number"].tolist(), [10, 11])
+        self.assertEqual(
+            event_store.get_variable_data(start=0, stop=2),
+            [self._get_variable_data(create_row(10, 0)), self._get_variable_data(create_row(11, 0))],
+        )
+
+    def test_truncate_and_append(self) -> None:
+        self.event_store.append(rows=[create_row(10, 0), create_row(11, 0), create_row(11, 1), create_row(12, 0)])
+
+        self.assertEqual(self.event_store.truncate(from_block=11), 3)
+        self.assertEqual((self.event_store.row_count, self.event_store.last_block_number), (1, 10))
+        self.assertEqual(self.event_store.truncate(from_block=11), 0)
+
+        self.assertEqual(self.event_store.append(rows=[create_row(11, 2), create_row(13, 0)]), 2)
+        event_store = lp_event_store_services.LiquidityPoolEventStore(path=self.path)
+        self.assertEqual(event_store.get_columns()["log_index"].tolist(), [0, 2, 0])
+        self.assertEqual(event_store.get_variable_data(start=1, stop=2), [self._get_variable_data(create_row(11, 2))])
+
+    def test_get_variable_data(self) -> None:
+        rows = [create_row(10, 0), create_row(11, 0), create_row(11, 1), create_row(12, 0)]
+        self.event_store.append(rows=rows)
+
+        start, stop = self.event_store.get_row_range(from_block=11, to_block=11)
+        self.assertEqual((start, stop), (1, 3))
+        self.assertEqual(
+            self.event_store.get_variable_data(start=start, stop=stop),
+            [self._get_variable_data(row) for row in rows[1:3]],
+        )
+        self.assertEqual(self.event_store.get_variable_data(start=0, stop=1), [self._get_variable_data(rows[0])])
+        self.assertEqual(self.event_store.get_variable_data(start=2, stop=2), [])
+        self.assertEqual(self.event_store.get_row_range(from_block=13), (4, 4))
+
+    @staticmethod
+    def _get_variable_data(row: dict) -> dict:
+        return {column: row[column] for column in lp_event_store_services.VARIABLE_COLUMNS}
+
+
+class LiquidityPoolExporterDriftTestCase(TestCase):
+    def setUp(self) -> None:
+        temporary_directory = tempfile.TemporaryDirectory()
+        self.addCleanup(temporary_directory.cleanup)
+        self.event_store = lp_event_store_services.LiquidityPoolEventStore(
+            path=Path(temporary_directory.name) / "WPLS_DAI.events"
+        )
+        self.provider_client = test_utils.create_dex_provider_client()
+        self.exporter = lp_exporter_services.LiquidityPoolExporter(dex_provider_client=self.provider_client)
+
+    def test_get_drifted_block_number(self) -> None:
+        self.assertIsNone(self.exporter._get_drifted_block_number(event_store=self.event_store))
+
+        events = [
+            test_utils.create_event(
+                contract_address=self.provider_client.lp_contract_address, block_number=block_number, log_index=0
+            )
+            for block_number in range(10, 20)
+        ]
+        self.event_store.append(rows=[self.exporter.get_event_data(event=event) for event in events])
+        self.assertIsNone(self.exporter._get_drifted_block_number(event_store=self.event_store))
+
+        # Events of other pools and of blocks after the store do not drift it.
+        test_utils.create_event(contract_address=test_utils.get_address(index=1), block_number=12, log_index=1)
+        test_utils.create_event(contract_address=self.provider_client.lp_contract_address, block_number=25, log_index=0)
+        self.assertIsNone(self.exporter._get_drifted_block_number(event_store=self.event_store))
+
+        # Repaired gaps and backfilled event types are stored into blocks of the store.
+        test_utils.create_event(contract_address=self.provider_client.lp_contract_address, block_number=16, log_index=1)
+        self.assertEqual(self.exporter._get_drifted_block_number(event_store=self.event_store), 16)
+        test_utils.create_event(contract_address=self.provider_client.lp_contract_address, block_number=13, log_index=1)
+        self.assertEqual(self.exporter._get_drifted_block_number(event_store=self.event_store), 13)
@@ -0,0 +1,157 @@
+from django.test import TestCase
+
+from src import models
+from src.services import lp_positions as lp_positions_services
+from src.services import lp_query as lp_query_services
+from src.tests import utils as test_utils
+
+ZERO_ADDRESS = lp_positions_services.ZERO_ADDRESS
+MINIMUM_LIQUIDITY = 1000
+
+
+class LiquidityPoolPositionLedgerTestCase(TestCase):
+    def setUp(self) -> None:
+        self.provider_client = test_utils.create_dex_provider_client()
+        self.pair_address = self.provider_client.lp_contract_address
+        self.ledger = lp_positions_services.LiquidityPoolPositionLedger(dex_provider_client=self.provider_client)
+        self.alice = test_utils.get_address(index=0xA1)
+        self.bob = test_utils.get_address(index=0xB0)
+
+    def test_mint_locks_minimum_liquidity(self) -> None:
+        self._create_transfer(
+            block_number=10, log_index=0, from_address=ZERO_ADDRESS, to_address=ZERO_ADDRESS, value=MINIMUM_LIQUIDITY
+        )
+        self._create_transfer(
+            block_number=10, log_index=1, from_address=ZERO_ADDRESS, to_address=self.alice, value=9000
+        )
+
+        self.assertEqual(self.ledger.update_positions(from_block=10), 2)
+
+        self.assertEqual(self._get_balances(), {ZERO_ADDRESS: MINIMUM_LIQUIDITY, self.alice: 9000})
+        self.assertEqual(self._get_total_supplies(), [(10, "10000")])
+
+    def test_burn_reduces_total_supply(self) -> None:
+        self._create_mint(block_number=10)
+        self._create_transfer(
+            block_number=11, log_index=0, from_address=self.alice, to_address=self.pair_address, value=4000
+        )
+        self._create_transfer(
+            block_number=11, log_index=1, from_address=self.pair_address, to_address=ZERO_ADDRESS, value=4000
+        )
+
+        self.ledger.update_positions(from_block=10)
+
+        self.assertEqual(
+            self._get_balances(), {ZERO_ADDRESS: MINIMUM_LIQUIDITY, self.alice: 5000, self.pair_address: 0}
+        )
+        self.assertEqual(self._get_total_supplies(), [(10, "10000"), (11, "6000")])
+
+    def test_transfers_of_block_write_one_history_row(self) -> None:
+        self._create_mint(block_number=10)
+        for log_index in range(3):
+            self._create_transfer(
+                block_number=11, log_index=log_index, from_address=self.alice, to_address=self.bob, value=1000
+            )
+
+        self.ledger.update_positions(from_block=10)
+
+        self.assertEqual(
+            list(
+                models.LiquidityPoolPositionHistory.objects.filter(block_number=11)
+                .order_by("address")
+                .values_list("address", "balance")
+            ),
+            [(self.alice, "6000"), (self.bob, "3000")],
+        )
+
+    def test_replay_from_earlier_block_matches_clean_import(self) -> None:
+        transfers = [
+            (10, self.alice, self.bob, 2000),
+            (12, self.bob, self.alice, 500),
+            (14, self.alice, self.bob, 1000),
+        ]
+        self._create_mint(block_number=5)
+        self.ledger.update_positions(from_block=5)
+        # Block 12 is stored after later blocks were ledgered, like a repaired gap or a backfilled event type.
+        for block_number, from_address, to_address, value in (transfers[0], transfers[2]):
+            self._create_transfer(
+                block_number=block_number, log_index=0, from_address=from_address, to_address=to_address, value=value
+            )
+            self.ledger.update_positions(from_block=block_number)
+        block_number, from_address, to_address, value = transfers[1]
+        self._create_transfer(
+            block_number=block_number, log_index=0, from_address=from_address, to_address=to_address, value=value
+        )
+
+        self.ledger.update_positions(from_block=12)
+
+        replayed_rows = self._get_ledger_rows()
+        models.LiquidityPoolPosition.objects.all().delete()
+        models.LiquidityPoolPositionHistory.objects.all().delete()
+        models.LiquidityPoolTotalSupply.objects.all().delete()
+        self.ledger.update_positions(from_block=0)
+        self.assertEqual(replayed_rows, self._get_ledger_rows())
+        self.assertEqual(self._get_balances(), {ZERO_ADDRESS: MINIMUM_LIQUIDITY, self.alice: 6500, self.bob: 2500})
+
+    def test_get_top_positions(self) -> None:
+        self._create_mint(block_number=10)
+        self._create_transfer(block_number=11, log_index=0, from_address=self.alice, to_address=self.bob, value=7000)
+        self.ledger.update_positions(from_block=10)
+        query_service = lp_query_services.LiquidityPoolQueryService(dex_provider_client=self.provider_client)
+
+        self.assertEqual(
+            query_service.get_top_positions(limit=2),
+            [
+                {"address": self.bob, "changed_block_number": 11, "balance": "7000", "share": 0.7},
+                {"address": self.alice, "changed_block_number": 11, "balance": "2000", "share": 0.2},
+            ],
+        )
+        self.assertEqual(
+            query_service.get_top_positions(limit=2, block_number=10),
+            [
+                {"address": self.alice, "changed_block_number": 10, "balance": "9000", "share": 0.9},
+                {"address": ZERO_ADDRESS, "changed_block_number": 10, "balance": "1000", "share": 0.1},
+            ],
+        )
+
+    def _create_mint(self, block_number: int) -> None:
+        self._create_transfer(
+            block_number=block_number,
+            log_index=100,
+            from_address=ZERO_ADDRESS,
+            to_address=ZERO_ADDRESS,
+            value=MINIMUM_LIQUIDITY,
+        )
+        self._create_transfer(
+            block_number=block_number, log_index=101, from_address=ZERO_ADDRESS, to_address=self.alice, value=9000
+        )
+
+    def _create_transfer(
+        self, block_number: int, log_index: int, from_address: str, to_address: str, value: int
+    ) -> None:
+        test_utils.create_transfer_event(
+            contract_address=self.pair_address,
+            block_number=block_number,
+            log_index=log_index,
+            from_address=from_address,
+            to_address=to_address,
+            value=value,
+        )
+
+    def _get_balances(self) -> dict:
+        return {
+            address: int(balance)
+            for address, balance in models.LiquidityPoolPosition.objects.values_list("address", "balance")
+        }
+
+    def _get_total_supplies(self) -> list:
+        return list(
+            models.LiquidityPoolTotalSupply.objects.order_by("block_number").values_list("block_number", "total_supply")
+        )
+
+    def _get_ledger_rows(self) -> tuple:
+        return (
+            sorted(models.LiquidityPoolPosition.objects.values_list("address", "balance", "block_number")),
+            sorted(models.LiquidityPoolPositionHistory.objects.values_list("address", "block_number", "balance")),
+            self._get_total_supplies(),
+        )
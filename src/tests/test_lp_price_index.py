@@ -0,0 +1,156 @@
+import copy
+from unittest import mock
+
+import numpy
+from django.test import TestCase
+
+from src import enums, exceptions, models
+from src.services import lp_price_index as lp_price_index_services
+
+PRICE_INDEX_CONFIG = {
+    "batch_size_blocks": 10,
+    "chains": {
+        "PULSE": {
+            "PULSEX": {
+                "token_decimals": {"WPLS": 18, "DAI": 18, "USDC": 6, "HEX": 8, "stETH": 18},
+                "usd_tokens": ["DAI", "USDC"],
+                "routes": {
+                    # Routed tokens are priced after the other tokens of their pools.
+                    "HEX": ["HEX_WPLS"],
+                    "WPLS": ["WPLS_DAI", "USDC_WPLS"],
+                },
+            },
+        },
+    },
+}
+
+
+class TokenPriceIndexerTestCase(TestCase):
+    def setUp(self) -> None:
+        self.config = copy.deepcopy(PRICE_INDEX_CONFIG)
+        patcher = mock.patch.object(lp_price_index_services.TokenPriceIndexer, "PRICE_INDEX_CONFIG", self.config)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_tokens_are_ordered_by_routes(self) -> None:
+        self.assertEqual(self._create_indexer().tokens, ["WPLS", "HEX"])
+
+    def test_cyclic_routes_are_rejected(self) -> None:
+        with self.assertRaises(exceptions.LiquidityPoolPriceIndexException):
+            self._create_indexer(routes={"HEX": ["HEX_WPLS"], "WPLS": ["HEX_WPLS"]})
+
+    def test_unpriceable_routes_are_rejected(self) -> None:
+        with self.assertRaises(exceptions.LiquidityPoolPriceIndexException):
+            self._create_indexer(routes={"WPLS": ["WPLS_stETH"]})
+
+    def test_two_hop_route(self) -> None:
+        # 1000 WPLS for 100 DAI, 10 HEX for 500 WPLS.
+        self._create_reserve(
+            liquidity_pool=enums.LiquidityPool.WPLS_DAI, block_number=10, reserve0=1000e18, reserve1=100e18
+        )
+        self._create_reserve(
+            liquidity_pool=enums.LiquidityPool.HEX_WPLS, block_number=10, reserve0=10e8, reserve1=500e18
+        )
+
+        self._create_indexer().update_prices(from_block=0, to_block=19)
+
+        self.assertPrices(token="WPLS", prices=[(10, 0.1)])
+        self.assertPrices(token="HEX", prices=[(10, 5.0)])
+
+    def test_prices_are_weighted_by_liquidity(self) -> None:
+        # WPLS is 0.1 USD by 100 DAI of liquidity and 0.3 USD by 300 USDC of liquidity.
+        self._create_reserve(
+            liquidity_pool=enums.LiquidityPool.WPLS_DAI, block_number=10, reserve0=1000e18, reserve1=100e18
+        )
+        self._create_reserve(
+            liquidity_pool=enums.LiquidityPool.USDC_WPLS, block_number=11, reserve0=300e6, reserve1=1000e18
+        )
+
+        self._create_indexer().update_prices(from_block=0, to_block=19)
+
+        self.assertPrices(token="WPLS", prices=[(10, 0.1), (11, 0.25)])
+
+    def test_reserves_are_forward_filled_from_before_batch(self) -> None:
+        self._create_reserve(
+            liquidity_pool=enums.LiquidityPool.WPLS_DAI, block_number=5, reserve0=1000e18, reserve1=100e18
+        )
+        self._create_reserve(
+            liquidity_pool=enums.LiquidityPool.USDC_WPLS, block_number=15, reserve0=300e6, reserve1=1000e18
+        )
+        indexer = self._create_indexer()
+
+        pool_reserves = indexer._get_pool_reserves(
+            liquidity_pool=enums.LiquidityPool.WPLS_DAI, from_block=10, to_block=19
+        )
+        self.assertEqual(pool_reserves.block_numbers.tolist(), [5])
+        reserves0, reserves1 = pool_reserves.get_reserves_at(block_numbers=numpy.array([15]))
+        self.assertEqual((reserves0.tolist(), reserves1.tolist()), ([1000.0], [100.0]))
+
+        indexer.update_prices(from_block=10, to_block=19)
+
+        self.assertPrices(token="WPLS", prices=[(15, 0.25)])
+
+    def test_last_reserves_of_block_are_used(self) -> None:
+        self._create_reserve(
+            liquidity_pool=enums.LiquidityPool.WPLS_DAI, block_number=10, reserve0=1000e18, reserve1=100e18
+        )
+        self._create_reserve(
+            liquidity_pool=enums.LiquidityPool.WPLS_DAI, block_number=10, reserve0=1000e18, reserve1=200e18, log_index=1
+        )
+
+        pool_reserves = self._create_indexer()._get_pool_reserves(
+            liquidity_pool=enums.LiquidityPool.WPLS_DAI, from_block=0, to_block=19
+        )
+
+        self.assertEqual(pool_reserves.block_numbers.tolist(), [-1, 10])
+        self.assertEqual(pool_reserves.reserves1[1], 200.0)
+
+    def test_pools_without_reserves_are_skipped(self) -> None:
+        self._create_reserve(
+            liquidity_pool=enums.LiquidityPool.WPLS_DAI, block_number=10, reserve0=1000e18, reserve1=100e18
+        )
+        indexer = self._create_indexer()
+
+        pool_reserves = indexer._get_pool_reserves(
+            liquidity_pool=enums.LiquidityPool.USDC_WPLS, from_block=0, to_block=19
+        )
+        self.assertTrue(numpy.isnan(pool_reserves.reserves0[0]))
+
+        indexer.update_prices(from_block=0, to_block=19)
+
+        # USDC_WPLS has no reserves yet and HEX_WPLS neither, so HEX is not priced.
+        self.assertPrices(token="WPLS", prices=[(10, 0.1)])
+        self.assertPrices(token="HEX", prices=[])
+
+    def assertPrices(self, token: str, prices: list) -> None:
+        stored_prices = list(
+            models.LiquidityPoolTokenPrice.objects.filter(token=token)
+            .order_by("block_number")
+            .values_list("block_number", "price")
+        )
+        self.assertEqual(
+            [block_number for block_number, _ in stored_prices], [block_number for block_number, _ in prices]
+        )
+        for (_, stored_price), (_, price) in zip(stored_prices, prices):
+            self.assertAlmostEqual(stored_price, price)
+
+    def _create_indexer(self, routes: dict = None) -> lp_price_index_services.TokenPriceIndexer:
+        if routes is not None:
+            self.config["chains"]["PULSE"]["PULSEX"]["routes"] = routes
+
+        return lp_price_index_services.TokenPriceIndexer(chain=enums.Chain.PULSE, dex=enums.Dex.PULSEX)
+
+    @staticmethod
+    def _create_reserve(
+        liquidity_pool: enums.LiquidityPool, block_number: int, reserve0: float, reserve1: float, log_index: int = 0
+    ) -> None:
+        models.LiquidityPoolReserve.objects.create(
+            chain=enums.Chain.PULSE.value,
+            dex=enums.Dex.PULSEX.value,
+            liquidity_pool=liquidity_pool.value,
+            block_number=block_number,
+            log_index=log_index,
+            reserve0=str(int(reserve0)),
+            reserve1=str(int(reserve1)),
+            price=reserve1 / reserve0,
+        )
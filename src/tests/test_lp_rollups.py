@@ -0,0 +1,49 @@
+from django.test import TestCase
+
+from src import enums, models
+from src.services import lp_rollups as lp_rollups_services
+from src.tests import utils as test_utils
+
+
+class LiquidityPoolRollupBuilderTestCase(TestCase):
+    def setUp(self) -> None:
+        self.provider_client = test_utils.create_dex_provider_client()
+        self.provider_client.get_block_timestamps = lambda block_numbers: {
+            block_number: block_number * 60 * 60 for block_number in block_numbers
+        }
+        self.rollup_builder = lp_rollups_services.LiquidityPoolRollupBuilder(dex_provider_client=self.provider_client)
+
+    def test_time_rollups_include_shared_transactions(self) -> None:
+        test_utils.create_sync_event(
+            contract_address=self.provider_client.lp_contract_address,
+            block_number=10,
+            log_index=0,
+            reserve0=1,
+            reserve1=2,
+        )
+        # The transaction of a multi-hop swap was stored by the other pool first.
+        other_pool_event = test_utils.create_sync_event(
+            contract_address=test_utils.get_address(index=1), block_number=11, log_index=0, reserve0=1, reserve1=1
+        )
+        models.TransactionEvent.objects.create(
+            name="Sync",
+            topics="[]",
+            data="0x{:064x}{:064x}".format(1, 4),
+            log_index=1,
+            contract_address=self.provider_client.lp_contract_address,
+            block_number=11,
+            transaction=other_pool_event.transaction,
+        )
+
+        self.rollup_builder.update_rollups(from_block=10, to_block=11, granularities=[enums.RollupGranularity.HOUR])
+
+        other_pool_event.transaction.refresh_from_db()
+        self.assertEqual(other_pool_event.transaction.block_timestamp, 11 * 60 * 60)
+        self.assertEqual(
+            list(
+                models.LiquidityPoolRollup.objects.order_by("bucket_start").values_list(
+                    "bucket_start", "first_block_number", "close_price", "sync_count"
+                )
+            ),
+            [(10 * 60 * 60, 10, 2.0, 1), (11 * 60 * 60, 11, 4.0, 1)],
+        )
@@ -0,0 +1,80 @@
+import json
+import types
+import typing
+
+from src import enums, models
+
+ZERO_ADDRESS = "0x" + "0" * 40
+
+
+def create_dex_provider_client(
+    liquidity_pool: enums.LiquidityPool = enums.LiquidityPool.WPLS_DAI,
+    lp_contract_address: str = "0x" + "a" * 40,
+    chain: enums.Chain = enums.Chain.PULSE,
+    dex: enums.Dex = enums.Dex.PULSEX,
+) -> types.SimpleNamespace:
+    """
+    Dex provider client stub with the attributes services read from the pool config.
+    """
+    return types.SimpleNamespace(
+        chain=chain, dex=dex, liquidity_pool=liquidity_pool, lp_contract_address=lp_contract_address
+    )
+
+
+def get_address(index: int) -> str:
+    return "0x{:040x}".format(index)
+
+
+def create_event(
+    contract_address: str,
+    block_number: int,
+    log_index: int,
+    name: str = "Sync",
+    topics: typing.Optional[typing.List[str]] = None,
+    data: str = "0x",
+) -> models.TransactionEvent:
+    transaction = models.Transaction.objects.create(
+        transaction_hash="0x{:064x}".format(block_number * 1000 + log_index),
+        transaction_index=0,
+        contract_address=contract_address,
+        block_number=block_number,
+        block_hash="0x{:064x}".format(block_number),
+        from_address=get_address(1),
+        to_address=contract_address,
+        gas="0x0",
+        gas_price="0x0",
+    )
+    return models.TransactionEvent.objects.create(
+        name=name,
+        topics=json.dumps(topics or []),
+        data=data,
+        log_index=log_index,
+        contract_address=contract_address,
+        block_number=block_number,
+        transaction=transaction,
+    )
+
+
+def create_transfer_event(
+    contract_address: str, block_number: int, log_index: int, from_address: str, to_address: str, value: int
+) -> models.TransactionEvent:
+    return create_event(
+        contract_address=contract_address,
+        block_number=block_number,
+        log_index=log_index,
+        name="Transfer",
+        topics=["0x" + "d" * 64, "0x" + "0" * 24 + from_address[2:], "0x" + "0" * 24 + to_address[2:]],
+        data="0x{:064x}".format(value),
+    )
+
+
+def create_sync_event(
+    contract_address: str, block_number: int, log_index: int, reserve0: int, reserve1: int
+) -> models.TransactionEvent:
+    return create_event(
+        contract_address=contract_address,
+        block_number=block_number,
+        log_index=log_index,
+        name="Sync",
+        data="0x{:064x}{:064x}".format(reserve0, reserve1),
+    )
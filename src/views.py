@@ -0,0 +1,237 @@
+import json
+import typing
+
+import prometheus_client
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.http import (
+    Http404,
+    HttpRequest,
+    HttpResponse,
+    JsonResponse,
+    StreamingHttpResponse,
+)
+
+from src import enums, metrics
+from src.clients.dex import exceptions as dex_exceptions
+from src.clients.dex import factory
+from src.services import lp_price_index as lp_price_index_services
+from src.services import lp_query as lp_query_services
+
+API_CONFIG = settings.LP_API
+
+_IMMUTABLE_CACHE_CONTROL = "public, max-age={}, immutable".format(API_CONFIG["cache_timeout"])
+
+
+def metrics(request: HttpRequest) -> HttpResponse:
+    return HttpResponse(
+        metrics.generate_latest(),
+        content_type=prometheus_client.CONTENT_TYPE_LATEST,
+    )
+
+
+async def liquidity_pool_events(request: HttpRequest, chain: str, dex: str, pool: str) -> HttpResponse:
+    query_service = await sync_to_async(_get_query_service)(chain=chain, dex=dex, pool=pool)
+    try:
+        from_block = _get_int_param(request=request, name="from_block")
+        to_block = _get_int_param(request=request, name="to_block")
+        limit = _get_int_param(request=request, name="limit") or API_CONFIG["default_page_size"]
+        cursor = request.GET.get("cursor")
+        cursor = lp_query_services.decode_cursor(cursor=cursor) if cursor else None
+    except ValueError:
+        return JsonResponse(
+            {
+                "error": "from_block, to_block and limit have to be integers, cursor has format <block_number>:<log_index>."
+            },
+            status=400,
+        )
+
+    if not 0 < limit <= API_CONFIG["max_page_size"]:
+        return JsonResponse(
+            {"error": "limit has to be between 1 and {}.".format(API_CONFIG["max_page_size"])}, status=400
+        )
+
+    cache = caches[API_CONFIG["cache_alias"]]
+    cache_key = "lp-api:{}".format(request.get_full_path())
+    cached_response = await cache.aget(cache_key)
+    if cached_response is not None:
+        return HttpResponse(
+            cached_response, content_type="application/json", headers={"Cache-Control": _IMMUTABLE_CACHE_CONTROL}
+        )
+
+    # Ranges of fully imported blocks do not change anymore, so their pages are cached.
+    imported_block_number = await sync_to_async(query_service.get_imported_block_number)()
+    is_immutable = to_block is not None and imported_block_number is not None and to_block <= imported_block_number
+
+    return StreamingHttpResponse(
+        _stream_events(
+            query_service=query_service,
+            from_block=from_block,
+            to_block=to_block,
+            cursor=cursor,
+            limit=limit,
+            cache_key=cache_key if is_immutable else None,
+        ),
+        content_type="application/json",
+        headers={"Cache-Control": _IMMUTABLE_CACHE_CONTROL if is_immutable else "no-cache"},
+    )
+
+
+async def liquidity_pool_state(request: HttpRequest, chain: str, dex: str, pool: str) -> HttpResponse:
+    query_service = await sync_to_async(_get_query_service)(chain=chain, dex=dex, pool=pool)
+
+    return JsonResponse(await sync_to_async(query_service.get_state)(), headers={"Cache-Control": "no-cache"})
+
+
+async def liquidity_pool_positions(request: HttpRequest, chain: str, dex: str, pool: str) -> HttpResponse:
+    query_service = await sync_to_async(_get_query_service)(chain=chain, dex=dex, pool=pool)
+    try:
+        limit = _get_int_param(request=request, name="limit") or API_CONFIG["default_page_size"]
+        block_number = _get_int_param(request=request, name="block_number")
+    except ValueError:
+        return JsonResponse({"error": "limit and block_number have to be integers."}, status=400)
+
+    if not 0 < limit <= API_CONFIG["max_page_size"]:
+        return JsonResponse(
+            {"error": "limit has to be between 1 and {}.".format(API_CONFIG["max_page_size"])}, status=400
+        )
+
+    positions = await sync_to_async(query_service.get_top_positions)(limit=limit, block_number=block_number)
+
+    # Positions at fully imported blocks do not change anymore.
+    imported_block_number = await sync_to_async(query_service.get_imported_block_number)()
+    is_immutable = (
+        block_number is not None and imported_block_number is not None and block_number <= imported_block_number
+    )
+
+    return JsonResponse(
+        {"block_number": block_number, "positions": positions},
+        headers={"Cache-Control": _IMMUTABLE_CACHE_CONTROL if is_immutable else "no-cache"},
+    )
+
+
+async def liquidity_pool_position(request: HttpRequest, chain: str, dex: str, pool: str, address: str) -> HttpResponse:
+    query_service = await sync_to_async(_get_query_service)(chain=chain, dex=dex, pool=pool)
+    try:
+        block_number = _get_int_param(request=request, name="block_number")
+    except ValueError:
+        return JsonResponse({"error": "block_number has to be an integer."}, status=400)
+
+    position = await sync_to_async(query_service.get_position)(address=address.lower(), block_number=block_number)
+
+    # Positions at fully imported blocks do not change anymore.
+    imported_block_number = await sync_to_async(query_service.get_imported_block_number)()
+    is_immutable = (
+        block_number is not None and imported_block_number is not None and block_number <= imported_block_number
+    )
+
+    return JsonResponse(position, headers={"Cache-Control": _IMMUTABLE_CACHE_CONTROL if is_immutable else "no-cache"})
+
+
+async def transaction(request: HttpRequest, transaction_hash: str) -> HttpResponse:
+    transaction_data = await sync_to_async(lp_query_services.get_transaction_data)(
+        transaction_hash=transaction_hash.lower()
+    )
+    if not transaction_data:
+        raise Http404("Transaction not found.")
+
+    return JsonResponse(transaction_data, headers={"Cache-Control": _IMMUTABLE_CACHE_CONTROL})
+
+
+async def token_prices(request: HttpRequest, chain: str, dex: str, token: str) -> HttpResponse:
+    query_service = await sync_to_async(_get_token_price_query_service)(chain=chain, dex=dex, token=token)
+    try:
+        from_block = _get_int_param(request=request, name="from_block")
+        to_block = _get_int_param(request=request, name="to_block")
+        limit = _get_int_param(request=request, name="limit") or API_CONFIG["default_page_size"]
+        cursor = _get_int_param(request=request, name="cursor")
+    except ValueError:
+        return JsonResponse(
+            {"error": "from_block, to_block, limit and cursor have to be integers."},
+            status=400,
+        )
+
+    if not 0 < limit <= API_CONFIG["max_page_size"]:
+        return JsonResponse(
+            {"error": "limit has to be between 1 and {}.".format(API_CONFIG["max_page_size"])}, status=400
+        )
+
+    prices = await sync_to_async(query_service.get_prices)(
+        from_block=from_block, to_block=to_block, cursor=cursor, limit=limit + 1
+    )
+    next_cursor = prices[limit - 1]["block_number"] if len(prices) > limit else None
+
+    # Prices of blocks imported for all pools the token is routed through do not change anymore.
+    imported_block_number = await sync_to_async(query_service.get_imported_block_number)()
+    is_immutable = to_block is not None and imported_block_number is not None and to_block <= imported_block_number
+
+    return JsonResponse(
+        {"prices": prices[:limit], "next_cursor": next_cursor},
+        headers={"Cache-Control": _IMMUTABLE_CACHE_CONTROL if is_immutable else "no-cache"},
+    )
+
+
+async def _stream_events(
+    query_service: lp_query_services.LiquidityPoolQueryService,
+    from_block: typing.Optional[int],
+    to_block: typing.Optional[int],
+    cursor: typing.Optional[lp_query_services.EventCursor],
+    limit: int,
+    cache_key: typing.Optional[str],
+) -> typing.AsyncIterator[bytes]:
+    chunks = [b'{"events":[']
+    yield chunks[-1]
+
+    remaining = limit
+    has_next_page = False
+    while remaining:
+        chunk_size = min(remaining, API_CONFIG["stream_chunk_size"])
+        events = await sync_to_async(query_service.get_events)(
+            from_block=from_block, to_block=to_block, cursor=cursor, limit=chunk_size + 1
+        )
+        has_next_page = len(events) > chunk_size
+        events = events[:chunk_size]
+        if events:
+            chunks.append(
+                (b"," if remaining < limit else b"") + ",".join(json.dumps(event) for event in events).encode("utf-8")
+            )
+            yield chunks[-1]
+            cursor = (events[-1]["block_number"], events[-1]["log_index"])
+            remaining -= len(events)
+        if not has_next_page:
+            break
+
+    next_cursor = lp_query_services.encode_cursor(cursor=cursor) if has_next_page else None
+    chunks.append('],"next_cursor":{}}}'.format(json.dumps(next_cursor)).encode("utf-8"))
+    yield chunks[-1]
+
+    if cache_key:
+        await caches[API_CONFIG["cache_alias"]].aset(cache_key, b"".join(chunks), timeout=API_CONFIG["cache_timeout"])
+
+
+def _get_query_service(chain: str, dex: str, pool: str) -> lp_query_services.LiquidityPoolQueryService:
+    try:
+        chain, dex, liquidity_pool = enums.Chain[chain], enums.Dex[dex], enums.LiquidityPool[pool]
+        settings.CHAIN_DEX_LP_CONFIG[chain.name]["dexes"][dex.name]["pools"][liquidity_pool.name]
+        dex_provider_client = factory.DexProviderFactory.create(chain=chain, dex=dex, liquidity_pool=liquidity_pool)
+    except (KeyError, dex_exceptions.DexProviderException):
+        raise Http404("Liquidity pool not found.")
+
+    return lp_query_services.LiquidityPoolQueryService(dex_provider_client=dex_provider_client)
+
+
+def _get_token_price_query_service(chain: str, dex: str, token: str) -> lp_query_services.TokenPriceQueryService:
+    try:
+        price_indexer = lp_price_index_services.get_price_indexer(chain=enums.Chain[chain], dex=enums.Dex[dex])
+    except KeyError:
+        price_indexer = None
+    if not price_indexer or token not in price_indexer.tokens:
+        raise Http404("Token price index not found.")
+
+    return lp_query_services.TokenPriceQueryService(price_indexer=price_indexer, token=token)
+
+
+def _get_int_param(request: HttpRequest, name: str) -> typing.Optional[int]:
+    value = request.GET.get(name)
+    return int(value) if value else None
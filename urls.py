@@ -16,6 +16,39 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import include, path
 
+from src import views
+
 urlpatterns = [
     path("admin/", admin.site.urls),
+    path("metrics", views.metrics, name="metrics"),
+    path(
+        "api/pools/<str:chain>/<str:dex>/<str:pool>/events",
+        views.liquidity_pool_events,
+        name="liquidity-pool-events",
+    ),
+    path(
+        "api/pools/<str:chain>/<str:dex>/<str:pool>/state",
+        views.liquidity_pool_state,
+        name="liquidity-pool-state",
+    ),
+    path(
+        "api/pools/<str:chain>/<str:dex>/<str:pool>/positions",
+        views.liquidity_pool_positions,
+        name="liquidity-pool-positions",
+    ),
+    path(
+        "api/pools/<str:chain>/<str:dex>/<str:pool>/positions/<str:address>",
+        views.liquidity_pool_position,
+        name="liquidity-pool-position",
+    ),
+    path(
+        "api/prices/<str:chain>/<str:dex>/<str:token>",
+        views.token_prices,
+        name="token-prices",
+    ),
+    path(
+        "api/transactions/<str:transaction_hash>",
+        views.transaction,
+        name="transaction",
+    ),
 ]